@@ -6,4 +6,5 @@ class MessageRequest(BaseModel):
     message: str = Field(..., min_length=1, description="사용자 질문")
     session_id: Optional[str] = Field(default=None, description="세션 식별자(옵션)")
     dog_id: Optional[int] = Field(default=None, description="대상 강아지 ID(옵션)")
-
+    persist: bool = Field(default=False, description="true면 질문과 에이전트별 답변을 서버가 채팅 기록에 저장 (dog_id 필요)")
+    autofill: bool = Field(default=False, description="true면 답변 전에 이번 질문까지 포함한 대화 기록으로 dog_info 자동 채움 (persist 필요)")
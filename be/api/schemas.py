@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Optional, Literal
+from typing import Any, Optional, Literal
 
 from pydantic import BaseModel, Field, field_validator
 from enum import Enum as PyEnum
@@ -145,3 +145,69 @@ class ChatMessageRead(BaseModel):
         from_attributes = True
 
 
+class ChatMessageBatchCreate(BaseModel):
+    # 항목별 검증 오류를 따로 돌려주기 위해 각 항목은 원본 그대로 받아 서버에서 ChatMessageCreate로 검증
+    messages: list[dict[str, Any]] = Field(..., min_length=1, max_length=100)
+
+
+class ChatMessageBatchCreated(BaseModel):
+    index: int = Field(..., description="요청 messages 내 위치")
+    id: int
+    created_at: datetime
+
+
+class ChatMessageBatchError(BaseModel):
+    index: int = Field(..., description="요청 messages 내 위치")
+    detail: Any
+
+
+class ChatMessageBatchResult(BaseModel):
+    created: list[ChatMessageBatchCreated]
+    errors: list[ChatMessageBatchError]
+
+
+class ChatMessagePage(BaseModel):
+    items: list[ChatMessageRead]
+    next_cursor: Optional[str] = Field(default=None, description="다음 페이지 커서 (없으면 마지막 페이지)")
+
+
+# 보고서 생성 작업
+class ReportJobRead(BaseModel):
+    id: str
+    dog_id: int
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: Optional[str] = None
+    progress: int = Field(..., ge=0, le=100)
+    error: Optional[str] = None
+    mode: Literal["incremental", "full"] = "incremental"
+    generated_mode: Optional[Literal["full", "incremental", "unchanged"]] = None
+    filename: Optional[str] = None
+    url_md: Optional[str] = None
+    url_pdf: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+# 보고서 목록 (reports 인덱스)
+class ReportRead(BaseModel):
+    id: int
+    dog_id: int
+    filename: str
+    url_md: str = ""
+    url_pdf: str = ""
+    created_at: datetime
+    size_bytes: int
+    content_hash: str
+    pdf_cached: bool = False
+
+    class Config:
+        from_attributes = True
+
+
+class ReportPage(BaseModel):
+    items: list[ReportRead]
+    next_cursor: Optional[str] = Field(default=None, description="다음 페이지 커서 (없으면 마지막 페이지)")
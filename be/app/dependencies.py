@@ -1,35 +1,22 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils.auth import verify_token
+from core.config import get_settings
 from db.database import get_session
 from db.models import User
+from services.auth_cache import Principal, get_cache, lookup_principal
 from sqlalchemy import select
 
 # Bearer 토큰 스키마
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_session)
-) -> User:
-    """
-    JWT 토큰을 검증하고 현재 사용자를 반환합니다.
-
-    Args:
-        credentials: Bearer 토큰
-        db: 데이터베이스 세션
-
-    Returns:
-        현재 사용자 객체
-
-    Raises:
-        HTTPException: 토큰이 유효하지 않거나 사용자가 존재하지 않는 경우
-    """
+def _token_subject(credentials: HTTPAuthorizationCredentials) -> Tuple[int, str]:
+    """토큰을 검증하고 (user_id, jti)를 반환합니다. jti가 없는 이전 토큰은 빈 문자열."""
     token = credentials.credentials
 
     # 토큰 검증
@@ -43,13 +30,35 @@ async def get_current_user(
 
     # 사용자 ID 추출
     user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
+    if user_id is None or not str(user_id).isdigit():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="토큰에 사용자 정보가 없습니다",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return int(user_id), str(payload.get("jti") or "")
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_session)
+) -> User:
+    """
+    JWT 토큰을 검증하고 현재 사용자를 반환합니다.
+
+    Args:
+        credentials: Bearer 토큰
+        db: 데이터베이스 세션
+
+    Returns:
+        현재 사용자 객체
+
+    Raises:
+        HTTPException: 토큰이 유효하지 않거나 사용자가 존재하지 않는 경우
+    """
+    user_id, _jti = _token_subject(credentials)
+
     # 데이터베이스에서 사용자 조회
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -62,3 +71,51 @@ async def get_current_user(
         )
 
     return user
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_session)
+) -> Principal:
+    """
+    JWT 토큰을 검증하고 현재 사용자의 id/username만 반환합니다.
+    캐시에 있으면 DB를 조회하지 않습니다. (User 행 전체가 필요하면 get_current_user 사용)
+
+    Raises:
+        HTTPException: 토큰이 유효하지 않거나 사용자가 존재하지 않는 경우
+    """
+    user_id, jti = _token_subject(credentials)
+
+    principal = lookup_principal(user_id, jti)
+    if principal is not None:
+        return principal
+
+    cache = get_cache()
+    generation = cache.generation(user_id)
+    row = (await db.execute(select(User.id, User.username).where(User.id == user_id))).one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="사용자를 찾을 수 없습니다",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal = Principal(id=row.id, username=row.username)
+    if get_settings().auth_cache_enabled:
+        cache.put(user_id, jti, principal, generation)
+    return principal
+
+
+async def get_admin_user(current_user: Principal = Depends(get_current_principal)) -> Principal:
+    """
+    관리자(ADMIN_USERNAMES에 등록된 사용자)만 통과시킵니다.
+
+    Raises:
+        HTTPException: 관리자가 아닌 경우
+    """
+    if current_user.username not in get_settings().admin_usernames:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자만 접근할 수 있습니다",
+        )
+    return current_user
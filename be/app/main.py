@@ -6,6 +6,7 @@ from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from api.request import MessageRequest
+from api.schemas import DogInfoItemRead
 from api.response import MessageResponse
 from graph.flow import run_qa_flow
 from app.routers import dogs_router, chat_router
@@ -13,13 +14,27 @@ from app.routers.reports import router as reports_router
 from app.routers.users import router as users_router
 from app.routers.dog_info import router as dog_info_router
 from app.routers.auth import router as auth_router
+from app.routers.metrics import router as metrics_router
+from app.routers.admin import router as admin_router
+from app.middleware import MetricsMiddleware
+from core.config import get_settings
 from db.database import engine, get_session
-from db.models import Base, Dog
-from db.models import DogInfoItem
-from sqlalchemy import select
+from db.migrations import run_migrations
+from db.models import Base
 from sqlalchemy.ext.asyncio import AsyncSession
+from services.metrics import ERRORS
+from services.spans import span
+from services.loop_monitor import get_monitor
+from services.dog_context import get_dog_context
+from services.usage import UsageFlusher
+from services.chat_writer import answer_rows, get_writer, user_row
+from services.dog_info_autofill import autofill_from_history
+from services.pdf_pool import get_pdf_pool
+from services.report_jobs import get_runner as get_report_runner
 
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
 import traceback
 
 
@@ -28,7 +43,32 @@ async def lifespan(app: FastAPI):
     # 앱 시작 시 테이블 초기화
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # 기존 DB에 대한 스키마 변경(인덱스 등) 적용
+    await run_migrations(engine)
+    cfg = get_settings()
+    monitor = None
+    if cfg.loop_monitor_enabled:
+        # 루프를 막는 동기 코드 탐지 (지연 메트릭 + 원인 스택 로그)
+        monitor = get_monitor(cfg.loop_monitor_interval_ms / 1000.0, cfg.loop_lag_threshold_ms / 1000.0)
+        monitor.start()
+    usage_flusher = UsageFlusher(cfg.usage_flush_interval_s)
+    usage_flusher.start()
+    chat_writer = get_writer()
+    chat_writer.start()
+    # PDF 렌더 풀 (워커 프로세스는 첫 렌더 때 생성, import/폰트 등록은 워커당 한 번)
+    pdf_pool = get_pdf_pool()
+    pdf_pool.start()
+    # 보고서 생성 작업 워커 (시작 시 스윕으로 대기/중단 작업을 이어서 처리)
+    report_runner = get_report_runner()
+    report_runner.start()
     yield
+    # 대기 중인 QA 교환 저장을 먼저 드레인
+    await report_runner.stop()
+    await chat_writer.stop()
+    await usage_flusher.stop()
+    pdf_pool.stop()
+    if monitor is not None:
+        await monitor.stop()
 
 
 app = FastAPI(title="Shallow Mind API", version="1.0.0", lifespan=lifespan)
@@ -42,60 +82,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+settings = get_settings()
+
+# 라우트별 지연시간/오류 메트릭 수집 (/metrics로 노출) 및 요청 컨텍스트 공유
+app.add_middleware(
+    MetricsMiddleware,
+    record_metrics=settings.metrics_enabled,
+    db_stats_headers=settings.dev_mode,
+    db_query_budget=settings.db_query_budget,
+    db_repeat_threshold=settings.db_repeat_threshold,
+)
+
 # 정적 파일 서빙 (테스트용 JSON 등): /static/ 경로로 be/ 디렉터리 노출
 app.mount("/static", StaticFiles(directory=str(Path(__file__).resolve().parents[1])), name="static")
 
 
 @app.post("/v1/api/message", response_model=MessageResponse)
 async def message_endpoint(body: MessageRequest, session: AsyncSession = Depends(get_session)) -> MessageResponse:
+    # dog 조회 쿼리와 QA 플로우를 한 트레이스(스팬 트리)로 묶는다
+    with span("message_endpoint", dog_id=body.dog_id):
+        return await _handle_message(body, session)
+
+
+async def _handle_message(body: MessageRequest, session: AsyncSession) -> MessageResponse:
     try:
+        asked_at = datetime.utcnow()
         dog_ctx = None
+        auto_filled = None
         if body.dog_id is not None:
-            dog = (await session.execute(select(Dog).where(Dog.id == body.dog_id))).scalar_one_or_none()
-            if dog is not None:
-                # 저장된 dog_info (답변 있는 것만)
-                info_rows = (
-                    await session.execute(
-                        select(DogInfoItem).where(
-                            DogInfoItem.dog_id == dog.id,
-                            (DogInfoItem.answer_text.is_not(None)) & (DogInfoItem.answer_text != ""),
-                        )
-                    )
-                ).scalars().all()
-                info_list = [
-                    {
-                        "category": r.category.value if hasattr(r.category, "value") else str(r.category),
-                        "key": r.key,
-                        "question": r.question,
-                        "answer": r.answer_text,
-                        "updated_at": r.updated_at.isoformat() if r.updated_at else None,
-                    }
-                    for r in info_rows
-                ]
-
-                dog_ctx = {
-                    "id": dog.id,
-                    "user_id": dog.user_id,
-                    "name": dog.name,
-                    "breed": dog.breed,
-                    "birth_date": dog.birth_date.isoformat() if dog.birth_date else None,
-                    "sex": dog.sex.value if hasattr(dog.sex, "value") else str(dog.sex),
-                    "neutered": dog.neutered,
-                    "weight_kg": dog.weight_kg,
-                    "info": info_list,
-                }
+            # 버전 확인 후 캐시된 컨텍스트 사용 (변경 시에만 Dog/DogInfoItem 재조회)
+            dog_ctx = await get_dog_context(session, body.dog_id)
+        if body.persist and dog_ctx is not None:
+            # 사용자 턴은 답변 전에 큐에 넣는다 → 선 자동 채움(flush_for_dog 후 추출)이 이번 질문까지 본다
+            await get_writer().submit([user_row(body.dog_id, body.message, asked_at)])
+            if body.autofill:
+                auto_filled = await _autofill_before_answer(session, body.dog_id)
+                if auto_filled:
+                    # 채워진 dog_info를 에이전트 컨텍스트에 반영 (context_version이 올라가 재조회됨)
+                    dog_ctx = await get_dog_context(session, body.dog_id)
         result = await run_qa_flow(body.message, session_id=body.session_id, dog_context=dog_ctx)
+        if body.persist and dog_ctx is not None:
+            # 응답을 기다리게 하지 않도록 큐에만 넣고 백그라운드에서 묶어서 저장
+            await get_writer().submit(answer_rows(body.dog_id, result.get("results") or []))
         return MessageResponse(
             answer=result.get("answer", ""),
             tasks=result.get("tasks"),
             results=result.get("results"),
+            auto_filled=auto_filled,
         )
     except Exception as e:
         # 서버 콘솔에 전체 스택 출력 (원인 파악용)
         print("[message_endpoint] ERROR:\n" + traceback.format_exc())
+        ERRORS.inc(stage="message_endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _autofill_before_answer(session: AsyncSession, dog_id: int) -> Optional[List[DogInfoItemRead]]:
+    # 자동 채움 실패는 답변을 막지 않는다 (기존 dog_info로 진행)
+    try:
+        updated = await autofill_from_history(session, dog_id)
+    except Exception as e:
+        await session.rollback()
+        print(f"[message_endpoint] pre auto-fill failed: {e!r}")
+        ERRORS.inc(stage="pre_autofill")
+        return None
+    return [DogInfoItemRead.model_validate(r) for r in updated]
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -108,4 +161,7 @@ app.include_router(chat_router)
 app.include_router(users_router)
 app.include_router(dog_info_router)
 app.include_router(reports_router)
+app.include_router(admin_router)
+if settings.metrics_enabled:
+    app.include_router(metrics_router)
 
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+
+from services.db_stats import begin_query_stats, check_query_stats, current_query_stats, end_query_stats
+from services.metrics import ERRORS, HTTP_REQUEST_DURATION
+from services.request_context import current_route, reset_request_scope, set_request_scope
+
+
+class MetricsMiddleware:
+    """라우트 템플릿 단위로 HTTP 지연시간/오류를 기록하는 ASGI 미들웨어.
+
+    요청 scope를 컨텍스트로 공유하는 역할도 하므로 메트릭을 끈 경우에도 설치됩니다.
+    BaseHTTPMiddleware 대신 순수 ASGI로 구현해 요청당 오버헤드를 최소화합니다.
+    """
+
+    def __init__(
+        self,
+        app,
+        record_metrics: bool = True,
+        db_stats_headers: bool = False,
+        db_query_budget: int = 10,
+        db_repeat_threshold: int = 3,
+    ) -> None:
+        self.app = app
+        self.record_metrics = record_metrics
+        # 요청별 DB 쿼리 수/행 수/시간을 X-DB-* 응답 헤더로 노출 (개발 모드)
+        self.db_stats_headers = db_stats_headers
+        self.db_query_budget = db_query_budget
+        self.db_repeat_threshold = db_repeat_threshold
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats_token = begin_query_stats()
+        stats = current_query_stats()
+
+        async def _send(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.db_stats_headers:
+                    # 헤더 전송 시점까지의 값 (스트리밍 본문에서 실행된 쿼리는 제외)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"x-db-rows", str(stats.rows).encode()),
+                        (b"x-db-time-ms", f"{stats.time_ms:.1f}".encode()),
+                    ]
+            await send(message)
+
+        t0 = time.perf_counter()
+        # 하위 코드(LLM 사용량 집계 등)가 요청의 라우트를 알 수 있도록 scope를 공유
+        token = set_request_scope(scope)
+        try:
+            await self.app(scope, receive, _send)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            # FastAPI는 매칭된 APIRoute를 scope["route"]에 넣는다 (경로 파라미터 제외한 템플릿)
+            route = current_route()
+            reset_request_scope(token)
+            end_query_stats(stats_token)
+            check_query_stats(stats, route, self.db_query_budget, self.db_repeat_threshold)
+            if self.record_metrics:
+                HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - t0, method=scope["method"], route=route, status=str(status_code)
+                )
+                if status_code >= 500:
+                    ERRORS.inc(stage="http")
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_admin_user
+from db.database import get_session
+from services.auth_cache import Principal
+from services.profiler import StackSampler
+from services.usage import query_rollups
+
+
+router = APIRouter(prefix="/v1/admin", tags=["admin"])
+
+# 동시에 여러 프로파일이 돌면 서로의 샘플을 왜곡하므로 워커당 하나만 허용
+_profile_lock = asyncio.Lock()
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=120, description="샘플링 시간(초)"),
+    interval_ms: float = Query(10.0, ge=1, le=200, description="샘플링 간격(ms)"),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    admin: Principal = Depends(get_admin_user),
+):
+    """
+    이 워커 프로세스를 N초 동안 샘플링 프로파일링합니다.
+
+    - collapsed: flamegraph.pl/speedscope 입력용 collapsed-stack 텍스트
+    - json: collapsed 스택 + 동기 호출(retriever, PDF 렌더링, 트레이스 기록) 블로킹 추정 시간
+    """
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="이미 프로파일링이 진행 중입니다")
+    async with _profile_lock:
+        # 샘플러는 별도 스레드에서 돌고, 이 핸들러(이벤트 루프 스레드)는 대기만 한다
+        sampler = StackSampler(interval_s=interval_ms / 1000.0, loop_thread_id=threading.get_ident())
+        result = await asyncio.to_thread(sampler.run, seconds)
+    if format == "json":
+        return {**result.summary(), "collapsed": result.collapsed()}
+    return Response(content=result.collapsed() + "\n", media_type="text/plain; charset=utf-8")
+
+
+@router.get("/usage")
+async def usage(
+    days: int = Query(7, ge=1, le=90, description="조회 기간(오늘 포함 일 수)"),
+    admin: Principal = Depends(get_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    LLM 토큰 사용량/지연 롤업을 에이전트별, 엔드포인트별, 일자별로 반환합니다.
+
+    DB에 합산된 값에 이 워커의 아직 플러시되지 않은 값을 더해 보여줍니다.
+    """
+    return await query_rollups(session, days)
@@ -6,9 +6,18 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.schemas import ChatMessageCreate, ChatMessageRead
+from api.schemas import (
+    ChatMessageBatchCreate,
+    ChatMessageBatchResult,
+    ChatMessageCreate,
+    ChatMessagePage,
+    ChatMessageRead,
+)
 from db.database import get_session
 from db.models import ChatMessage, Dog
+from services.chat_archive import merge_messages, read_archived
+from services.chat_messages import InvalidCursor, fetch_page, insert_messages, message_error, validate_batch
+from services.chat_writer import get_writer
 
 
 router = APIRouter(prefix="/v1", tags=["chat"])
@@ -24,8 +33,9 @@ async def create_chat_message(
     if dog is None:
         raise HTTPException(status_code=404, detail="Dog not found")
 
-    if body.role == "assistant" and (body.agent is None or not body.agent.strip()):
-        raise HTTPException(status_code=400, detail="assistant 메시지는 agent가 필요합니다")
+    detail = message_error(body)
+    if detail is not None:
+        raise HTTPException(status_code=400, detail=detail)
 
     msg = ChatMessage(
         dog_id=dog_id,
@@ -39,6 +49,33 @@ async def create_chat_message(
     return ChatMessageRead.model_validate(msg)
 
 
+@router.post("/dogs/{dog_id}/chat/messages/batch", response_model=ChatMessageBatchResult, status_code=201)
+async def create_chat_messages_batch(
+    dog_id: int,
+    body: ChatMessageBatchCreate,
+    session: AsyncSession = Depends(get_session),
+) -> ChatMessageBatchResult:
+    """
+    여러 메시지를 한 트랜잭션(bulk insert 1회)으로 저장합니다.
+    검증에 실패한 항목은 errors에 index와 함께 담고 나머지는 저장합니다. (전부 실패하면 422)
+    """
+    dog = (await session.execute(select(Dog.id).where(Dog.id == dog_id))).scalar_one_or_none()
+    if dog is None:
+        raise HTTPException(status_code=404, detail="Dog not found")
+
+    valid, errors = validate_batch(body.messages)
+    if not valid:
+        raise HTTPException(status_code=422, detail=errors)
+
+    inserted = await insert_messages(session, dog_id, [b for _, b in valid])
+    await session.commit()
+    created = [
+        {"index": index, "id": message_id, "created_at": created_at}
+        for (index, _), (message_id, created_at) in zip(valid, inserted)
+    ]
+    return ChatMessageBatchResult.model_validate({"created": created, "errors": errors})
+
+
 @router.get("/dogs/{dog_id}/chat/messages", response_model=list[ChatMessageRead])
 async def list_chat_messages(
     dog_id: int,
@@ -50,15 +87,40 @@ async def list_chat_messages(
     dog = (await session.execute(select(Dog.id).where(Dog.id == dog_id))).scalar_one_or_none()
     if dog is None:
         raise HTTPException(status_code=404, detail="Dog not found")
+    # 서버 저장(persist) 대기 중인 교환이 있으면 먼저 반영
+    await get_writer().flush_for_dog(dog_id)
 
     stmt = select(ChatMessage).where(ChatMessage.dog_id == dog_id)
     if since is not None:
         stmt = stmt.where(ChatMessage.created_at >= since)
     if before is not None:
         stmt = stmt.where(ChatMessage.created_at < before)
-    stmt = stmt.order_by(ChatMessage.created_at.asc()).limit(limit)
+    # id를 보조 정렬 키로 써서 같은 시각 메시지의 순서를 고정 (복합 인덱스 순서와 동일)
+    stmt = stmt.order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc()).limit(limit)
 
     messages = (await session.execute(stmt)).scalars().all()
-    return [ChatMessageRead.model_validate(m) for m in messages]
+    # 콜드 보관된 오래된 메시지도 같은 순서로 합쳐 반환
+    archived = await read_archived(session, dog_id, limit, "asc", since=since, before=before)
+    return [ChatMessageRead.model_validate(m) for m in merge_messages(messages, archived, limit)]
+
+
+@router.get("/dogs/{dog_id}/chat/messages/page", response_model=ChatMessagePage)
+async def page_chat_messages(
+    dog_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="asc: 오래된 순, desc: 최신 순"),
+    cursor: str | None = Query(None, description="이전 응답의 next_cursor"),
+    session: AsyncSession = Depends(get_session),
+) -> ChatMessagePage:
+    """(created_at, id) 키셋 페이지네이션. 같은 시각의 메시지도 누락/중복 없이 이어서 조회합니다."""
+    dog = (await session.execute(select(Dog.id).where(Dog.id == dog_id))).scalar_one_or_none()
+    if dog is None:
+        raise HTTPException(status_code=404, detail="Dog not found")
+    await get_writer().flush_for_dog(dog_id)
+    try:
+        items, next_cursor = await fetch_page(session, dog_id, limit, order, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ChatMessagePage(items=[ChatMessageRead.model_validate(m) for m in items], next_cursor=next_cursor)
 
 
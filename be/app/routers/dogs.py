@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.schemas import DogCreate, DogRead, DogUpdate
-from app.dependencies import get_current_user
+from app.dependencies import get_current_principal
 from db.database import get_session
-from db.models import Dog, User, SexEnum
+from db.models import Dog, SexEnum
+from services.auth_cache import Principal
+from services.dog_context import bump_context_version, invalidate_dog_context
+from services.dog_info_bank import seed_dog_info
 
 
 router = APIRouter(prefix="/v1", tags=["dogs"])
@@ -17,7 +20,7 @@ router = APIRouter(prefix="/v1", tags=["dogs"])
 async def create_dog(
     body: DogCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> DogRead:
     # JWT 토큰에서 자동으로 user_id 추출하여 사용
     dog = Dog(
@@ -30,6 +33,9 @@ async def create_dog(
         weight_kg=body.weight_kg,
     )
     session.add(dog)
+    await session.flush()
+    # 기본 정보 항목은 생성 트랜잭션 안에서 한 번에 시드 (이후 조회는 읽기만 수행)
+    await seed_dog_info(session, [dog.id])
     await session.commit()
     await session.refresh(dog)
     return DogRead.model_validate(dog)
@@ -39,7 +45,7 @@ async def create_dog(
 async def get_dog(
     dog_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> DogRead:
     dog = (await session.execute(select(Dog).where(Dog.id == dog_id))).scalar_one_or_none()
     if dog is None:
@@ -57,7 +63,7 @@ async def update_dog(
     dog_id: int,
     body: DogUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> DogRead:
     dog = (await session.execute(select(Dog).where(Dog.id == dog_id))).scalar_one_or_none()
     if dog is None:
@@ -80,6 +86,7 @@ async def update_dog(
     if body.weight_kg is not None:
         dog.weight_kg = body.weight_kg
 
+    await bump_context_version(session, dog_id)
     await session.commit()
     await session.refresh(dog)
     return DogRead.model_validate(dog)
@@ -89,18 +96,21 @@ async def update_dog(
 async def delete_dog(
     dog_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Response:
-    dog = (await session.execute(select(Dog).where(Dog.id == dog_id))).scalar_one_or_none()
-    if dog is None:
+    owner_id = (await session.execute(select(Dog.user_id).where(Dog.id == dog_id))).scalar_one_or_none()
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Dog not found")
 
     # 본인 확인
-    if dog.user_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="본인의 개 정보만 삭제할 수 있습니다")
 
-    await session.delete(dog)
+    # 단일 DELETE: 메시지/정보 항목/요약/보관 세그먼트는 DB의 ON DELETE CASCADE가 지운다
+    await session.execute(delete(Dog).where(Dog.id == dog_id, Dog.user_id == current_user.id))
     await session.commit()
+    # 다른 워커의 캐시는 버전 확인 시 행이 없어 무효화된다
+    invalidate_dog_context(dog_id)
     return Response(status_code=204)
 
 
@@ -110,7 +120,7 @@ async def list_user_dogs(
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> list[DogRead]:
     # 본인 확인
     if user_id != current_user.id:
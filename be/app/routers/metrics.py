@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from services.metrics import CONTENT_TYPE_LATEST, render_latest
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    # Prometheus 스크레이프 엔드포인트 (이 워커 프로세스의 값)
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,46 +1,93 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+import asyncio
+import os
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 
+from api.schemas import ReportJobRead, ReportPage, ReportRead
 from db.database import get_session
-from services.report_md import generate_markdown, markdown_to_pdf_bytes
+from db.models import Dog, ReportJob
+from services.chat_messages import InvalidCursor
+from services.pdf_pool import PdfPoolSaturated
+from services.report_index import indexed_content_hash, page_reports
+from services.report_jobs import ReportJobConflict, submit_job
+from services.report_pdf import ensure_pdf, file_pdf_key, pdf_cache_key
 from core.config import get_settings
 
 
 router = APIRouter(prefix="/v1", tags=["reports"])
 
 
-@router.post("/dogs/{dog_id}/reports/md")
-async def create_report_md(dog_id: int, session: AsyncSession = Depends(get_session)) -> dict:
-    try:
-        meta = await generate_markdown(session, dog_id)
-        # 미리 PDF URL도 알려주기
-        return {"ok": True, **meta, "url_pdf": f"/v1/reports/{meta['filename']}/pdf"}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.get("/dogs/{dog_id}/reports")
-async def list_reports(dog_id: int) -> list[dict]:
+def _report_links(filename: str) -> dict:
     settings = get_settings()
     be_root = Path(__file__).resolve().parents[2]
     reports_dir = Path(settings.reports_dir)
     if not reports_dir.is_absolute():
         reports_dir = be_root / reports_dir
-    if not reports_dir.exists():
-        return []
-    items = []
-    for p in sorted(reports_dir.glob(f"dog_{dog_id}_*.md")):
-        rel = p.relative_to(be_root)
-        items.append({
-            "filename": p.name,
-            "url_md": f"/static/{rel.as_posix()}",
-            "url_pdf": f"/v1/reports/{p.name}/pdf",
-            "modified": p.stat().st_mtime,
-        })
-    return items
+    rel = os.path.relpath(str(reports_dir / filename), start=str(be_root))
+    return {"url_md": f"/static/{Path(rel).as_posix()}", "url_pdf": f"/v1/reports/{filename}/pdf"}
+
+
+def _job_read(job: ReportJob) -> ReportJobRead:
+    out = ReportJobRead.model_validate(job)
+    if job.filename:
+        out = out.model_copy(update=_report_links(job.filename))
+    return out
+
+
+@router.post("/dogs/{dog_id}/reports/md", response_model=ReportJobRead, status_code=202)
+async def create_report_md(
+    dog_id: int,
+    mode: Literal["incremental", "full"] = Query("incremental"),
+    session: AsyncSession = Depends(get_session),
+) -> ReportJobRead:
+    # 생성(LLM 장문 출력, 30~60초)은 백그라운드 작업으로, 여기서는 작업만 등록하고 바로 반환
+    # 같은 강아지의 작업이 진행 중이면 그 작업을 돌려준다 (대기 중 incremental → full 요청 시 full로 변경, 실행 중이면 409)
+    # mode=incremental: 직전 보고서 이후 변경분으로 바뀐 섹션만 갱신 (불가능하면 전체), full: 항상 전체 생성
+    dog = (await session.execute(select(Dog.id).where(Dog.id == dog_id))).scalar_one_or_none()
+    if dog is None:
+        raise HTTPException(status_code=404, detail="Dog not found")
+    try:
+        job, _created = await submit_job(session, dog_id, mode)
+    except ReportJobConflict:
+        raise HTTPException(status_code=409, detail="이 강아지의 증분 보고서가 이미 생성 중입니다. 완료 후 다시 요청해 주세요")
+    return _job_read(job)
+
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJobRead)
+async def get_report_job(job_id: str, session: AsyncSession = Depends(get_session)) -> ReportJobRead:
+    job = (await session.execute(select(ReportJob).where(ReportJob.id == job_id))).scalar_one_or_none()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_read(job)
+
+
+@router.get("/dogs/{dog_id}/reports", response_model=ReportPage)
+async def list_reports(
+    dog_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="이전 응답의 next_cursor"),
+    session: AsyncSession = Depends(get_session),
+) -> ReportPage:
+    """최신순 보고서 목록 (reports 인덱스 조회, 디렉터리를 읽지 않음)"""
+    dog = (await session.execute(select(Dog.id).where(Dog.id == dog_id))).scalar_one_or_none()
+    if dog is None:
+        raise HTTPException(status_code=404, detail="Dog not found")
+    try:
+        rows, next_cursor = await page_reports(session, dog_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    items = [
+        ReportRead.model_validate(r).model_copy(update={**_report_links(r.filename), "pdf_cached": r.pdf_key is not None})
+        for r in rows
+    ]
+    return ReportPage(items=items, next_cursor=next_cursor)
 
 
 @router.get("/reports/{filename}")
@@ -57,7 +104,7 @@ async def get_report_md(filename: str) -> Response:
 
 
 @router.get("/reports/{filename}/pdf")
-async def get_report_pdf(filename: str) -> Response:
+async def get_report_pdf(filename: str, request: Request) -> Response:
     settings = get_settings()
     be_root = Path(__file__).resolve().parents[2]
     reports_dir = Path(settings.reports_dir)
@@ -66,8 +113,35 @@ async def get_report_pdf(filename: str) -> Response:
     fpath = (reports_dir / filename).resolve()
     if not fpath.exists() or fpath.suffix.lower() != ".md":
         raise HTTPException(status_code=404, detail="Not found")
-    md_text = fpath.read_text(encoding="utf-8")
-    pdf_bytes = markdown_to_pdf_bytes(md_text)
-    return Response(content=pdf_bytes, media_type="application/pdf")
+    # ETag = 마크다운 해시 + 렌더러 지문 해시 (PDF 캐시 파일 이름과 같은 key)
+    # 마크다운 해시는 보고서 인덱스에서 읽고, 인덱스에 없는 파일만 스레드에서 파일을 읽어 해시
+    md_hash = await indexed_content_hash(fpath.name)
+    etag = pdf_cache_key(md_hash) if md_hash else await asyncio.to_thread(file_pdf_key, fpath)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": f"private, max-age={settings.report_pdf_max_age_s}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    # 캐시 미스면 렌더 풀(별도 프로세스)에서 렌더링, 풀이 가득 차면 503
+    try:
+        pdf = await ensure_pdf(fpath, etag)
+    except PdfPoolSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF 렌더링 요청이 많습니다. 잠시 후 다시 시도해 주세요",
+            headers={"Retry-After": str(settings.pdf_render_retry_after_s)},
+        )
+    headers["ETag"] = f'"{pdf.etag}"'
+    return FileResponse(pdf.path, media_type="application/pdf", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/").strip('"') for t in if_none_match.split(",")]
+    return etag in tags
 
 
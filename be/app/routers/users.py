@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.schemas import UserCreate, UserRead, UserUpdate
-from app.dependencies import get_current_user
+from app.dependencies import get_current_principal, get_current_user
 from db.database import get_session
 from db.models import User
+from services.auth_cache import Principal, invalidate_user
 
 
 router = APIRouter(prefix="/v1", tags=["users"])
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/v1", tags=["users"])
 async def create_user(
     body: UserCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> UserRead:
     """이 엔드포인트는 더 이상 사용되지 않습니다. /v1/auth/signup을 사용하세요."""
     raise HTTPException(status_code=410, detail="이 엔드포인트는 더 이상 지원되지 않습니다. /v1/auth/signup을 사용하세요.")
@@ -28,7 +29,7 @@ async def create_user(
 async def get_user(
     user_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> UserRead:
     # 본인 확인
     if current_user.id != user_id:
@@ -45,7 +46,7 @@ async def update_user(
     user_id: int,
     body: UserUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> UserRead:
     # 본인 확인
     if current_user.id != user_id:
@@ -55,6 +56,7 @@ async def update_user(
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
+    renamed = body.username is not None and body.username != user.username
     if body.username is not None:
         user.username = body.username
 
@@ -63,6 +65,8 @@ async def update_user(
     except IntegrityError:
         await session.rollback()
         raise HTTPException(status_code=409, detail="username이 이미 존재합니다")
+    if renamed:
+        invalidate_user(user_id)
     await session.refresh(user)
     return UserRead.model_validate(user)
 
@@ -71,17 +75,18 @@ async def update_user(
 async def delete_user(
     user_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Response:
     # 본인 확인
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="본인의 계정만 삭제할 수 있습니다")
 
-    user = (await session.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
-    if user is None:
+    # 단일 DELETE: 강아지와 그 하위 행은 DB의 ON DELETE CASCADE가 지운다 (세션에 로드하지 않음)
+    result = await session.execute(delete(User).where(User.id == user_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="User not found")
-    await session.delete(user)
     await session.commit()
+    invalidate_user(user_id)
     return Response(status_code=204)
 
 
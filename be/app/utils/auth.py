@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -53,7 +54,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(days=settings.JWT_EXPIRATION_DAYS)
 
-    to_encode.update({"exp": expire})
+    # jti: 토큰별 식별자 (인증 캐시 키로 사용)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
 
     encoded_jwt = jwt.encode(
         to_encode,
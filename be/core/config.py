@@ -21,6 +21,8 @@ class Settings(BaseSettings):
     # OpenAI 설정
     openai_api_key: str = Field(default="", validation_alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", validation_alias="OPENAI_MODEL")
+    # OpenAI 호환 로컬 서버 주소 (예: http://localhost:8001/v1), 비우면 OpenAI API
+    openai_base_url: str = Field(default="", validation_alias="OPENAI_BASE_URL")
     embeddings_model: str = Field(
         default="text-embedding-3-large", validation_alias="EMBEDDINGS_MODEL"
     )
@@ -32,12 +34,99 @@ class Settings(BaseSettings):
     max_subtasks: int = Field(default=4, validation_alias="MAX_SUBTASKS")
     chroma_persist_dir: str = Field(default="storage/chroma", validation_alias="CHROMA_PERSIST_DIR")
     reports_dir: str = Field(default="report", validation_alias="REPORTS_DIR")
+    # 성능 측정용 스텁 백엔드: openai|stub, chroma|stub (services/stubs.py)
+    llm_backend: str = Field(default="openai", pattern="^(openai|stub)$", validation_alias="LLM_BACKEND")
+    vector_backend: str = Field(default="chroma", pattern="^(chroma|stub)$", validation_alias="VECTOR_BACKEND")
+    stub_llm_latency_ms: float = Field(default=0.0, ge=0, validation_alias="STUB_LLM_LATENCY_MS")
+    # 스텁 LLM 토큰 처리 속도 (프롬프트/출력 토큰 수에 비례하는 지연, 0이면 고정 지연만)
+    stub_llm_prefill_tps: float = Field(default=0.0, ge=0, validation_alias="STUB_LLM_PREFILL_TPS")
+    stub_llm_decode_tps: float = Field(default=0.0, ge=0, validation_alias="STUB_LLM_DECODE_TPS")
+    stub_embed_latency_ms: float = Field(default=0.0, ge=0, validation_alias="STUB_EMBED_LATENCY_MS")
 
     # JWT 설정
     JWT_SECRET_KEY: str = Field(default="your-secret-key-change-this-in-production", validation_alias="JWT_SECRET_KEY")
     JWT_ALGORITHM: str = Field(default="HS256", validation_alias="JWT_ALGORITHM")
     JWT_EXPIRATION_DAYS: int = Field(default=7, validation_alias="JWT_EXPIRATION_DAYS")
 
+    # 관리자 엔드포인트(/v1/admin/*) 접근 허용 사용자명 (JSON 배열 또는 콤마 구분)
+    admin_usernames: Union[str, List[str]] = Field(default_factory=list, validation_alias="ADMIN_USERNAMES")
+
+    # 관측(메트릭) 설정
+    metrics_enabled: bool = Field(default=True, validation_alias="METRICS_ENABLED")
+    spans_enabled: bool = Field(default=True, validation_alias="SPANS_ENABLED")
+    # tail 기반 트레이스 샘플링: 오류/지연(ms) 초과는 항상 보존, 나머지는 비율만큼 보존
+    trace_sample_rate: float = Field(default=1.0, ge=0.0, le=1.0, validation_alias="TRACE_SAMPLE_RATE")
+    trace_slow_ms: float = Field(default=10000.0, validation_alias="TRACE_SLOW_MS")
+    # 이벤트 루프 지연 모니터: interval마다 지연 측정, threshold 초과 시 블로킹 스택 기록
+    loop_monitor_enabled: bool = Field(default=True, validation_alias="LOOP_MONITOR_ENABLED")
+    loop_monitor_interval_ms: float = Field(default=50.0, gt=0, validation_alias="LOOP_MONITOR_INTERVAL_MS")
+    loop_lag_threshold_ms: float = Field(default=100.0, gt=0, validation_alias="LOOP_LAG_THRESHOLD_MS")
+    # DB 프로파일: production이면 SQLite는 WAL/synchronous=NORMAL/busy_timeout/mmap/cache,
+    # Postgres(asyncpg)는 커넥션 풀/pre-ping/statement cache 설정을 적용 (default는 드라이버 기본값)
+    db_profile: str = Field(default="production", pattern="^(default|production)$", validation_alias="DB_PROFILE")
+    sqlite_journal_mode: str = Field(default="WAL", validation_alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", validation_alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, validation_alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size: int = Field(default=268435456, ge=0, validation_alias="SQLITE_MMAP_SIZE")
+    sqlite_cache_size_kib: int = Field(default=65536, ge=0, validation_alias="SQLITE_CACHE_SIZE_KIB")
+    db_pool_size: int = Field(default=10, ge=1, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, ge=0, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_s: float = Field(default=30.0, gt=0, validation_alias="DB_POOL_TIMEOUT_S")
+    db_pool_recycle_s: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_S")
+    db_pool_pre_ping: bool = Field(default=True, validation_alias="DB_POOL_PRE_PING")
+    # asyncpg prepared statement 캐시 크기 (PgBouncer transaction 모드에서는 0)
+    db_statement_cache_size: int = Field(default=100, ge=0, validation_alias="DB_STATEMENT_CACHE_SIZE")
+    # 개발 모드: 응답 헤더(X-DB-*)와 트레이스에 요청별 DB 사용량 노출
+    dev_mode: bool = Field(default=False, validation_alias="DEV_MODE")
+    # 요청당 쿼리 수 예산 / 같은 형태 문장 반복 임계값 (초과 시 경고 로그)
+    db_query_budget: int = Field(default=10, ge=0, validation_alias="DB_QUERY_BUDGET")
+    db_repeat_threshold: int = Field(default=3, ge=2, validation_alias="DB_REPEAT_THRESHOLD")
+    # 강아지 컨텍스트 LRU 캐시 크기 / 조회 시 dogs.context_version 확인 여부 (멀티 워커면 true)
+    dog_context_cache_size: int = Field(default=1024, ge=1, validation_alias="DOG_CONTEXT_CACHE_SIZE")
+    dog_context_cache_validate: bool = Field(default=True, validation_alias="DOG_CONTEXT_CACHE_VALIDATE")
+    # 인증 principal(id/username) 캐시: (user_id, jti) 키, TTL 안에서는 요청마다 users 조회를 생략
+    auth_cache_enabled: bool = Field(default=True, validation_alias="AUTH_CACHE_ENABLED")
+    auth_cache_ttl_s: float = Field(default=60.0, gt=0, validation_alias="AUTH_CACHE_TTL_S")
+    auth_cache_size: int = Field(default=4096, ge=1, validation_alias="AUTH_CACHE_SIZE")
+    # QA 교환 write-behind 저장: 플러시 주기 / 한 번에 넣을 행 수(도달 시 즉시 플러시) / 요청 경로에서 직접 플러시할 대기 행 수
+    chat_write_interval_ms: float = Field(default=250.0, gt=0, validation_alias="CHAT_WRITE_INTERVAL_MS")
+    chat_write_batch_size: int = Field(default=200, ge=1, validation_alias="CHAT_WRITE_BATCH_SIZE")
+    chat_write_max_pending: int = Field(default=5000, ge=1, validation_alias="CHAT_WRITE_MAX_PENDING")
+    # 대화 기록 롤링 요약: 원문으로 남길 최근 메시지 수 / 접기 시작할 최소 건수 / 한 번에 요약에 쓸 최대 건수 / 요약문 최대 길이
+    history_summary_keep_tail: int = Field(default=50, ge=1, validation_alias="HISTORY_SUMMARY_KEEP_TAIL")
+    history_summary_fold_min: int = Field(default=50, ge=1, validation_alias="HISTORY_SUMMARY_FOLD_MIN")
+    history_summary_fold_max: int = Field(default=300, ge=1, validation_alias="HISTORY_SUMMARY_FOLD_MAX")
+    history_summary_max_chars: int = Field(default=2000, ge=100, validation_alias="HISTORY_SUMMARY_MAX_CHARS")
+    # 채팅 콜드 보관(scripts.archive_chat): 기준 일수 / 세그먼트당 메시지 수 / zstd 레벨 / 세그먼트 사이 대기
+    chat_archive_after_days: int = Field(default=90, ge=1, validation_alias="CHAT_ARCHIVE_AFTER_DAYS")
+    chat_archive_segment_size: int = Field(default=500, ge=1, validation_alias="CHAT_ARCHIVE_SEGMENT_SIZE")
+    chat_archive_zstd_level: int = Field(default=10, ge=1, le=22, validation_alias="CHAT_ARCHIVE_ZSTD_LEVEL")
+    chat_archive_pause_ms: float = Field(default=20.0, ge=0, validation_alias="CHAT_ARCHIVE_PAUSE_MS")
+    # 보고서 PDF 캐시: 생성 직후 미리 렌더 여부 / 다운로드 응답의 Cache-Control max-age
+    report_pdf_prerender: bool = Field(default=True, validation_alias="REPORT_PDF_PRERENDER")
+    report_pdf_max_age_s: int = Field(default=86400, ge=0, validation_alias="REPORT_PDF_MAX_AGE_S")
+    # 보고서 생성 작업: 동시 실행 워커 수 / 대기 작업 스윕 주기 / running 작업을 중단된 것으로 보는 무갱신 시간 / 최대 시도 횟수
+    report_job_workers: int = Field(default=2, ge=1, validation_alias="REPORT_JOB_WORKERS")
+    report_job_poll_s: float = Field(default=5.0, gt=0, validation_alias="REPORT_JOB_POLL_S")
+    report_job_stale_s: float = Field(default=600.0, gt=0, validation_alias="REPORT_JOB_STALE_S")
+    report_job_max_attempts: int = Field(default=2, ge=1, validation_alias="REPORT_JOB_MAX_ATTEMPTS")
+    # PDF 렌더 프로세스 풀: 워커 수(0이면 스레드) / 워커 외 대기 허용 수(초과 시 503) / 503의 Retry-After(초)
+    pdf_render_workers: int = Field(default=2, ge=0, validation_alias="PDF_RENDER_WORKERS")
+    pdf_render_max_queue: int = Field(default=8, ge=0, validation_alias="PDF_RENDER_MAX_QUEUE")
+    pdf_render_retry_after_s: int = Field(default=5, ge=1, validation_alias="PDF_RENDER_RETRY_AFTER_S")
+    # 증분 보고서: 이전 보고서 이후 새 메시지가 이보다 많거나 이전 보고서가 이보다 오래됐거나
+    # 연속 증분 횟수가 이를 넘으면 전체 재생성
+    report_incremental_max_messages: int = Field(default=200, ge=1, validation_alias="REPORT_INCREMENTAL_MAX_MESSAGES")
+    report_incremental_max_age_days: int = Field(default=30, ge=1, validation_alias="REPORT_INCREMENTAL_MAX_AGE_DAYS")
+    report_incremental_max_depth: int = Field(default=5, ge=1, validation_alias="REPORT_INCREMENTAL_MAX_DEPTH")
+    # 보고서 프롬프트의 대화 부분(요약 + 최근 메시지) 토큰 예산
+    report_history_token_budget: int = Field(default=2000, ge=200, validation_alias="REPORT_HISTORY_TOKEN_BUDGET")
+    # 전체 보고서 생성 방식: single(한 번의 긴 생성) / sectioned(섹션별 병렬 생성 + 요약 패스), 병렬 호출 상한
+    report_full_strategy: str = Field(default="single", pattern="^(single|sectioned)$", validation_alias="REPORT_FULL_STRATEGY")
+    report_section_concurrency: int = Field(default=8, ge=1, validation_alias="REPORT_SECTION_CONCURRENCY")
+    # LLM 사용량 롤업(일자×에이전트×엔드포인트)을 DB에 합산하는 주기
+    usage_flush_interval_s: float = Field(default=30.0, gt=0, validation_alias="USAGE_FLUSH_INTERVAL_S")
+
     @field_validator("agents", mode="before")
     @classmethod
     def _parse_agents(cls, v):
@@ -58,6 +147,23 @@ class Settings(BaseSettings):
             return [part.strip() for part in s.split(",") if part.strip()]
         return v
 
+    @field_validator("admin_usernames", mode="before")
+    @classmethod
+    def _parse_admin_usernames(cls, v):
+        if v is None or isinstance(v, list):
+            return v or []
+        if isinstance(v, str):
+            s = v.strip()
+            if s.startswith("["):
+                try:
+                    loaded = json.loads(s)
+                    if isinstance(loaded, list):
+                        return [str(x).strip() for x in loaded if str(x).strip()]
+                except Exception:
+                    pass
+            return [part.strip() for part in s.split(",") if part.strip()]
+        return v
+
 
 def get_settings() -> Settings:
     return Settings()
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 import os
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator, Dict, List
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Mapper
+
+from core.config import Settings, get_settings
+from services.db_stats import current_query_stats
+from services.metrics import DB_QUERY_DURATION
+from services.spans import end_span, start_span
 
 
 # 기본 경로: 프로젝트 루트의 app.db
@@ -16,10 +24,60 @@ def get_database_url() -> str:
     return os.getenv("SHALLOW_DB_URL", DEFAULT_DB_URL)
 
 
-engine = create_async_engine(get_database_url(), echo=False, future=True)
+def engine_options(url: str, cfg: Settings) -> Dict[str, Any]:
+    """백엔드/프로파일별 create_async_engine 인자."""
+    options: Dict[str, Any] = {"echo": False, "future": True}
+    if cfg.db_profile != "production":
+        return options
+    backend = make_url(url).get_backend_name()
+    if backend == "postgresql":
+        options.update(
+            pool_size=cfg.db_pool_size,
+            max_overflow=cfg.db_max_overflow,
+            pool_timeout=cfg.db_pool_timeout_s,
+            pool_recycle=cfg.db_pool_recycle_s,
+            pool_pre_ping=cfg.db_pool_pre_ping,
+            connect_args={
+                # SQLAlchemy 어댑터 캐시와 asyncpg 자체 캐시를 같은 크기로
+                "prepared_statement_cache_size": cfg.db_statement_cache_size,
+                "statement_cache_size": cfg.db_statement_cache_size,
+            },
+        )
+    elif backend == "sqlite":
+        # sqlite3.connect의 잠금 대기 시간도 busy_timeout과 맞춘다
+        options["connect_args"] = {"timeout": cfg.sqlite_busy_timeout_ms / 1000.0}
+    return options
+
+
+def sqlite_pragmas(cfg: Settings) -> List[str]:
+    pragmas = ["PRAGMA foreign_keys=ON"]
+    if cfg.db_profile == "production":
+        pragmas += [
+            # WAL: 읽기와 쓰기가 서로 막지 않고, 커밋은 WAL 파일에 순차 기록
+            f"PRAGMA journal_mode={cfg.sqlite_journal_mode}",
+            f"PRAGMA synchronous={cfg.sqlite_synchronous}",
+            f"PRAGMA busy_timeout={int(cfg.sqlite_busy_timeout_ms)}",
+            f"PRAGMA mmap_size={int(cfg.sqlite_mmap_size)}",
+            # 음수 = KiB 단위
+            f"PRAGMA cache_size=-{int(cfg.sqlite_cache_size_kib)}",
+        ]
+    return pragmas
+
+
+_DB_SETTINGS = get_settings()
+engine = create_async_engine(get_database_url(), **engine_options(get_database_url(), _DB_SETTINGS))
 AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
 
 
+def dialect_insert():
+    """현재 엔진 dialect의 insert (on_conflict_do_update/do_nothing 지원: SQLite, Postgres)."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     session: AsyncSession = AsyncSessionLocal()
     try:
@@ -28,15 +86,63 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
-# SQLite 외래키 강제 활성화 (CASCADE 등 동작 위해 필요)
+# SQLite 외래키 강제 활성화 (CASCADE 등 동작 위해 필요) + 프로파일별 PRAGMA
 @event.listens_for(engine.sync_engine, "connect")
 def _set_sqlite_pragma(dbapi_connection, connection_record):
+    if engine.dialect.name != "sqlite":
+        return
     try:
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for pragma in sqlite_pragmas(_DB_SETTINGS):
+            cursor.execute(pragma)
         cursor.close()
     except Exception:
         # best-effort
         pass
 
 
+def _statement_operation(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    op = head[0].lower() if head else "other"
+    return op if op in ("select", "insert", "update", "delete") else "other"
+
+
+# 쿼리 실행 시간 측정 (메트릭 + 활성 트레이스가 있으면 db.query 스팬)
+# SQLAlchemy async 어댑터는 greenlet에 contextvar를 전달하므로 요청의 스팬 컨텍스트가 그대로 보인다
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sp = start_span("db.query", **{"db.operation": _statement_operation(statement), "db.statement": statement[:300]})
+    conn.info.setdefault("query_start_time", []).append((time.perf_counter(), sp))
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("query_start_time")
+    if not stack:
+        return
+    t0, sp = stack.pop()
+    elapsed = time.perf_counter() - t0
+    operation = _statement_operation(statement)
+    DB_QUERY_DURATION.observe(elapsed, operation=operation)
+    end_span(sp)
+    stats = current_query_stats()
+    if stats is not None:
+        # SELECT의 rowcount는 드라이버마다 -1이므로 행 수는 ORM load 이벤트로 센다
+        stats.record_query(statement, elapsed, cursor.rowcount if operation != "select" else -1)
+
+
+@event.listens_for(Mapper, "load")
+def _on_orm_load(target, context):
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record_rows()
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(exception_context):
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 여기서 정리
+    conn = exception_context.connection
+    stack = conn.info.get("query_start_time") if conn is not None else None
+    if stack:
+        _, sp = stack.pop()
+        end_span(sp, error=repr(exception_context.original_exception))
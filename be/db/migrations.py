@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db.models import Base
+from services.dog_info_bank import QUESTION_BANK_VERSION, backfill_question_bank
+
+
+logger = logging.getLogger(__name__)
+
+# create_all로 처리되지 않는 기존 DB 스키마 변경 (인덱스 교체, 컬럼 추가, 데이터 백필 등)
+# - 각 단계는 재실행해도 안전해야 한다 (IF NOT EXISTS 등)
+# - 적용 기록은 schema_migrations 테이블에 남긴다
+# - 앱 시작 시 create_all 다음에 실행
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _chat_messages_composite_index(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_chat_messages_dog_created_id "
+            "ON chat_messages (dog_id, created_at, id)"
+        )
+    )
+    # 복합 인덱스의 선두 컬럼과 겹치는 단일 인덱스는 제거
+    conn.execute(text("DROP INDEX IF EXISTS ix_chat_messages_dog_id"))
+
+
+def _dogs_context_version(conn: Connection) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns("dogs")}
+    if "context_version" not in columns:
+        conn.execute(text("ALTER TABLE dogs ADD COLUMN context_version INTEGER NOT NULL DEFAULT 0"))
+
+
+def _chat_messages_dog_id_index(conn: Connection) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_chat_messages_dog_id_id ON chat_messages (dog_id, id)"))
+
+
+def _fk_on_delete_cascade(conn: Connection) -> None:
+    # 강아지/사용자 삭제는 단일 DELETE + DB CASCADE에 의존하므로, 모델에 CASCADE로 선언된 외래키가
+    # 실제 DB에도 CASCADE인지 확인한다. PostgreSQL은 제약을 다시 만들고, SQLite는 테이블 재생성이
+    # 필요하므로 경고만 남긴다.
+    insp = inspect(conn)
+    existing = set(insp.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        declared = {
+            (fk.parent.name, fk.column.table.name)
+            for fk in table.foreign_keys
+            if (fk.ondelete or "").upper() == "CASCADE"
+        }
+        for fk in insp.get_foreign_keys(table.name):
+            cols = fk["constrained_columns"]
+            if len(cols) != 1 or (cols[0], fk["referred_table"]) not in declared:
+                continue
+            if (fk.get("options", {}).get("ondelete") or "").upper() == "CASCADE":
+                continue
+            if conn.dialect.name == "postgresql" and fk.get("name"):
+                conn.execute(
+                    text(
+                        f'ALTER TABLE {table.name} DROP CONSTRAINT "{fk["name"]}", '
+                        f'ADD CONSTRAINT "{fk["name"]}" FOREIGN KEY ({cols[0]}) '
+                        f'REFERENCES {fk["referred_table"]} ({fk["referred_columns"][0]}) ON DELETE CASCADE'
+                    )
+                )
+            else:
+                logger.warning(
+                    "%s.%s -> %s has no ON DELETE CASCADE; recreate the table to enable bulk deletes",
+                    table.name,
+                    cols[0],
+                    fk["referred_table"],
+                )
+
+
+def _report_jobs_incremental(conn: Connection) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns("report_jobs")}
+    added = {
+        "mode": "VARCHAR(20) NOT NULL DEFAULT 'incremental'",
+        "generated_mode": "VARCHAR(20)",
+        "last_message_id": "INTEGER",
+        "incremental_depth": "INTEGER NOT NULL DEFAULT 0",
+    }
+    for name, ddl in added.items():
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE report_jobs ADD COLUMN {name} {ddl}"))
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_chat_messages_dog_created_id", _chat_messages_composite_index),
+    ("0002_dogs_context_version", _dogs_context_version),
+    ("0003_chat_messages_dog_id_id", _chat_messages_dog_id_index),
+    ("0004_fk_on_delete_cascade", _fk_on_delete_cascade),
+    ("0005_report_jobs_incremental", _report_jobs_incremental),
+    # 질문 은행 버전이 오르면 새 이름으로 한 번 더 실행되어 추가된 질문을 일괄 백필
+    (f"dog_info_bank_v{QUESTION_BANK_VERSION}", backfill_question_bank),
+]
+
+
+def _applied_versions(conn: Connection) -> set:
+    _metadata.create_all(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars().all())
+
+
+def _apply_one(conn: Connection, version: str, step: Callable[[Connection], None]) -> None:
+    step(conn)
+    conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+
+
+async def run_migrations(engine: AsyncEngine) -> List[str]:
+    async with engine.begin() as conn:
+        applied = await conn.run_sync(_applied_versions)
+    done: List[str] = []
+    for version, step in MIGRATIONS:
+        if version in applied:
+            continue
+        # 단계마다 별도 트랜잭션: 다른 워커가 먼저 적용했다면 기록 충돌로 롤백하고 넘어간다
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(_apply_one, version, step)
+        except IntegrityError:
+            continue
+        logger.info("applied migration %s", version)
+        done.append(version)
+    return done
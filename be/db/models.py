@@ -11,12 +11,13 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from typing import Optional, List
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint, text
 
 
 class Base(DeclarativeBase):
@@ -39,7 +40,10 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    dogs: Mapped[List["Dog"]] = relationship("Dog", back_populates="owner", cascade="all, delete-orphan")
+    # 자식 행 삭제는 DB의 ON DELETE CASCADE에 맡긴다 (passive_deletes: 삭제 전에 자식을 로드하지 않음)
+    dogs: Mapped[List["Dog"]] = relationship(
+        "Dog", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class Dog(Base):
@@ -54,6 +58,8 @@ class Dog(Base):
     sex: Mapped[SexEnum] = mapped_column(Enum(SexEnum), default=SexEnum.unknown)
     neutered: Mapped[bool] = mapped_column(Boolean, default=False)
     weight_kg: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # 강아지 정보/정보 항목이 바뀔 때마다 증가 (dog_context 캐시 검증용)
+    context_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -66,13 +72,25 @@ class Dog(Base):
         passive_deletes=True,
         order_by="ChatMessage.created_at",
     )
+    info_items: Mapped[List["DogInfoItem"]] = relationship(
+        "DogInfoItem",
+        back_populates="dog",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # 강아지별 시간순 조회/키셋 페이지네이션용 (dog_id 단독 조회도 이 인덱스로 처리)
+        Index("ix_chat_messages_dog_created_id", "dog_id", "created_at", "id"),
+        # 롤링 요약 워터마크(id) 이후 구간 조회용
+        Index("ix_chat_messages_dog_id_id", "dog_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    dog_id: Mapped[int] = mapped_column(ForeignKey("dogs.id", ondelete="CASCADE"), index=True)
+    dog_id: Mapped[int] = mapped_column(ForeignKey("dogs.id", ondelete="CASCADE"))
 
     role: Mapped[str] = mapped_column(String(20))  # 'user' | 'assistant'
     content: Mapped[str] = mapped_column(Text)
@@ -110,6 +128,123 @@ class DogInfoItem(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    dog: Mapped["Dog"] = relationship("Dog")
+    dog: Mapped["Dog"] = relationship("Dog", back_populates="info_items")
+
+
+class DogHistorySummary(Base):
+    """강아지별 대화 기록 롤링 요약 (last_message_id 이하의 메시지를 요약/집계)"""
+
+    __tablename__ = "dog_history_summaries"
+
+    dog_id: Mapped[int] = mapped_column(ForeignKey("dogs.id", ondelete="CASCADE"), primary_key=True)
+    # 워터마크: 이 id 이하의 메시지는 아래 집계/요약에 반영됨
+    last_message_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    user_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    first_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    summary_text: Mapped[str] = mapped_column(Text, default="", nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ChatArchiveSegment(Base):
+    """오래된 채팅 메시지 묶음 (zstd 압축 JSON). 원래 메시지 id/시각을 그대로 보존"""
+
+    __tablename__ = "chat_archive_segments"
+    __table_args__ = (
+        Index("ix_chat_archive_segments_dog_first_at", "dog_id", "first_at"),
+        Index("ix_chat_archive_segments_dog_last_id", "dog_id", "last_message_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dog_id: Mapped[int] = mapped_column(ForeignKey("dogs.id", ondelete="CASCADE"))
+    first_message_id: Mapped[int] = mapped_column(Integer)
+    last_message_id: Mapped[int] = mapped_column(Integer)
+    first_at: Mapped[datetime] = mapped_column(DateTime)
+    last_at: Mapped[datetime] = mapped_column(DateTime)
+    message_count: Mapped[int] = mapped_column(Integer)
+    user_count: Mapped[int] = mapped_column(Integer)
+    codec: Mapped[str] = mapped_column(String(20), default="zstd")
+    raw_bytes: Mapped[int] = mapped_column(Integer)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        # 강아지당 진행 중(queued/running) 작업은 하나만 → 중복 제출은 기존 작업으로 합친다
+        Index(
+            "uq_report_jobs_active_dog",
+            "dog_id",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        # 재시작 복구/대기 작업 스윕용
+        Index("ix_report_jobs_status_created", "status", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)  # uuid4 hex
+    dog_id: Mapped[int] = mapped_column(ForeignKey("dogs.id", ondelete="CASCADE"))
+    status: Mapped[str] = mapped_column(String(20), default="queued")  # queued|running|succeeded|failed
+    stage: Mapped[Optional[str]] = mapped_column(String(30), nullable=True)
+    progress: Mapped[int] = mapped_column(Integer, default=0)  # 0~100
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    filename: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # 증분 생성: 요청 모드(incremental|full) / 실제 생성 방식(full|incremental|unchanged)
+    mode: Mapped[str] = mapped_column(String(20), default="incremental", server_default="incremental")
+    generated_mode: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    # 이 보고서에 반영된 마지막 채팅 메시지 id / 마지막 전체 생성 이후 연속 증분 횟수
+    last_message_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    incremental_depth: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class Report(Base):
+    """생성된 보고서 파일 인덱스 (목록 조회는 디렉터리 대신 이 테이블을 읽는다)"""
+
+    __tablename__ = "reports"
+    __table_args__ = (
+        # 강아지별 최신순 키셋 페이지네이션
+        Index("ix_reports_dog_created_id", "dog_id", "created_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dog_id: Mapped[int] = mapped_column(ForeignKey("dogs.id", ondelete="CASCADE"))
+    filename: Mapped[str] = mapped_column(String(255), unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    size_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    content_hash: Mapped[str] = mapped_column(String(64))  # sha256(마크다운 바이트)
+    # 렌더된 PDF 캐시의 key (services/report_pdf.py), 아직 렌더 전이면 None
+    pdf_key: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    pdf_rendered_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class LlmUsageRollup(Base):
+    """일자 × 에이전트 × 엔드포인트 단위 LLM 토큰/지연 누적 집계"""
+
+    __tablename__ = "llm_usage_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "agent", "endpoint", name="uq_llm_usage_day_agent_endpoint"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, index=True)
+    agent: Mapped[str] = mapped_column(String(50))
+    endpoint: Mapped[str] = mapped_column(String(200))
+
+    calls: Mapped[int] = mapped_column(Integer, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    cached_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    latency_ms_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    latency_ms_max: Mapped[float] = mapped_column(Float, default=0.0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
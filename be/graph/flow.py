@@ -12,7 +12,9 @@ from langgraph.graph import START, END, StateGraph
 
 from core.config import get_settings
 from services.agents import AgentManager
-from services.llm import get_chat_model
+from services.llm import get_chat_model, llm_agent
+from services.metrics import AGENT_STAGE_DURATION, GRAPH_NODE_DURATION, QA_FLOW_DURATION, timed
+from services.spans import set_trace_sampled, span, spans_file_path, traced
 
 
 class AgentUse(BaseModel):
@@ -35,6 +37,7 @@ class QAState(TypedDict, total=False):
     trace: Dict[str, Any]
 
 
+@traced("plan_node")
 async def plan_node(state: QAState) -> QAState:
     settings = get_settings()
     manager = AgentManager(settings)
@@ -60,13 +63,14 @@ async def plan_node(state: QAState) -> QAState:
 
     structured = model.with_structured_output(Plan)
     chain = prompt | structured
-    plan: Plan = await chain.ainvoke(
-        {
-            "question": state["user_question"],
-            "agent_descriptions": manager.descriptions(),
-            "max_subtasks": settings.max_subtasks,
-        }
-    )
+    with llm_agent("planner"), timed(AGENT_STAGE_DURATION, agent="planner", stage="llm"):
+        plan: Plan = await chain.ainvoke(
+            {
+                "question": state["user_question"],
+                "agent_descriptions": manager.descriptions(),
+                "max_subtasks": settings.max_subtasks,
+            }
+        )
 
     # 선택된 에이전트에게 원문 질문 + dog_context 전달
     chosen = [au for au in plan.agents if au.use]
@@ -74,6 +78,7 @@ async def plan_node(state: QAState) -> QAState:
         {"agent": au.agent, "question": state["user_question"], "dog": state.get("dog_context")} for au in chosen
     ]
     duration_ms = (time.perf_counter() - t0) * 1000.0
+    GRAPH_NODE_DURATION.observe(duration_ms / 1000.0, node="plan")
     trace = state.get("trace", {})
     trace.setdefault("steps", {})["plan"] = {
         "started_at": start_ts,
@@ -85,6 +90,7 @@ async def plan_node(state: QAState) -> QAState:
     return {**state, "tasks": tasks, "trace": trace}
 
 
+@traced("execute_node")
 async def execute_node(state: QAState) -> QAState:
     settings = get_settings()
     manager = AgentManager(settings)
@@ -125,9 +131,10 @@ async def execute_node(state: QAState) -> QAState:
             ]
         )
         chain = prompt | model | StrOutputParser()
-        answer_text = await chain.ainvoke(
-            {"question": state["user_question"], "dog_profile": dog_profile}
-        )
+        with llm_agent("general"), timed(AGENT_STAGE_DURATION, agent="general", stage="llm"), span("general.llm"):
+            answer_text = await chain.ainvoke(
+                {"question": state["user_question"], "dog_profile": dog_profile}
+            )
 
         duration_ms = (time.perf_counter() - t0) * 1000.0
         ended_at = time.time()
@@ -145,6 +152,7 @@ async def execute_node(state: QAState) -> QAState:
     else:
         results = await manager.ask_many(tasks)
     duration_ms = (time.perf_counter() - t0) * 1000.0
+    GRAPH_NODE_DURATION.observe(duration_ms / 1000.0, node="execute")
 
     trace = state.get("trace", {})
     trace.setdefault("steps", {})["execute"] = {
@@ -179,7 +187,9 @@ def get_graph():
     return build_graph()
 
 
-from services.tracing import default_trace_envelope, write_trace
+from services.tracing import decide_sampling, default_trace_envelope, write_trace_sampled
+from services.usage import collect_request_usage, summarize_request_usage
+from services.db_stats import current_query_stats
 
 
 async def run_qa_flow(question: str, session_id: Optional[str] = None, dog_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -191,12 +201,36 @@ async def run_qa_flow(question: str, session_id: Optional[str] = None, dog_conte
     state: QAState = {"user_question": question, "session_id": session_id, "dog_context": dog_context, "trace": trace_env}
     started_at = time.time()
     t0 = time.perf_counter()
-    out = await graph.ainvoke(state)
-    total_ms = (time.perf_counter() - t0) * 1000.0
-    out_trace = out.get("trace", trace_env)
-    out_trace["total_duration_ms"] = total_ms
-    out_trace["finished_at"] = time.time()
-    write_trace(out_trace)
+    with span("run_qa_flow", **{"trace.envelope_id": trace_env["trace_id"]}) as root, collect_request_usage() as usage:
+        if root is not None:
+            # 스팬 파일(OTLP)과 기존 트레이스 봉투를 서로 찾아갈 수 있도록 연결
+            trace_env["spans"] = {"trace_id": root.trace_id, "root_span_id": root.span_id, "file": spans_file_path(root.start_ns / 1e9)}
+        try:
+            out = await graph.ainvoke(state)
+        except Exception as e:
+            # 실패한 요청은 샘플링과 무관하게 항상 트레이스를 남긴다
+            trace_env["error"] = f"{type(e).__name__}: {e}"
+            trace_env["total_duration_ms"] = (time.perf_counter() - t0) * 1000.0
+            trace_env["finished_at"] = time.time()
+            trace_env["usage"] = summarize_request_usage(usage)
+            QA_FLOW_DURATION.observe(trace_env["total_duration_ms"] / 1000.0, outcome="error")
+            write_trace_sampled(trace_env)
+            raise
+        total_ms = (time.perf_counter() - t0) * 1000.0
+        QA_FLOW_DURATION.observe(total_ms / 1000.0, outcome="ok")
+        out_trace = out.get("trace", trace_env)
+        out_trace["total_duration_ms"] = total_ms
+        out_trace["finished_at"] = time.time()
+        # 요청 단위 LLM 사용량 (에이전트별 토큰/호출 수/지연 합)
+        out_trace["usage"] = summarize_request_usage(usage)
+        settings = get_settings()
+        stats = current_query_stats()
+        if settings.dev_mode and stats is not None:
+            # 이 시점까지 요청에서 실행된 DB 쿼리 (엔드포인트의 사전 조회 포함)
+            out_trace["db"] = stats.snapshot(settings.db_repeat_threshold)
+        decision = decide_sampling(out_trace)
+        set_trace_sampled(decision[0])
+    write_trace_sampled(out_trace, decision)
     return {
         "answer": "",  # 집계 없음: 에이전트별 결과만 제공
         "tasks": out.get("tasks", []),
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+
+# 오래된 채팅 메시지를 zstd 압축 세그먼트(chat_archive_segments)로 옮기는 보관 작업
+# - 강아지마다 롤링 요약을 먼저 갱신(필요 시 LLM 1회)하고, 요약 워터마크 이하 + 기준일 이전 메시지만 이동
+# - 세그먼트 단위의 짧은 트랜잭션으로 진행하므로 서비스 중에 실행해도 된다 (cron 등으로 주기 실행)
+#
+# 사용 예:
+#   python -m scripts.archive_chat
+#   python -m scripts.archive_chat --days 30 --segment-size 1000
+
+
+def parse_args() -> argparse.Namespace:
+    from core.config import get_settings
+
+    cfg = get_settings()
+    p = argparse.ArgumentParser(description="오래된 채팅 메시지 콜드 보관")
+    p.add_argument("--days", type=int, default=cfg.chat_archive_after_days, help="이 일수보다 오래된 메시지를 보관")
+    p.add_argument("--segment-size", type=int, default=cfg.chat_archive_segment_size)
+    p.add_argument("--level", type=int, default=cfg.chat_archive_zstd_level, help="zstd 압축 레벨")
+    p.add_argument("--pause-ms", type=float, default=cfg.chat_archive_pause_ms, help="세그먼트 사이 대기(ms)")
+    return p.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    from core.config import get_settings
+    from db.database import AsyncSessionLocal, engine
+    from db.migrations import run_migrations
+    from db.models import Base
+    from services.chat_archive import archive_old_messages
+    from services.llm import get_chat_model
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations(engine)
+    t0 = time.perf_counter()
+    stats = await archive_old_messages(
+        AsyncSessionLocal,
+        get_chat_model(get_settings()),
+        args.days,
+        segment_size=args.segment_size,
+        level=args.level,
+        pause_s=args.pause_ms / 1000.0,
+    )
+    await engine.dispose()
+    ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+    print(
+        f"[archive] dogs={stats['dogs']} summarized={stats['summarized']} segments={stats['segments']} "
+        f"messages={stats['messages']} raw={stats['raw_bytes']:,}B stored={stats['stored_bytes']:,}B "
+        f"ratio={ratio:.1f}x in {time.perf_counter() - t0:.1f}s"
+    )
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
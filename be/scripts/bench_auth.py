@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+# 인증 캐시 벤치마크: GET /v1/dogs/{id} 처리량 (AUTH_CACHE_ENABLED=false vs true)
+# 모드마다 별도 프로세스/별도 SQLite DB에서 실행하고, X-DB-Queries 헤더로 요청당 쿼리 수도 확인한다
+#
+# 사용 예:
+#   python -m scripts.bench_auth --requests 2000 --concurrency 16
+
+MODES = ("no-cache", "cache")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="인증 principal 캐시 유무에 따른 GET /v1/dogs/{id} 처리량")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--tokens", type=int, default=4, help="같은 사용자로 발급받을 토큰 수 (jti별 캐시 항목)")
+    # 내부용: 자식 프로세스 역할
+    p.add_argument("--role", choices=["run"], default=None, help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(int(len(s) * q), len(s) - 1)]
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from app.main import app
+    from db.database import engine
+    from db.models import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        creds = {"username": "bench-user", "password": "bench-pw"}
+        (await client.post("/v1/auth/signup", json=creds)).raise_for_status()
+        tokens = []
+        for _ in range(args.tokens):
+            resp = await client.post("/v1/auth/login", json=creds)
+            resp.raise_for_status()
+            tokens.append(resp.json()["access_token"])
+        resp = await client.post(
+            "/v1/dogs", json={"name": "bench", "sex": "unknown"}, headers={"Authorization": f"Bearer {tokens[0]}"}
+        )
+        resp.raise_for_status()
+        dog_id = resp.json()["id"]
+
+        latencies: List[float] = []
+        queries: List[int] = []
+        errors = 0
+        remaining = list(range(args.requests))
+
+        async def _loop() -> None:
+            nonlocal errors
+            while remaining:
+                n = remaining.pop()
+                headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+                t0 = time.perf_counter()
+                resp = await client.get(f"/v1/dogs/{dog_id}", headers=headers)
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+                if resp.status_code != 200:
+                    errors += 1
+                queries.append(int(resp.headers.get("x-db-queries", "0")))
+
+        started = time.perf_counter()
+        await asyncio.gather(*[_loop() for _ in range(args.concurrency)])
+        wall = time.perf_counter() - started
+    await engine.dispose()
+    print(json.dumps({
+        "wall_s": wall,
+        "latencies": latencies,
+        "errors": errors,
+        "queries_per_request": sum(queries) / max(len(queries), 1),
+    }))
+
+
+def run_mode(args: argparse.Namespace, mode: str, workdir: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update({
+        "SHALLOW_DB_URL": "sqlite+aiosqlite:///" + os.path.join(workdir, f"{mode}.db"),
+        "AUTH_CACHE_ENABLED": "true" if mode == "cache" else "false",
+        "DEV_MODE": "true",
+        "METRICS_ENABLED": "false",
+        "SPANS_ENABLED": "false",
+        "LOOP_MONITOR_ENABLED": "false",
+    })
+    cmd = [
+        sys.executable, "-m", "scripts.bench_auth", "--role", "run",
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency), "--tokens", str(args.tokens),
+    ]
+    out = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True).stdout
+    for line in reversed(out.strip().splitlines()):
+        if line.startswith("{"):
+            return {"mode": mode, **json.loads(line)}
+    raise RuntimeError("child produced no result")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.role == "run":
+        asyncio.run(run(args))
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-auth-") as workdir:
+        for mode in MODES:
+            print(f"[bench] {mode}: {args.requests} requests x {args.concurrency} concurrency ...")
+            rows.append(run_mode(args, mode, workdir))
+    print(f"{'mode':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'queries/req':>12} {'errors':>7}")
+    for row in rows:
+        lat = row["latencies"]
+        print(
+            f"{row['mode']:<10} {len(lat) / row['wall_s']:8.1f} {percentile(lat, 0.5):8.2f} "
+            f"{percentile(lat, 0.95):8.2f} {row['queries_per_request']:12.2f} {row['errors']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from db.models import Base, ChatMessage
+from services.chat_messages import encode_cursor, keyset_page_stmt, split_page
+
+
+# 채팅 기록 조회 벤치마크: 메시지 1M개를 가진 합성 강아지 1마리 (+다른 강아지들의 노이즈)
+# - 인덱스 구성: 기존(dog_id, created_at 단일 인덱스) vs 복합(dog_id, created_at, id)
+# - 조회 방식: 기존 타임스탬프/OFFSET 페이지네이션 vs 키셋 커서
+# - 같은 시각 메시지(tie)에서 타임스탬프 페이지네이션이 놓치는 행 수도 함께 확인
+#
+# 사용 예:
+#   python -m scripts.bench_chat_history --messages 1000000
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy의 SQLite DateTime 저장 형식
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="채팅 기록 페이지네이션/인덱스 벤치마크")
+    p.add_argument("--messages", type=int, default=1_000_000, help="대상 강아지의 메시지 수")
+    p.add_argument("--noise", type=int, default=200_000, help="다른 강아지들의 메시지 수")
+    p.add_argument("--per-second", type=int, default=4, help="같은 created_at을 공유하는 메시지 수")
+    p.add_argument("--page", type=int, default=50)
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--db", default="", help="DB 파일 경로 (기본: 임시 파일)")
+    return p.parse_args()
+
+
+def build(path: str, args: argparse.Namespace) -> int:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        now = datetime.utcnow().strftime(DT_FORMAT)
+        cur.execute("INSERT INTO users (username, hashed_password, created_at, updated_at) VALUES ('bench', 'x', ?, ?)", (now, now))
+        user_id = cur.lastrowid
+        noise_dogs = 50
+        for i in range(noise_dogs + 1):
+            cur.execute(
+                "INSERT INTO dogs (user_id, name, sex, neutered, created_at, updated_at) VALUES (?, ?, 'unknown', 0, ?, ?)",
+                (user_id, f"dog{i}", now, now),
+            )
+        target = cur.lastrowid
+        base = datetime(2024, 1, 1)
+        total = args.messages + args.noise
+        # 노이즈 메시지는 대상 강아지 메시지 사이사이에 섞어 같은 시간대에 배치
+        step = max(total // max(args.noise, 1), 1)
+        chunk: List[tuple] = []
+        t0 = time.perf_counter()
+        own = 0
+        for n in range(total):
+            is_noise = args.noise and n % step == 0 and n // step < args.noise
+            if is_noise:
+                dog_id = target - 1 - (n % noise_dogs)
+                ts = base + timedelta(seconds=own // args.per_second)
+            else:
+                dog_id = target
+                ts = base + timedelta(seconds=own // args.per_second)
+                own += 1
+            chunk.append((dog_id, "user", f"message {n}", ts.strftime(DT_FORMAT)))
+            if len(chunk) >= 50_000:
+                cur.executemany("INSERT INTO chat_messages (dog_id, role, content, created_at) VALUES (?, ?, ?, ?)", chunk)
+                chunk.clear()
+        if chunk:
+            cur.executemany("INSERT INTO chat_messages (dog_id, role, content, created_at) VALUES (?, ?, ?, ?)", chunk)
+        raw.commit()
+        print(f"[build] {total:,} rows in {time.perf_counter() - t0:.1f}s (target dog {target}: {own:,} messages)")
+    finally:
+        raw.close()
+    engine.dispose()
+    return target
+
+
+def use_indexes(engine, layout: str) -> None:
+    with engine.begin() as conn:
+        if layout == "legacy":
+            conn.execute(text("DROP INDEX IF EXISTS ix_chat_messages_dog_created_id"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_chat_messages_dog_id ON chat_messages (dog_id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_chat_messages_created_at ON chat_messages (created_at)"))
+        else:
+            conn.execute(text("DROP INDEX IF EXISTS ix_chat_messages_dog_id"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_chat_messages_dog_created_id ON chat_messages (dog_id, created_at, id)"))
+        conn.execute(text("ANALYZE"))
+
+
+def timed_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def legacy_stmt(dog_id: int, limit: int, since: Optional[datetime] = None, desc: bool = False, offset: int = 0):
+    # 기존 list_chat_messages와 같은 형태
+    stmt = select(ChatMessage).where(ChatMessage.dog_id == dog_id)
+    if since is not None:
+        stmt = stmt.where(ChatMessage.created_at > since)
+    order = ChatMessage.created_at.desc() if desc else ChatMessage.created_at.asc()
+    stmt = stmt.order_by(order).limit(limit)
+    return stmt.offset(offset) if offset else stmt
+
+
+def plan(session: Session, stmt) -> str:
+    compiled = stmt.compile(session.bind, compile_kwargs={"literal_binds": True})
+    rows = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return " / ".join(r[-1] for r in rows)
+
+
+def run_queries(session: Session, dog_id: int, args: argparse.Namespace) -> Dict[str, Dict[str, object]]:
+    mid = session.execute(
+        select(ChatMessage.created_at, ChatMessage.id)
+        .where(ChatMessage.dog_id == dog_id)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+        .offset(args.messages // 2)
+        .limit(1)
+    ).one()
+    mid_cursor_asc = encode_cursor(mid.created_at, mid.id, "asc")
+    mid_cursor_desc = encode_cursor(mid.created_at, mid.id, "desc")
+    cases = {
+        "first page (asc)": (legacy_stmt(dog_id, args.page), keyset_page_stmt(dog_id, args.page, "asc")),
+        "latest page (desc)": (legacy_stmt(dog_id, args.page, desc=True), keyset_page_stmt(dog_id, args.page, "desc")),
+        "middle (since / cursor asc)": (
+            legacy_stmt(dog_id, args.page, since=mid.created_at),
+            keyset_page_stmt(dog_id, args.page, "asc", mid_cursor_asc),
+        ),
+        "middle (offset / cursor desc)": (
+            legacy_stmt(dog_id, args.page, desc=True, offset=args.messages // 2),
+            keyset_page_stmt(dog_id, args.page, "desc", mid_cursor_desc),
+        ),
+    }
+    out: Dict[str, Dict[str, object]] = {}
+    for name, (legacy, keyset) in cases.items():
+        out[name] = {
+            "legacy_ms": timed_ms(lambda: session.execute(legacy).scalars().all(), args.repeat),
+            "keyset_ms": timed_ms(lambda: session.execute(keyset).scalars().all(), args.repeat),
+            "legacy_plan": plan(session, legacy),
+            "keyset_plan": plan(session, keyset),
+        }
+        session.expunge_all()
+    return out
+
+
+def tie_check(session: Session, dog_id: int, args: argparse.Namespace, rows: int = 20_000) -> Dict[str, int]:
+    """앞쪽 rows개를 두 방식으로 끝까지 넘겨 보며 놓친 메시지 수를 센다."""
+    seen_ts = 0
+    since = None
+    while seen_ts < rows:
+        page = session.execute(legacy_stmt(dog_id, args.page, since=since)).scalars().all()
+        if not page:
+            break
+        seen_ts += len(page)
+        since = page[-1].created_at
+    expected_by_ts = session.execute(
+        select(ChatMessage.id).where(ChatMessage.dog_id == dog_id, ChatMessage.created_at <= since)
+    ).all()
+    session.expunge_all()
+
+    seen_keyset = 0
+    cursor = None
+    last = None
+    while seen_keyset < rows:
+        items, cursor = split_page(session.execute(keyset_page_stmt(dog_id, args.page, "asc", cursor)).scalars().all(), args.page, "asc")
+        seen_keyset += len(items)
+        last = items[-1] if items else last
+        if cursor is None:
+            break
+    expected_by_keyset = session.execute(
+        select(ChatMessage.id).where(ChatMessage.dog_id == dog_id, ChatMessage.created_at <= last.created_at, ChatMessage.id <= last.id)
+    ).all()
+    session.expunge_all()
+    return {
+        "timestamp_missed": len(expected_by_ts) - seen_ts,
+        "keyset_missed": len(expected_by_keyset) - seen_keyset,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    tmp = None
+    path = args.db
+    if not path:
+        tmp = tempfile.TemporaryDirectory(prefix="bench-chat-")
+        path = os.path.join(tmp.name, "chat.db")
+    try:
+        dog_id = build(path, args)
+        engine = create_engine(f"sqlite:///{path}")
+        for layout in ("legacy", "composite"):
+            use_indexes(engine, layout)
+            with Session(engine) as session:
+                results = run_queries(session, dog_id, args)
+                print(f"\n== index layout: {layout} (median of {args.repeat}, page={args.page}) ==")
+                print(f"{'case':<32} {'legacy ms':>10} {'keyset ms':>10}")
+                for name, r in results.items():
+                    print(f"{name:<32} {r['legacy_ms']:10.2f} {r['keyset_ms']:10.2f}")
+                for name, r in results.items():
+                    print(f"  [{name}] legacy: {r['legacy_plan']}")
+                    print(f"  [{name}] keyset: {r['keyset_plan']}")
+                if layout == "composite":
+                    ties = tie_check(session, dog_id, args)
+                    print(f"\ntie check (first ~20k rows, {args.per_second} messages per timestamp): {ties}")
+        engine.dispose()
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
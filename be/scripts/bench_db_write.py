@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+# 쓰기 위주 동시성 벤치마크: create_chat_message / answer_info (+선택적으로 메시지 목록 읽기)
+# 프로파일마다 별도 프로세스 P개를 띄워 같은 DB에 동시에 요청한다 (uvicorn 멀티 워커와 같은 조건)
+#
+# 사용 예:
+#   python -m scripts.bench_db_write
+#   python -m scripts.bench_db_write --procs 4 --concurrency 16 --ops 300 \
+#       --pg-url postgresql+asyncpg://user:pw@localhost/shallow_bench
+#
+# Postgres 프로파일은 테이블을 만들고 데이터를 추가하므로 벤치마크 전용 DB를 사용하세요.
+
+PROFILES = ("sqlite-default", "sqlite-production", "postgres-production")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="DB 프로파일별 쓰기 동시성 벤치마크")
+    p.add_argument("--profiles", default="sqlite-default,sqlite-production", help=f"콤마 구분: {', '.join(PROFILES)}")
+    p.add_argument("--pg-url", default="", help="postgres-production 프로파일용 SHALLOW_DB_URL")
+    p.add_argument("--procs", type=int, default=4, help="동시에 실행할 워커 프로세스 수")
+    p.add_argument("--concurrency", type=int, default=8, help="프로세스당 동시 요청 수")
+    p.add_argument("--ops", type=int, default=200, help="프로세스당 요청 수")
+    p.add_argument("--dogs", type=int, default=20)
+    p.add_argument("--read-ratio", type=float, default=0.2, help="메시지 목록 조회 비율")
+    # 내부용: 자식 프로세스 역할
+    p.add_argument("--role", choices=["setup", "worker"], default=None, help=argparse.SUPPRESS)
+    p.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    p.add_argument("--dog-ids", default="", help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(int(len(s) * q), len(s) - 1)]
+
+
+async def run_setup(args: argparse.Namespace) -> None:
+    from db.database import AsyncSessionLocal, engine
+    from db.models import Base, Dog, SexEnum, User
+    from services.dog_info_bank import seed_dog_info
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        user = User(username=f"bench-{int(time.time() * 1000)}", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        dogs = [Dog(user_id=user.id, name=f"dog{i}", sex=SexEnum.unknown) for i in range(args.dogs)]
+        session.add_all(dogs)
+        await session.flush()
+        dog_ids = [d.id for d in dogs]
+        await seed_dog_info(session, dog_ids)
+        await session.commit()
+    await engine.dispose()
+    print(json.dumps({"dog_ids": dog_ids}))
+
+
+async def run_worker(args: argparse.Namespace, dog_ids: List[int]) -> None:
+    import httpx
+
+    from app.main import app
+    from services.dog_info_bank import QUESTION_BANK
+    from db.database import engine
+
+    rng = random.Random(args.seed)
+    keys = [item["key"] for item in QUESTION_BANK]
+    latencies: Dict[str, List[float]] = {"chat": [], "info": [], "read": []}
+    errors: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.ops):
+        queue.put_nowait(None)
+
+    # import가 끝난 뒤 부모의 신호를 기다렸다가 모든 워커가 동시에 시작
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def _loop() -> None:
+            while not queue.empty():
+                queue.get_nowait()
+                dog_id = rng.choice(dog_ids)
+                r = rng.random()
+                t0 = time.perf_counter()
+                if r < args.read_ratio:
+                    kind = "read"
+                    resp = await client.get(f"/v1/dogs/{dog_id}/chat/messages", params={"limit": 50})
+                elif r < args.read_ratio + (1.0 - args.read_ratio) / 2:
+                    kind = "chat"
+                    resp = await client.post(
+                        f"/v1/dogs/{dog_id}/chat/messages", json={"role": "user", "content": "벤치마크 메시지 " * 8}
+                    )
+                else:
+                    kind = "info"
+                    resp = await client.put(f"/v1/dogs/{dog_id}/info/{rng.choice(keys)}", json={"answer": str(rng.random())})
+                latencies[kind].append((time.perf_counter() - t0) * 1000.0)
+                if resp.status_code >= 400:
+                    errors[kind] = errors.get(kind, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[_loop() for _ in range(args.concurrency)])
+        wall = time.perf_counter() - started
+    await engine.dispose()
+    print(json.dumps({"wall_s": wall, "latencies": latencies, "errors": errors}))
+
+
+def _child(args: argparse.Namespace, env: Dict[str, str], role: str, extra: List[str]) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "scripts.bench_db_write", "--role", role,
+        "--concurrency", str(args.concurrency), "--ops", str(args.ops),
+        "--dogs", str(args.dogs), "--read-ratio", str(args.read_ratio),
+    ] + extra
+    return subprocess.Popen(
+        cmd, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+
+
+def _last_json(out: str) -> Dict[str, Any]:
+    for line in reversed(out.strip().splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError("child produced no result")
+
+
+def run_profile(args: argparse.Namespace, profile: str, workdir: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update({
+        "DB_PROFILE": "default" if profile.endswith("-default") else "production",
+        "METRICS_ENABLED": "false",
+        "SPANS_ENABLED": "false",
+        "LOOP_MONITOR_ENABLED": "false",
+    })
+    if profile.startswith("postgres"):
+        if not args.pg_url:
+            raise SystemExit("postgres 프로파일에는 --pg-url이 필요합니다")
+        env["SHALLOW_DB_URL"] = args.pg_url
+    else:
+        env["SHALLOW_DB_URL"] = "sqlite+aiosqlite:///" + os.path.join(workdir, f"{profile}.db")
+
+    setup = _child(args, env, "setup", [])
+    out, _ = setup.communicate()
+    dog_ids = _last_json(out)["dog_ids"]
+
+    procs = [
+        _child(args, env, "worker", ["--seed", str(i), "--dog-ids", ",".join(map(str, dog_ids))])
+        for i in range(args.procs)
+    ]
+    for p in procs:
+        p.stdout.readline()
+    started = time.perf_counter()
+    for p in procs:
+        p.stdin.write("go\n")
+        p.stdin.flush()
+    results = [_last_json(p.communicate()[0]) for p in procs]
+    wall = time.perf_counter() - started
+
+    merged: Dict[str, List[float]] = {"chat": [], "info": [], "read": []}
+    errors: Dict[str, int] = {}
+    for r in results:
+        for kind, values in r["latencies"].items():
+            merged[kind].extend(values)
+        for kind, n in r["errors"].items():
+            errors[kind] = errors.get(kind, 0) + n
+    total = sum(len(v) for v in merged.values())
+    return {
+        "profile": profile,
+        "requests": total,
+        "wall_s": wall,
+        "latencies": merged,
+        "errors": errors,
+    }
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'profile':<22} {'req/s':>8} {'writes/s':>9} {'errors':>7} {'chat p50':>9} {'chat p95':>9} {'info p50':>9} {'info p95':>9} {'read p95':>9}")
+    for row in rows:
+        lat = row["latencies"]
+        writes = len(lat["chat"]) + len(lat["info"])
+        print(
+            f"{row['profile']:<22} {row['requests'] / row['wall_s']:8.1f} {writes / row['wall_s']:9.1f} "
+            f"{sum(row['errors'].values()):7d} "
+            f"{percentile(lat['chat'], 0.5):9.1f} {percentile(lat['chat'], 0.95):9.1f} "
+            f"{percentile(lat['info'], 0.5):9.1f} {percentile(lat['info'], 0.95):9.1f} "
+            f"{percentile(lat['read'], 0.95):9.1f}"
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    if args.role == "setup":
+        asyncio.run(run_setup(args))
+        return
+    if args.role == "worker":
+        asyncio.run(run_worker(args, [int(x) for x in args.dog_ids.split(",") if x]))
+        return
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    for p in profiles:
+        if p not in PROFILES:
+            raise SystemExit(f"알 수 없는 프로파일: {p}")
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-db-") as workdir:
+        for profile in profiles:
+            print(f"[bench] {profile}: {args.procs} procs x {args.concurrency} concurrency x {args.ops} ops ...")
+            rows.append(run_profile(args, profile, workdir))
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
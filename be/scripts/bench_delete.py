@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+
+# 강아지/사용자 삭제 벤치마크 (SQLite, 파일 DB)
+# - orm:  기존 라우터처럼 ORM 객체를 읽어 session.delete() (관계 cascade를 세션이 처리)
+#         loaded = 삭제 과정에서 세션에 적재된 ORM 객체 수
+# - bulk: 현재 라우터처럼 단일 DELETE + DB의 ON DELETE CASCADE
+# 시나리오: 메시지 N개를 가진 강아지 1마리 삭제 / 강아지 여러 마리(합계 N개)를 가진 사용자 삭제
+# bulk 강아지 삭제가 --budget-ms를 넘으면 종료 코드 1
+#
+# 사용 예:
+#   python -m scripts.bench_delete --messages 100000 --budget-ms 3000
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy의 SQLite DateTime 저장 형식
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="강아지/사용자 삭제 시간 (ORM cascade vs DB cascade)")
+    p.add_argument("--messages", type=int, default=100_000, help="삭제 대상 메시지 수")
+    p.add_argument("--user-dogs", type=int, default=5, help="사용자 삭제 시나리오의 강아지 수")
+    p.add_argument("--budget-ms", type=float, default=3000.0, help="bulk 강아지 삭제 허용 시간")
+    return p.parse_args()
+
+
+def build(path: str, dogs: int, messages: int) -> Tuple[int, List[int]]:
+    import sqlite3
+
+    from sqlalchemy import create_engine
+
+    from db.models import Base
+    from services.chat_archive import encode_segment
+    from services.dog_info_bank import QUESTION_BANK
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        now = datetime.utcnow().strftime(DT_FORMAT)
+        cur.execute("INSERT INTO users (username, hashed_password, created_at, updated_at) VALUES ('bench', 'x', ?, ?)", (now, now))
+        user_id = cur.lastrowid
+        base = datetime(2024, 1, 1)
+        dog_ids: List[int] = []
+        per_dog = messages // dogs
+        for d in range(dogs):
+            cur.execute(
+                "INSERT INTO dogs (user_id, name, sex, neutered, context_version, created_at, updated_at) "
+                "VALUES (?, ?, 'unknown', 0, 0, ?, ?)",
+                (user_id, f"dog{d}", now, now),
+            )
+            dog_id = cur.lastrowid
+            dog_ids.append(dog_id)
+            cur.executemany(
+                "INSERT INTO chat_messages (dog_id, role, content, agent, created_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (dog_id, "user" if n % 2 == 0 else "assistant", f"메시지 {n}: 산책 후에 발을 자주 핥아요.",
+                     None if n % 2 == 0 else "veterinarian", (base + timedelta(seconds=n * 30)).strftime(DT_FORMAT))
+                    for n in range(per_dog)
+                ],
+            )
+            cur.executemany(
+                "INSERT INTO dog_info_items (dog_id, category, key, question, question_type, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(dog_id, q["category"].name, q["key"], q["question"], q["question_type"].name, now, now) for q in QUESTION_BANK],
+            )
+            cur.execute(
+                "INSERT INTO dog_history_summaries (dog_id, last_message_id, message_count, user_count, summary_text, updated_at) "
+                "VALUES (?, 0, 0, 0, '', ?)",
+                (dog_id, now),
+            )
+
+            class _Row:
+                def __init__(self, n: int) -> None:
+                    self.id, self.role, self.agent, self.content = n, "user", None, f"보관 {n}"
+                    self.created_at = base - timedelta(days=365, seconds=-n)
+
+            rows = [_Row(n) for n in range(500)]
+            payload, raw = encode_segment(rows)
+            cur.execute(
+                "INSERT INTO chat_archive_segments (dog_id, first_message_id, last_message_id, first_at, last_at, "
+                "message_count, user_count, codec, raw_bytes, payload, created_at) VALUES (?, 0, 499, ?, ?, 500, 500, 'zstd', ?, ?, ?)",
+                (dog_id, rows[0].created_at.strftime(DT_FORMAT), rows[-1].created_at.strftime(DT_FORMAT), raw, payload, now),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    return user_id, dog_ids
+
+
+async def delete_once(path: str, mode: str, target: str, target_id: int) -> Dict[str, float]:
+    from sqlalchemy import delete, event, func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from db.models import Base, ChatArchiveSegment, ChatMessage, Dog, DogHistorySummary, DogInfoItem, User
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _fk_on(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    make_session = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    model = Dog if target == "dog" else User
+    statements = 0
+    loaded = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*_args):
+        nonlocal statements
+        statements += 1
+
+    def _loaded(*_args):
+        nonlocal loaded
+        loaded += 1
+
+    # 세션에 적재된 ORM 객체 수 (삭제 후 identity map에서 빠지므로 load 이벤트로 센다)
+    event.listen(Base, "load", _loaded, propagate=True)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    async with make_session() as session:
+        if mode == "orm":
+            obj = (await session.execute(select(model).where(model.id == target_id))).scalar_one()
+            await session.delete(obj)
+        else:
+            await session.execute(delete(model).where(model.id == target_id))
+        await session.commit()
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    event.remove(Base, "load", _loaded)
+
+    async with make_session() as session:
+        left = 0
+        for m in (ChatMessage, DogInfoItem, DogHistorySummary, ChatArchiveSegment, Dog):
+            left += (await session.execute(select(func.count()).select_from(m))).scalar_one()
+    await engine.dispose()
+    return {"ms": elapsed_ms, "peak_kib": peak / 1024.0, "statements": statements, "loaded": loaded, "left": left}
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    results: List[Tuple[str, str, Dict[str, float]]] = []
+    with tempfile.TemporaryDirectory(prefix="bench-delete-") as workdir:
+        scenarios = [("dog", 1), ("user", args.user_dogs)]
+        for target, dogs in scenarios:
+            template = os.path.join(workdir, f"{target}-template.db")
+            print(f"[bench] building {target} scenario: {dogs} dog(s), {args.messages:,} messages ...")
+            user_id, dog_ids = build(template, dogs, args.messages)
+            for mode in ("orm", "bulk"):
+                path = os.path.join(workdir, f"{target}-{mode}.db")
+                shutil.copy(template, path)
+                target_id = dog_ids[0] if target == "dog" else user_id
+                results.append((target, mode, await delete_once(path, mode, target, target_id)))
+
+    print(f"\n{'target':>6} {'mode':>5} {'delete ms':>10} {'peak KiB':>9} {'stmts':>6} {'loaded':>7} {'rows left':>10}")
+    for target, mode, r in results:
+        print(
+            f"{target:>6} {mode:>5} {r['ms']:10.1f} {r['peak_kib']:9.0f} {int(r['statements']):6d} "
+            f"{int(r['loaded']):7d} {int(r['left']):10d}"
+        )
+    bulk_dog = next(r for t, m, r in results if t == "dog" and m == "bulk")
+    ok = bulk_dog["ms"] <= args.budget_ms and bulk_dog["left"] == 0
+    print(f"\nbulk dog delete: {bulk_dog['ms']:.1f} ms (budget {args.budget_ms:.0f} ms) -> {'OK' if ok else 'FAIL'}")
+    return 0 if ok else 1
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SPANS_ENABLED", "false")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
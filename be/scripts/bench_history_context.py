@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+
+# 보고서 컨텍스트 구성(collect_context) 벤치마크: 메시지 100 / 10k / 100k개
+# - legacy: 기존처럼 강아지의 전체 메시지를 읽어 최근 300/50개를 자르고 파이썬에서 집계
+# - summary (cold): 요약이 아직 없을 때 (최근 LIMIT + 집계 쿼리 1회)
+# - refresh: 첫 요약 접기 비용 (stub LLM, 집계는 SQL)
+# - summary (steady): 요약 이후 새 메시지 20개가 쌓인 상태 (평소 보고서 생성 시)
+#
+# 사용 예:
+#   python -m scripts.bench_history_context --sizes 100,10000,100000
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy의 SQLite DateTime 저장 형식
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="collect_context 대화 기록 구성 시간 (기존 vs 롤링 요약)")
+    p.add_argument("--sizes", default="100,10000,100000", help="콤마 구분 메시지 수")
+    p.add_argument("--repeat", type=int, default=10)
+    return p.parse_args()
+
+
+def build(path: str, messages: int) -> int:
+    import sqlite3
+
+    from sqlalchemy import create_engine
+
+    from db.models import Base
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        now = datetime.utcnow().strftime(DT_FORMAT)
+        cur.execute("INSERT INTO users (username, hashed_password, created_at, updated_at) VALUES ('bench', 'x', ?, ?)", (now, now))
+        cur.execute(
+            "INSERT INTO dogs (user_id, name, sex, neutered, context_version, created_at, updated_at) "
+            "VALUES (?, 'bench', 'unknown', 0, 0, ?, ?)",
+            (cur.lastrowid, now, now),
+        )
+        dog_id = cur.lastrowid
+        base = datetime(2024, 1, 1)
+        rows = []
+        for n in range(messages):
+            ts = (base + timedelta(seconds=n * 30)).strftime(DT_FORMAT)
+            if n % 2 == 0:
+                rows.append((dog_id, "user", f"질문 {n}: 요즘 산책 후에 발을 자주 핥아요. 괜찮을까요?", None, ts))
+            else:
+                rows.append((dog_id, "assistant", f"답변 {n}: 발바닥 피부염이나 알레르기 가능성이 있습니다. " * 3, "veterinarian", ts))
+        cur.executemany("INSERT INTO chat_messages (dog_id, role, content, agent, created_at) VALUES (?, ?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+    return dog_id
+
+
+async def legacy_history(session, dog_id: int) -> Dict[str, object]:
+    # 기존 collect_context의 대화 기록 부분
+    from sqlalchemy import select
+
+    from db.models import ChatMessage
+
+    messages = (
+        await session.execute(select(ChatMessage).where(ChatMessage.dog_id == dog_id).order_by(ChatMessage.created_at.asc()))
+    ).scalars().all()
+    history_lines: List[str] = []
+    for m in messages[-300:]:
+        who = "사용자" if m.role == "user" else (m.agent or "assistant")
+        history_lines.append(f"[{who}] {m.content}")
+    return {
+        "history_text": "\n".join(history_lines),
+        "total": len(messages),
+        "user_count": sum(1 for m in messages if m.role == "user"),
+        "tail": [m.content for m in messages[-50:]],
+    }
+
+
+async def timed_ms(make_session, fn: Callable[..., Awaitable[object]], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        async with make_session() as session:
+            t0 = time.perf_counter()
+            await fn(session)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+async def run_size(messages: int, repeat: int, workdir: str) -> Dict[str, float]:
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from core.config import get_settings
+    from db.models import ChatMessage
+    from services.history_summary import load_history, refresh_summary
+    from services.llm import get_chat_model
+    from services.report_md import collect_context
+
+    path = os.path.join(workdir, f"history-{messages}.db")
+    dog_id = build(path, messages)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    make_session = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    llm = get_chat_model(get_settings())
+    out: Dict[str, float] = {}
+
+    out["legacy_ms"] = await timed_ms(make_session, lambda s: legacy_history(s, dog_id), repeat)
+    out["cold_ms"] = await timed_ms(make_session, lambda s: load_history(s, dog_id, tail_limit=300), repeat)
+
+    async with make_session() as session:
+        t0 = time.perf_counter()
+        await refresh_summary(session, dog_id, llm)
+        await session.commit()
+        out["refresh_ms"] = (time.perf_counter() - t0) * 1000.0
+        # 요약 이후 새 메시지 20개
+        last = datetime(2024, 1, 1) + timedelta(seconds=messages * 30)
+        await session.execute(
+            insert(ChatMessage),
+            [
+                {"dog_id": dog_id, "role": "user", "content": f"새 질문 {i}", "created_at": last + timedelta(seconds=i)}
+                for i in range(20)
+            ],
+        )
+        await session.commit()
+
+    out["steady_ms"] = await timed_ms(make_session, lambda s: load_history(s, dog_id, tail_limit=300), repeat)
+    out["collect_context_ms"] = await timed_ms(make_session, lambda s: collect_context(s, dog_id), repeat)
+
+    async with make_session() as session:
+        view = await load_history(session, dog_id, tail_limit=300)
+        legacy = await legacy_history(session, dog_id)
+        out["total_matches"] = float(view.total == legacy["total"] and view.user_count == legacy["user_count"])
+    await engine.dispose()
+    return out
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-history-") as workdir:
+        for n in sizes:
+            print(f"[bench] {n:,} messages ...")
+            rows.append((n, await run_size(n, args.repeat, workdir)))
+    print(
+        f"\n{'messages':>9} {'legacy ms':>10} {'cold ms':>9} {'refresh ms':>11} {'steady ms':>10} "
+        f"{'collect_context ms':>19} {'stats ok':>9}"
+    )
+    for n, r in rows:
+        print(
+            f"{n:>9,} {r['legacy_ms']:10.2f} {r['cold_ms']:9.2f} {r['refresh_ms']:11.2f} {r['steady_ms']:10.2f} "
+            f"{r['collect_context_ms']:19.2f} {'yes' if r['total_matches'] else 'NO':>9}"
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    # 요약 접기는 stub LLM으로 (네트워크/토큰 비용 없이 DB/구성 비용만 측정)
+    os.environ.setdefault("LLM_BACKEND", "stub")
+    os.environ.setdefault("SPANS_ENABLED", "false")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
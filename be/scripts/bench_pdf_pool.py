@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+# PDF 렌더링 중 채팅 지연 벤치마크
+# - 채팅 요청(POST 메시지 + GET 목록)을 순차로 반복하며 지연을 재고, 동시에 캐시되지 않은 보고서 PDF를 N개 요청
+# - inline:  기존 핸들러처럼 이벤트 루프에서 직접 렌더
+# - thread:  PDF_RENDER_WORKERS=0 (스레드 렌더, GIL 경합)
+# - process: PDF_RENDER_WORKERS=2 (렌더 프로세스 풀)
+# 모드마다 별도 프로세스/별도 SQLite DB/별도 보고서 디렉터리에서 실행
+#
+# 사용 예:
+#   python -m scripts.bench_pdf_pool --renders 6 --lines 400
+
+MODES = ("inline", "thread", "process")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="동시 PDF 렌더링 중 채팅 요청 지연 (루프 직접 vs 스레드 vs 프로세스 풀)")
+    p.add_argument("--renders", type=int, default=6, help="동시에 요청할 (캐시되지 않은) PDF 수")
+    p.add_argument("--lines", type=int, default=400, help="보고서 한 개의 목록 항목 수 (렌더 비용)")
+    p.add_argument("--idle-requests", type=int, default=100, help="렌더 없이 잴 채팅 요청 수")
+    # 내부용: 자식 프로세스 역할
+    p.add_argument("--role", choices=["run"], default=None, help=argparse.SUPPRESS)
+    p.add_argument("--mode", choices=MODES, default="process", help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(int(len(s) * q), len(s) - 1)]
+
+
+def report_markdown(n: int, lines: int) -> str:
+    rows = "\n".join(f"| {i} | 산책 후 발바닥을 자주 핥음 | 피부염 의심, 2주 관찰 권고 |" for i in range(lines // 4))
+    items = "\n".join(f"- 항목 {i}: 식욕 정상, 음수량 증가 (업데이트: 2025-11-02)" for i in range(lines))
+    return f"# 진료 참고 보고서 {n}\n\n## 요약\n\n| # | 관찰 | 권고 |\n|---|---|---|\n{rows}\n\n## 상세\n\n{items}\n"
+
+
+def _use_inline_render() -> None:
+    # 기존 get_report_pdf처럼 이벤트 루프 안에서 직접 렌더 (비교 기준)
+    from services import pdf_pool
+
+    async def render(self, md_text: str) -> bytes:
+        return pdf_pool._render(md_text)[0]
+
+    pdf_pool.PdfRenderPool.render = render  # type: ignore[method-assign]
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from app.main import app
+    from core.config import get_settings
+
+    if args.mode == "inline":
+        _use_inline_render()
+    reports_dir = get_settings().reports_dir
+    os.makedirs(reports_dir, exist_ok=True)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            creds = {"username": "bench-user", "password": "bench-pw"}
+            (await client.post("/v1/auth/signup", json=creds)).raise_for_status()
+            token = (await client.post("/v1/auth/login", json=creds)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            resp = await client.post("/v1/dogs", json={"name": "bench", "sex": "unknown"}, headers=headers)
+            resp.raise_for_status()
+            dog_id = resp.json()["id"]
+
+            filenames = []
+            for n in range(args.renders + 1):
+                name = f"dog_{dog_id}_bench_{n}.md"
+                with open(os.path.join(reports_dir, name), "w", encoding="utf-8") as f:
+                    f.write(report_markdown(n, args.lines))
+                filenames.append(name)
+            # 워커 기동/폰트 등록 비용은 측정에서 제외 (첫 보고서로 예열)
+            (await client.get(f"/v1/reports/{filenames.pop()}/pdf")).raise_for_status()
+
+            async def chat_once() -> float:
+                t0 = time.perf_counter()
+                r1 = await client.post(
+                    f"/v1/dogs/{dog_id}/chat/messages", json={"role": "user", "content": "산책 후 발을 핥아요"}, headers=headers
+                )
+                r2 = await client.get(f"/v1/dogs/{dog_id}/chat/messages", params={"limit": 20}, headers=headers)
+                if r1.status_code >= 400 or r2.status_code >= 400:
+                    raise RuntimeError(f"chat failed: {r1.status_code}/{r2.status_code}")
+                return (time.perf_counter() - t0) * 1000.0
+
+            idle = [await chat_once() for _ in range(args.idle_requests)]
+
+            statuses: List[int] = []
+
+            async def download(name: str) -> None:
+                r = await client.get(f"/v1/reports/{name}/pdf")
+                statuses.append(r.status_code)
+
+            busy: List[float] = []
+            started = time.perf_counter()
+            downloads = asyncio.gather(*[download(name) for name in filenames])
+            while not downloads.done():
+                busy.append(await chat_once())
+            await downloads
+            wall = time.perf_counter() - started
+
+    print(json.dumps({"idle": idle, "busy": busy, "render_wall_s": wall, "statuses": statuses}))
+
+
+def run_mode(args: argparse.Namespace, mode: str, workdir: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update({
+        "SHALLOW_DB_URL": "sqlite+aiosqlite:///" + os.path.join(workdir, f"{mode}.db"),
+        "REPORTS_DIR": os.path.join(workdir, f"reports-{mode}"),
+        "PDF_RENDER_WORKERS": "0" if mode == "thread" else "2",
+        "PDF_RENDER_MAX_QUEUE": str(args.renders),
+        "REPORT_PDF_PRERENDER": "false",
+        "DEV_MODE": "true",
+        "LLM_BACKEND": "stub",
+        "VECTOR_BACKEND": "stub",
+        "METRICS_ENABLED": "false",
+        "SPANS_ENABLED": "false",
+        "LOOP_MONITOR_ENABLED": "false",
+    })
+    cmd = [
+        sys.executable, "-m", "scripts.bench_pdf_pool", "--role", "run", "--mode", mode,
+        "--renders", str(args.renders), "--lines", str(args.lines), "--idle-requests", str(args.idle_requests),
+    ]
+    out = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True).stdout
+    for line in reversed(out.strip().splitlines()):
+        if line.startswith("{"):
+            return {"mode": mode, **json.loads(line)}
+    raise RuntimeError("child produced no result")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.role == "run":
+        asyncio.run(run(args))
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-pdf-") as workdir:
+        for mode in MODES:
+            print(f"[bench] {mode}: {args.renders} concurrent renders x {args.lines} lines ...")
+            rows.append(run_mode(args, mode, workdir))
+    print(
+        f"\n{'mode':<8} {'idle p50':>9} {'idle p95':>9} {'busy p50':>9} {'busy p95':>9} {'busy max':>9} "
+        f"{'chat reqs':>10} {'render s':>9} {'pdf 200/503':>12}"
+    )
+    for row in rows:
+        idle, busy = row["idle"], row["busy"]
+        ok = sum(1 for s in row["statuses"] if s == 200)
+        rejected = sum(1 for s in row["statuses"] if s == 503)
+        print(
+            f"{row['mode']:<8} {percentile(idle, 0.5):9.1f} {percentile(idle, 0.95):9.1f} "
+            f"{percentile(busy, 0.5):9.1f} {percentile(busy, 0.95):9.1f} {max(busy, default=0.0):9.1f} "
+            f"{len(busy):10d} {row['render_wall_s']:9.2f} {f'{ok}/{rejected}':>12}"
+        )
+    print("(지연 단위 ms, chat = POST 메시지 + GET 목록 20개)")
+
+
+if __name__ == "__main__":
+    main()
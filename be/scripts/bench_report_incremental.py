@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+
+# 증분 보고서 생성 벤치마크 (스텁 LLM, SQLite 파일 DB)
+# - 기준 보고서를 전체 생성한 뒤, 변경 시나리오마다 DB를 복사해 변경분을 넣고
+#   full(전체 재생성)과 incremental(직전 보고서 + 변경분) 생성을 비교
+# - 스텁 LLM 지연 = 프롬프트 토큰 / prefill-tps + 출력 토큰 / decode-tps (STUB_LLM_*_TPS)
+# - 스텁 응답은 스크립트로 지정: full은 9개 섹션 보고서, incremental은 갱신 대상 섹션만
+#
+# 사용 예:
+#   python -m scripts.bench_report_incremental --history 300 --prefill-tps 5000 --decode-tps 300
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy의 SQLite DateTime 저장 형식
+
+# (이름, 새 메시지 수, 변경된 구조화 정보 수)
+SCENARIOS: List[Tuple[str, int, int]] = [
+    ("unchanged", 0, 0),
+    ("1 info item", 0, 1),
+    ("10 messages", 10, 0),
+    ("50 msgs + 3 items", 50, 3),
+    ("200 messages", 200, 0),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="보고서 생성 토큰/시간 (전체 재생성 vs 증분 갱신)")
+    p.add_argument("--history", type=int, default=300, help="기준 보고서 이전의 대화 메시지 수")
+    p.add_argument("--prefill-tps", type=float, default=5000.0, help="스텁 LLM 프롬프트 처리 속도(토큰/초)")
+    p.add_argument("--decode-tps", type=float, default=300.0, help="스텁 LLM 출력 속도(토큰/초)")
+    p.add_argument("--section-lines", type=int, default=8, help="스텁 보고서 섹션당 줄 수")
+    return p.parse_args()
+
+
+def section_text(title: str, lines: int, tag: str) -> str:
+    body = "\n".join(
+        f"- {title.split(' (')[0]} 관찰 {i + 1}: 산책 후 발을 핥는 빈도 증가, 식욕은 유지 ({tag}, 업데이트: 2025-11-02)"
+        for i in range(lines)
+    )
+    return f"# {title}\n\n{body}"
+
+
+def full_report(lines: int) -> str:
+    from services.report_md import REPORT_SECTIONS
+
+    toc = "\n".join(f"- [{title}](#{key})" for key, title in REPORT_SECTIONS)
+    head = f"# 진료 보고서 - bench (#1)\n\n생성시각: {datetime.utcnow():%Y-%m-%d %H:%M} UTC\n\n## 목차\n\n{toc}"
+    return "\n\n".join([head] + [section_text(title, lines, "전체") for _, title in REPORT_SECTIONS])
+
+
+def incremental_answer(keys: List[str], lines: int) -> str:
+    from services.report_md import REPORT_SECTIONS
+
+    titles = dict(REPORT_SECTIONS)
+    return "\n\n".join(section_text(titles[key], lines, "증분") for key in keys)
+
+
+def build(path: str, history: int) -> None:
+    import sqlite3
+
+    from sqlalchemy import create_engine
+
+    from db.models import Base
+    from services.dog_info_bank import QUESTION_BANK
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        old = (datetime.utcnow() - timedelta(days=3)).strftime(DT_FORMAT)
+        cur.execute("INSERT INTO users (username, hashed_password, created_at, updated_at) VALUES ('bench', 'x', ?, ?)", (old, old))
+        cur.execute(
+            "INSERT INTO dogs (id, user_id, name, breed, sex, neutered, weight_kg, context_version, created_at, updated_at) "
+            "VALUES (1, ?, 'bench', '말티즈', 'female', 1, 3.2, 0, ?, ?)",
+            (cur.lastrowid, old, old),
+        )
+        cur.executemany(
+            "INSERT INTO dog_info_items (dog_id, category, key, question, question_type, answer_text, source, created_at, updated_at) "
+            "VALUES (1, ?, ?, ?, ?, ?, 'user', ?, ?)",
+            [
+                (q["category"].name, q["key"], q["question"], q["question_type"].name,
+                 f"답변 {i}: 하루 두 번, 사료 위주" if i % 2 == 0 else None, old, old)
+                for i, q in enumerate(QUESTION_BANK)
+            ],
+        )
+        base = datetime.utcnow() - timedelta(days=2)
+        cur.executemany(
+            "INSERT INTO chat_messages (dog_id, role, content, agent, created_at) VALUES (1, ?, ?, ?, ?)",
+            [
+                ("user" if n % 2 == 0 else "assistant",
+                 f"메시지 {n}: 산책 후에 발을 자주 핥고 밤에 긁는 소리가 나요. 사료를 바꾼 지 2주 됐어요.",
+                 None if n % 2 == 0 else "veterinarian", (base + timedelta(seconds=n * 30)).strftime(DT_FORMAT))
+                for n in range(history)
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def apply_changes(path: str, messages: int, items: int) -> None:
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        now = datetime.utcnow().strftime(DT_FORMAT)
+        cur.executemany(
+            "INSERT INTO chat_messages (dog_id, role, content, agent, created_at) VALUES (1, ?, ?, ?, ?)",
+            [
+                ("user" if n % 2 == 0 else "assistant", f"새 메시지 {n}: 오늘은 구토를 한 번 했어요.",
+                 None if n % 2 == 0 else "veterinarian", now)
+                for n in range(messages)
+            ],
+        )
+        if items:
+            cur.execute(
+                "UPDATE dog_info_items SET answer_text = '새 답변: 간식 줄임', updated_at = ? "
+                "WHERE id IN (SELECT id FROM dog_info_items WHERE dog_id = 1 ORDER BY id LIMIT ?)",
+                (now, items),
+            )
+            # 라우터의 bump_context_version과 같이 강아지 행도 갱신된다
+            cur.execute("UPDATE dogs SET context_version = context_version + 1, updated_at = ? WHERE id = 1", (now,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def token_totals() -> Tuple[float, float]:
+    from services.metrics import LLM_TOKENS
+
+    prompt = completion = 0.0
+    for (_agent, kind), value in LLM_TOKENS.collect().items():
+        if kind == "prompt":
+            prompt += value
+        elif kind == "completion":
+            completion += value
+    return prompt, completion
+
+
+async def generate(path: str, answers: Dict[str, str], previous: Any) -> Dict[str, Any]:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from services.report_md import generate_markdown
+    from services.stubs import StubScript, stub_script
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    make_session = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    p0, c0 = token_totals()
+    t0 = time.perf_counter()
+    with stub_script(StubScript(answers=answers)):
+        async with make_session() as session:
+            meta = await generate_markdown(session, 1, previous=previous)
+    elapsed = time.perf_counter() - t0
+    p1, c1 = token_totals()
+    await engine.dispose()
+    return {**meta, "s": elapsed, "prompt": p1 - p0, "completion": c1 - c0}
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from services.report_md import PreviousReport, affected_sections
+
+    full_answer = full_report(args.section_lines)
+    rows: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+    with tempfile.TemporaryDirectory(prefix="bench-report-") as workdir:
+        template = os.path.join(workdir, "template.db")
+        print(f"[bench] building dog with {args.history} messages ...")
+        build(template, args.history)
+        basis_at = datetime.utcnow()
+        base = await generate(template, {"report": full_answer}, None)
+        previous = PreviousReport(
+            filename=base["filename"],
+            path=Path(base["path"]),
+            basis_at=basis_at,
+            last_message_id=base["last_message_id"],
+            depth=0,
+        )
+        await asyncio.sleep(0.01)  # 변경분의 updated_at이 기준 시각보다 뒤가 되도록
+        for name, messages, items in SCENARIOS:
+            path = os.path.join(workdir, f"{len(rows)}.db")
+            shutil.copy(template, path)
+            apply_changes(path, messages, items)
+            categories = ["diet"] if items else []  # QUESTION_BANK 앞쪽 항목은 식습관
+            keys = affected_sections(bool(items), categories, bool(messages))
+            answers = {"report": full_answer, "report_incremental": incremental_answer(keys, args.section_lines)}
+            incremental = await generate(path, answers, previous)
+            full = await generate(path, answers, None)
+            rows.append((name, full, incremental))
+
+    print(
+        f"\n{'scenario':<20} {'mode':<12} {'prompt tok':>10} {'compl tok':>10} {'seconds':>8} "
+        f"{'prompt %':>9} {'time %':>7}"
+    )
+    for name, full, inc in rows:
+        print(f"{name:<20} {'full':<12} {full['prompt']:10.0f} {full['completion']:10.0f} {full['s']:8.2f}")
+        pct_p = 100.0 * inc["prompt"] / full["prompt"] if full["prompt"] else 0.0
+        pct_t = 100.0 * inc["s"] / full["s"] if full["s"] else 0.0
+        print(
+            f"{'':<20} {inc['mode']:<12} {inc['prompt']:10.0f} {inc['completion']:10.0f} {inc['s']:8.2f} "
+            f"{pct_p:8.1f}% {pct_t:6.1f}%"
+        )
+    print(f"(스텁 LLM: prefill {args.prefill_tps:.0f} tok/s, decode {args.decode_tps:.0f} tok/s, 토큰 = 2자당 1토큰 추정)")
+    return 0
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.update({
+        "LLM_BACKEND": "stub",
+        "VECTOR_BACKEND": "stub",
+        "STUB_LLM_PREFILL_TPS": str(args.prefill_tps),
+        "STUB_LLM_DECODE_TPS": str(args.decode_tps),
+        "REPORTS_DIR": tempfile.mkdtemp(prefix="bench-report-md-"),
+    })
+    os.environ.setdefault("SPANS_ENABLED", "false")
+    try:
+        code = asyncio.run(main_async(args))
+    finally:
+        shutil.rmtree(os.environ["REPORTS_DIR"], ignore_errors=True)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+
+# 보고서 프롬프트 토큰 벤치마크 (LLM 호출 없음, SQLite 파일 DB)
+# - legacy:  기존 generate_markdown 프롬프트 (info_text + 타임라인 + JSON 4종 + history_tail repr)
+# - compact: 현재 프롬프트 (services/report_context.py, 사실마다 한 번 + 대화 토큰 예산)
+# 대화 규모별로 같은 DB 상태에서 두 프롬프트를 만들어 전체/구조화 정보/대화 부분 토큰을 비교
+# 토큰 수는 tiktoken(모델 인코딩)이 있으면 그것으로, 없으면 2자당 1토큰 추정
+#
+# 사용 예:
+#   python -m scripts.bench_report_prompt --tails 20,100,300 --budget 2000
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy의 SQLite DateTime 저장 형식
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="보고서 프롬프트 토큰 (기존 vs 압축 컨텍스트)")
+    p.add_argument("--tails", default="20,100,300", help="요약 이후 쌓인 최근 메시지 수 (콤마 구분)")
+    p.add_argument("--summarized", type=int, default=2000, help="롤링 요약에 이미 반영된 메시지 수")
+    p.add_argument("--budget", type=int, default=None, help="대화 토큰 예산 (기본: REPORT_HISTORY_TOKEN_BUDGET)")
+    return p.parse_args()
+
+
+def build(path: str, summarized: int, tail: int) -> None:
+    import sqlite3
+
+    from sqlalchemy import create_engine
+
+    from db.models import Base
+    from services.dog_info_bank import QUESTION_BANK
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        base = datetime.utcnow() - timedelta(days=60)
+        now = datetime.utcnow().strftime(DT_FORMAT)
+        cur.execute("INSERT INTO users (username, hashed_password, created_at, updated_at) VALUES ('bench', 'x', ?, ?)", (now, now))
+        cur.execute(
+            "INSERT INTO dogs (id, user_id, name, breed, sex, neutered, weight_kg, context_version, created_at, updated_at) "
+            "VALUES (1, ?, 'bench', '말티즈', 'female', 1, 3.2, 0, ?, ?)",
+            (cur.lastrowid, now, now),
+        )
+        cur.executemany(
+            "INSERT INTO dog_info_items (dog_id, category, key, question, question_type, answer_text, source, created_at, updated_at) "
+            "VALUES (1, ?, ?, ?, ?, ?, 'user', ?, ?)",
+            [
+                (q["category"].name, q["key"], q["question"], q["question_type"].name,
+                 (f"하루 두 번, 건사료 위주로 급여하고 간식은 저녁에 조금 ({i})" if i % 3 else None),
+                 now, (base + timedelta(days=i)).strftime(DT_FORMAT))
+                for i, q in enumerate(QUESTION_BANK)
+            ],
+        )
+        total = summarized + tail
+        rows = []
+        for n in range(total):
+            user = n % 2 == 0
+            text = (
+                f"{n}번째 질문: 산책 후에 발을 자주 핥고 밤에 긁는 소리가 나요. 사료를 바꾼 지 2주 됐어요."
+                if user
+                else f"{n}번째 답변: 발 핥기는 알레르기성 피부염, 지루함, 통증 등 여러 원인이 있습니다. "
+                "발가락 사이 붉은기나 냄새가 있는지 확인하고, 사료 변경 시점과 겹친다면 식이 알레르기도 의심할 수 있어요. "
+                "증상이 2주 이상 지속되면 내원해 피부 검사를 받아 보세요."
+            )
+            rows.append(("user" if user else "assistant", text, None if user else "veterinarian",
+                         (base + timedelta(minutes=n * 10)).strftime(DT_FORMAT)))
+        cur.executemany("INSERT INTO chat_messages (dog_id, role, content, agent, created_at) VALUES (1, ?, ?, ?, ?)", rows)
+        summary = ("발 핥기/긁기 반복, 사료 변경 2주 경과, 식이 알레르기 및 피부염 의심으로 관찰 중. " * 40)[:2000]
+        cur.execute(
+            "INSERT INTO dog_history_summaries (dog_id, last_message_id, message_count, user_count, first_at, last_at, "
+            "summary_text, updated_at) VALUES (1, ?, ?, ?, ?, ?, ?, ?)",
+            (summarized, summarized, (summarized + 1) // 2, rows[0][3], rows[max(summarized - 1, 0)][3], summary, now),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def legacy_human(ctx: Dict[str, Any]) -> Tuple[str, str, str]:
+    """기존 generate_markdown의 human 프롬프트 (전체, 구조화 정보 부분, 대화 부분)"""
+    dog, owner, history = ctx["dog"], ctx["owner"], ctx["history"]
+    answered, missing, info_lines, all_items = [], [], [], []
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+    for it in ctx["info_items"]:
+        row = {
+            "category": it.category.value,
+            "key": it.key,
+            "question": it.question,
+            "type": it.question_type.value,
+            "answer": it.answer_text,
+            "source": it.source,
+            "updated_at": it.updated_at.isoformat() if it.updated_at else None,
+        }
+        all_items.append(row)
+        by_category.setdefault(it.category.value, []).append(row)
+        label = f"{it.category.value}:{it.key}"
+        if it.answer_text is None or str(it.answer_text).strip() == "":
+            missing.append(row)
+            info_lines.append(f"- {label}: (미답변)")
+        else:
+            answered.append(row)
+            info_lines.append(f"- {label}: {it.answer_text}")
+    timeline = "\n".join(
+        f"- {r['category']}:{r['key']}: {r['answer']}" + (f" (업데이트: {r['updated_at'].split('T')[0]})" if r["updated_at"] else "")
+        for r in sorted(answered, key=lambda r: r["updated_at"] or "", reverse=True)
+    ) or "(최근 업데이트 기록 없음)"
+    tail = [
+        {"role": ("user" if m.role == "user" else (m.agent or "assistant")), "text": m.content, "ts": m.created_at.isoformat()}
+        for m in history.tail[-50:]
+    ]
+    stats = (
+        f"요약대상 총 {history.total}건, 구간={(history.first_at.isoformat() if history.first_at else None, history.last_at.isoformat() if history.last_at else None)}, "
+        f"사용자={history.user_count}, 어시스턴트={history.assistant_count}"
+    )
+    info = (
+        f"[구조화 정보 요약]\n{chr(10).join(info_lines)}\n\n"
+        f"[데이터 입력/업데이트 타임라인]\n(최근순)\n{timeline}\n\n"
+        f"[구조화 정보(세부)]\n- answered: {json.dumps(answered, ensure_ascii=False)}\n- missing: {json.dumps(missing, ensure_ascii=False)}\n"
+        f"- by_category: {json.dumps(by_category, ensure_ascii=False)}\n- dog_info_items(raw): {json.dumps(all_items, ensure_ascii=False)}\n\n"
+    )
+    talk = (f"[이전 대화 요약]\n{history.summary_text}\n\n" if history.summary_text else "") + f"[히스토리(최근 50건)]\n{tail}\n\n"
+    from services.report_context import profile_text
+    from services.report_md import FULL_REPORT_FORMAT
+
+    human = (
+        f"[제목]\n진료 보고서 - {dog.name} (#{dog.id})\n\n"
+        f"[환자 기본정보]\n{profile_text(dog, ctx['dog_age_years'])}\n"
+        f"[보호자]\n- id: {owner.id}\n- username: {owner.username}\n\n"
+        + info
+        + f"[히스토리 정보]\n{stats}\n\n"
+        + talk
+        + FULL_REPORT_FORMAT
+    )
+    return human, info, talk
+
+
+async def measure(path: str, budget: int) -> Dict[str, Any]:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from services.report_context import build_report_context, count_tokens
+    from services.report_md import FULL_REPORT_SYSTEM, collect_context, full_report_prompt
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    make_session = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    async with make_session() as session:
+        ctx = await collect_context(session, 1)
+    await engine.dispose()
+
+    human, info, talk = legacy_human(ctx)
+    rc = build_report_context(ctx["dog"], ctx["owner"], ctx["dog_age_years"], ctx["info_items"], ctx["history"], budget)
+    compact = full_report_prompt(rc)[1][1]
+    system = count_tokens(FULL_REPORT_SYSTEM)
+    return {
+        "legacy": {"total": system + count_tokens(human), "info": count_tokens(info), "history": count_tokens(talk),
+                   "messages": min(len(ctx["history"].tail), 50)},
+        "compact": {"total": system + count_tokens(compact),
+                    "info": count_tokens(rc.info_table + rc.missing), "history": count_tokens(rc.history_text()),
+                    "messages": rc.recent_count},
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    from core.config import get_settings
+    from services.report_context import warm_token_counter
+
+    budget = args.budget or get_settings().report_history_token_budget
+    counter = await asyncio.to_thread(warm_token_counter)
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-report-prompt-") as workdir:
+        for tail in [int(x) for x in args.tails.split(",") if x]:
+            path = os.path.join(workdir, f"tail-{tail}.db")
+            build(path, args.summarized, tail)
+            rows.append((tail, await measure(path, budget)))
+
+    print(f"\n{'tail msgs':>9} {'variant':<8} {'total tok':>10} {'info tok':>9} {'history tok':>12} {'msgs in prompt':>15}")
+    for tail, r in rows:
+        for name in ("legacy", "compact"):
+            m = r[name]
+            print(f"{tail:9d} {name:<8} {m['total']:10d} {m['info']:9d} {m['history']:12d} {m['messages']:15d}")
+        saved = 100.0 * (1 - r["compact"]["total"] / r["legacy"]["total"]) if r["legacy"]["total"] else 0.0
+        print(f"{'':9} {'saved':<8} {saved:9.1f}%")
+    print(f"(토큰 계수: {counter}, 대화 예산 {budget} 토큰, 요약에 반영된 메시지 {args.summarized}건)")
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SPANS_ENABLED", "false")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+
+# 전체 보고서 생성 벤치마크: single(한 번의 긴 생성) vs sectioned(섹션별 병렬 생성 + 요약 패스)
+# - 같은 DB(구조화 정보 + 롤링 요약 + 최근 대화)를 복사해 방식마다 자식 프로세스에서 --runs회 생성
+#   (REPORT_FULL_STRATEGY는 설정 캐시 때문에 프로세스 단위로 바꾼다)
+# - 스텁 LLM 지연 = 고정 지연 + 프롬프트 토큰 / prefill-tps + 출력 토큰 / decode-tps (STUB_LLM_*)
+# - 스텁 응답은 스크립트로 지정: single은 9개 섹션 보고서, sectioned는 섹션 본문 / 요약 본문 (출력 분량이 같도록)
+#
+# 사용 예:
+#   python -m scripts.bench_report_sectioned --runs 3 --prefill-tps 5000 --decode-tps 60 --latency-ms 300
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy의 SQLite DateTime 저장 형식
+STRATEGIES = ("single", "sectioned")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="전체 보고서 생성 시간/토큰 (단일 호출 vs 섹션별 병렬 호출)")
+    p.add_argument("--role", choices=["driver", "run"], default="driver", help=argparse.SUPPRESS)
+    p.add_argument("--strategy", choices=STRATEGIES, default="single", help=argparse.SUPPRESS)
+    p.add_argument("--db", default="", help=argparse.SUPPRESS)
+    p.add_argument("--runs", type=int, default=3, help="방식별 생성 횟수 (중앙값 보고)")
+    p.add_argument("--messages", type=int, default=120, help="요약 이후 최근 대화 메시지 수")
+    p.add_argument("--prefill-tps", type=float, default=5000.0, help="스텁 LLM 프롬프트 처리 속도(토큰/초)")
+    p.add_argument("--decode-tps", type=float, default=60.0, help="스텁 LLM 출력 속도(토큰/초)")
+    p.add_argument("--latency-ms", type=float, default=300.0, help="스텁 LLM 호출당 고정 지연(ms)")
+    p.add_argument("--section-lines", type=int, default=6, help="스텁 보고서 섹션당 줄 수")
+    p.add_argument("--concurrency", type=int, default=8, help="sectioned 병렬 호출 상한")
+    return p.parse_args()
+
+
+def body_text(title: str, lines: int) -> str:
+    return "\n".join(
+        f"- {title.split(' (')[0]} 관찰 {i + 1}: 산책 후 발을 핥는 빈도 증가, 식욕은 유지 (업데이트: 2025-11-02)"
+        for i in range(lines)
+    )
+
+
+def build(path: str, messages: int) -> None:
+    import sqlite3
+
+    from sqlalchemy import create_engine
+
+    from db.models import Base
+    from services.dog_info_bank import QUESTION_BANK
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        base = datetime.utcnow() - timedelta(days=30)
+        now = datetime.utcnow().strftime(DT_FORMAT)
+        cur.execute("INSERT INTO users (username, hashed_password, created_at, updated_at) VALUES ('bench', 'x', ?, ?)", (now, now))
+        cur.execute(
+            "INSERT INTO dogs (id, user_id, name, breed, sex, neutered, weight_kg, context_version, created_at, updated_at) "
+            "VALUES (1, ?, 'bench', '말티즈', 'female', 1, 3.2, 0, ?, ?)",
+            (cur.lastrowid, now, now),
+        )
+        cur.executemany(
+            "INSERT INTO dog_info_items (dog_id, category, key, question, question_type, answer_text, source, created_at, updated_at) "
+            "VALUES (1, ?, ?, ?, ?, ?, 'user', ?, ?)",
+            [
+                (q["category"].name, q["key"], q["question"], q["question_type"].name,
+                 f"답변 {i}: 하루 두 번, 사료 위주" if i % 3 else None, now, (base + timedelta(days=i % 30)).strftime(DT_FORMAT))
+                for i, q in enumerate(QUESTION_BANK)
+            ],
+        )
+        cur.executemany(
+            "INSERT INTO chat_messages (dog_id, role, content, agent, created_at) VALUES (1, ?, ?, ?, ?)",
+            [
+                ("user" if n % 2 == 0 else "assistant",
+                 f"메시지 {n}: 산책 후에 발을 자주 핥고 밤에 긁는 소리가 나요. 사료를 바꾼 지 2주 됐어요.",
+                 None if n % 2 == 0 else "veterinarian", (base + timedelta(minutes=n * 10)).strftime(DT_FORMAT))
+                for n in range(messages)
+            ],
+        )
+        # 요약 갱신 LLM 호출이 생기지 않도록 워터마크는 0 (요약 대상 없음)
+        cur.execute(
+            "INSERT INTO dog_history_summaries (dog_id, last_message_id, message_count, user_count, summary_text, updated_at) "
+            "VALUES (1, 0, 0, 0, ?, ?)",
+            ("발 핥기/긁기 반복, 사료 변경 2주 경과, 식이 알레르기 의심으로 관찰 중.", now),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def token_totals() -> Dict[str, float]:
+    from services.metrics import LLM_TOKENS
+
+    out = {"prompt": 0.0, "completion": 0.0}
+    for (_agent, kind), value in LLM_TOKENS.collect().items():
+        if kind in out:
+            out[kind] += value
+    return out
+
+
+async def run(args: argparse.Namespace) -> None:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from services.report_md import REPORT_SECTIONS, generate_markdown, split_sections
+    from services.stubs import StubScript, stub_script
+
+    titles = dict(REPORT_SECTIONS)
+    full = "\n\n".join(
+        [f"# 진료 보고서 - bench (#1)\n\n생성시각: {datetime.utcnow():%Y-%m-%d %H:%M} UTC"]
+        + [f"# {title}\n\n{body_text(title, args.section_lines)}" for _, title in REPORT_SECTIONS]
+    )
+    answers = {
+        "report": full,
+        "report_section": body_text("섹션", args.section_lines),
+        "report_summary": body_text(titles["요약"], args.section_lines),
+    }
+    engine = create_async_engine(f"sqlite+aiosqlite:///{args.db}")
+    make_session = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    results: List[Dict[str, Any]] = []
+    for _ in range(args.runs):
+        before = token_totals()
+        t0 = time.perf_counter()
+        with stub_script(StubScript(answers=answers)):
+            async with make_session() as session:
+                meta = await generate_markdown(session, 1)
+        elapsed = time.perf_counter() - t0
+        after = token_totals()
+        with open(meta["path"], encoding="utf-8") as f:
+            keys = {key for key, _ in split_sections(f.read()) if key is not None}
+        results.append({
+            "s": elapsed,
+            "prompt": after["prompt"] - before["prompt"],
+            "completion": after["completion"] - before["completion"],
+            "sections": len(keys),
+        })
+    await engine.dispose()
+    print(json.dumps(results))
+
+
+def run_strategy(args: argparse.Namespace, strategy: str, workdir: str, template: str) -> List[Dict[str, Any]]:
+    db = os.path.join(workdir, f"{strategy}.db")
+    shutil.copy(template, db)
+    env = dict(os.environ)
+    env.update({
+        "REPORT_FULL_STRATEGY": strategy,
+        "REPORT_SECTION_CONCURRENCY": str(args.concurrency),
+        "REPORTS_DIR": os.path.join(workdir, f"reports-{strategy}"),
+        "LLM_BACKEND": "stub",
+        "VECTOR_BACKEND": "stub",
+        "STUB_LLM_LATENCY_MS": str(args.latency_ms),
+        "STUB_LLM_PREFILL_TPS": str(args.prefill_tps),
+        "STUB_LLM_DECODE_TPS": str(args.decode_tps),
+        "SPANS_ENABLED": "false",
+    })
+    cmd = [
+        sys.executable, "-m", "scripts.bench_report_sectioned", "--role", "run", "--strategy", strategy, "--db", db,
+        "--runs", str(args.runs), "--section-lines", str(args.section_lines),
+    ]
+    out = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True).stdout
+    for line in reversed(out.strip().splitlines()):
+        if line.startswith("["):
+            return json.loads(line)
+    raise RuntimeError("child produced no result")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.role == "run":
+        asyncio.run(run(args))
+        return
+
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+    with tempfile.TemporaryDirectory(prefix="bench-report-sectioned-") as workdir:
+        template = os.path.join(workdir, "template.db")
+        build(template, args.messages)
+        for strategy in STRATEGIES:
+            print(f"[bench] {strategy}: {args.runs} full reports ...")
+            rows[strategy] = run_strategy(args, strategy, workdir, template)
+
+    print(f"\n{'strategy':<10} {'p50 s':>7} {'min s':>7} {'prompt tok':>11} {'compl tok':>10} {'sections':>9}")
+    for strategy, res in rows.items():
+        secs = [r["s"] for r in res]
+        print(
+            f"{strategy:<10} {statistics.median(secs):7.2f} {min(secs):7.2f} {res[0]['prompt']:11.0f} "
+            f"{res[0]['completion']:10.0f} {res[0]['sections']:9d}"
+        )
+    single, sectioned = statistics.median(r["s"] for r in rows["single"]), statistics.median(r["s"] for r in rows["sectioned"])
+    print(f"(sectioned/single 시간 {100.0 * sectioned / single:.1f}%, 스텁 LLM: 고정 {args.latency_ms:.0f} ms, "
+          f"prefill {args.prefill_tps:.0f} tok/s, decode {args.decode_tps:.0f} tok/s, 병렬 {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
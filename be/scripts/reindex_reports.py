@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+
+# 보고서 인덱스(reports 테이블)를 디스크 기준으로 재구성
+# - REPORTS_DIR의 dog_<id>_*.md를 읽어 없는 행은 추가, 파일이 사라진 행은 삭제, 크기/해시/PDF 캐시 상태는 갱신
+# - 인덱스 도입 전에 생성된 보고서를 처음 한 번 등록하거나, 파일을 직접 옮기거나 지운 뒤에 실행
+#
+# 사용 예:
+#   python -m scripts.reindex_reports
+#   python -m scripts.reindex_reports --dry-run
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="보고서 인덱스 재구성 (디스크 기준)")
+    p.add_argument("--dry-run", action="store_true", help="변경 없이 차이만 출력")
+    return p.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    from db.database import AsyncSessionLocal, engine
+    from db.migrations import run_migrations
+    from db.models import Base
+    from services.report_index import reconcile
+    from services.report_md import reports_directory
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations(engine)
+    reports_dir = reports_directory()
+    t0 = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        stats = await reconcile(session, reports_dir, dry_run=args.dry_run)
+    await engine.dispose()
+    print(
+        f"[reindex]{' (dry run)' if args.dry_run else ''} dir={reports_dir} files={stats['files']} "
+        f"added={stats['added']} updated={stats['updated']} removed={stats['removed']} "
+        f"skipped={stats['skipped']} in {time.perf_counter() - t0:.2f}s"
+    )
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# 녹화된 트레이스(traces/*.json)를 같은 입력/도착 간격으로 run_qa_flow에 다시 흘려 성능을 비교한다.
+# - 기본은 스텁 LLM/벡터 스토어 (외부 API 호출 없음), --backend local이면 현재 설정(OPENAI_BASE_URL 등) 사용
+# - 스텁 LLM 지연은 녹화값(recorded) / 고정값(fixed) / 0(zero) 중 선택
+#
+# 사용 예:
+#   python -m scripts.replay_traces --traces-dir traces --speedup 10
+#   python -m scripts.replay_traces --llm-latency fixed --llm-ms 300 --json out.json
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="녹화된 QA 트레이스 리플레이 벤치마크")
+    p.add_argument("--traces-dir", type=Path, default=Path("traces"))
+    p.add_argument("--limit", type=int, default=0, help="앞에서부터 N개만 사용 (0=전체)")
+    p.add_argument("--speedup", type=float, default=1.0, help="도착 간격 배속 (0이면 간격 무시하고 한꺼번에)")
+    p.add_argument("--backend", choices=["stub", "local"], default="stub")
+    p.add_argument("--llm-latency", choices=["recorded", "fixed", "zero"], default="recorded")
+    p.add_argument("--llm-ms", type=float, default=500.0, help="--llm-latency fixed일 때 호출당 지연(ms)")
+    p.add_argument("--embed-ms", type=float, default=0.0, help="스텁 임베딩 호출당 지연(ms)")
+    p.add_argument("--write-traces", action="store_true", help="리플레이 결과도 traces/에 기록")
+    p.add_argument("--json", type=Path, default=None, help="요청별 결과를 JSON으로 저장")
+    return p.parse_args()
+
+
+def configure_env(args: argparse.Namespace) -> None:
+    # 설정은 get_settings() 호출 시점의 환경변수를 읽으므로 앱 모듈 import 전에 지정
+    if args.backend == "stub":
+        os.environ["LLM_BACKEND"] = "stub"
+        os.environ["VECTOR_BACKEND"] = "stub"
+        os.environ["STUB_EMBED_LATENCY_MS"] = str(args.embed_ms)
+    if not args.write_traces:
+        # 운영 트레이스 디렉터리를 리플레이 결과로 오염시키지 않는다 (오류 트레이스만 기록)
+        os.environ["TRACE_SAMPLE_RATE"] = "0"
+        os.environ["TRACE_SLOW_MS"] = "1e12"
+        os.environ["SPANS_ENABLED"] = "false"
+
+
+def load_traces(root: Path, limit: int = 0) -> List[Dict[str, Any]]:
+    traces: List[Dict[str, Any]] = []
+    for path in sorted(root.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        question = ((data.get("request") or {}).get("question") or "").strip()
+        if not question:
+            continue
+        data["_file"] = path.name
+        traces.append(data)
+    traces.sort(key=lambda t: float(t.get("created_at") or 0.0))
+    return traces[:limit] if limit else traces
+
+
+def recorded_total_ms(trace: Dict[str, Any]) -> Optional[float]:
+    if trace.get("total_duration_ms") is not None:
+        return float(trace["total_duration_ms"])
+    # 총 시간이 없는 예전 트레이스는 단계 합으로 근사
+    steps = trace.get("steps") or {}
+    parts = [float(s.get("duration_ms") or 0.0) for s in steps.values() if isinstance(s, dict)]
+    return sum(parts) if parts else None
+
+
+def build_script(trace: Dict[str, Any], mode: str, fixed_ms: float):
+    from services.stubs import StubScript
+
+    steps = trace.get("steps") or {}
+    plan_step = steps.get("plan") or {}
+    results = (steps.get("execute") or {}).get("results") or []
+    answers = {r.get("agent"): r.get("answer") or "" for r in results if r.get("agent")}
+    latency: Dict[str, float] = {}
+    if mode == "recorded":
+        latency["planner"] = float(plan_step.get("duration_ms") or 0.0)
+        for r in results:
+            if r.get("agent"):
+                latency[r["agent"]] = float(r.get("duration_ms") or 0.0)
+    else:
+        ms = fixed_ms if mode == "fixed" else 0.0
+        latency = {"planner": ms, "general": ms, "report": ms}
+        latency.update({agent: ms for agent in answers})
+    return StubScript(plan=plan_step.get("raw_plan"), answers=answers, latency_ms=latency)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": percentile(values, 0.50),
+        "p90": percentile(values, 0.90),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else 0.0,
+        "mean": sum(values) / len(values) if values else 0.0,
+    }
+
+
+async def replay(args: argparse.Namespace, traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from graph.flow import run_qa_flow
+    from services.stubs import stub_script
+
+    rows: List[Dict[str, Any]] = []
+    base = float(traces[0].get("created_at") or 0.0)
+    started = time.perf_counter()
+
+    async def _one(trace: Dict[str, Any]) -> None:
+        offset = float(trace.get("created_at") or base) - base
+        if args.speedup > 0:
+            delay = offset / args.speedup - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        req = trace.get("request") or {}
+        script = build_script(trace, args.llm_latency, args.llm_ms)
+        error = None
+        t0 = time.perf_counter()
+        try:
+            with stub_script(script):
+                await run_qa_flow(req["question"], session_id=req.get("session_id"), dog_context=req.get("dog_context"))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        rows.append(
+            {
+                "file": trace["_file"],
+                "offset_s": offset,
+                "replay_ms": (time.perf_counter() - t0) * 1000.0,
+                "recorded_ms": recorded_total_ms(trace),
+                "error": error,
+            }
+        )
+
+    await asyncio.gather(*[_one(t) for t in traces])
+    return rows
+
+
+def report(rows: List[Dict[str, Any]], wall_s: float) -> None:
+    ok = [r for r in rows if not r["error"]]
+    replay_ms = [r["replay_ms"] for r in ok]
+    paired = [r for r in ok if r["recorded_ms"] is not None]
+    recorded_ms = [r["recorded_ms"] for r in paired]
+    diffs = [r["replay_ms"] - r["recorded_ms"] for r in paired]
+
+    print(f"requests: {len(rows)}  ok: {len(ok)}  errors: {len(rows) - len(ok)}")
+    print(f"wall: {wall_s:.2f}s  throughput: {len(ok) / wall_s if wall_s else 0.0:.2f} req/s")
+    print(f"{'':>12} {'p50':>9} {'p90':>9} {'p95':>9} {'p99':>9} {'max':>9} {'mean':>9}")
+    for label, values in (("replay_ms", replay_ms), ("recorded_ms", recorded_ms), ("diff_ms", diffs)):
+        s = summarize(values)
+        print(f"{label:>12} " + " ".join(f"{s[k]:9.1f}" for k in ("p50", "p90", "p95", "p99", "max", "mean")))
+    if paired:
+        ratio = sum(replay_ms) / sum(recorded_ms) if sum(recorded_ms) else 0.0
+        print(f"replay/recorded total ratio: {ratio:.3f}")
+    for r in rows:
+        if r["error"]:
+            print(f"  ERROR {r['file']}: {r['error']}")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_env(args)
+    traces = load_traces(args.traces_dir, args.limit)
+    if not traces:
+        print(f"리플레이할 트레이스가 없습니다: {args.traces_dir}")
+        return
+    # 무거운 모듈 import 시간은 측정에서 제외
+    import graph.flow  # noqa: F401
+
+    print(f"[replay] {len(traces)} traces from {args.traces_dir} (backend={args.backend}, llm={args.llm_latency}, speedup={args.speedup})")
+    t0 = time.perf_counter()
+    rows = asyncio.run(replay(args, traces))
+    report(rows, time.perf_counter() - t0)
+    if args.json:
+        args.json.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"saved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
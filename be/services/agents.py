@@ -10,8 +10,11 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 
 from core.config import get_settings, Settings
-from services.llm import get_chat_model
+from services.dog_context import format_info_text, format_profile_text
+from services.llm import get_chat_model, llm_agent
+from services.metrics import AGENT_STAGE_DURATION, timed
 from services.rag import get_registry
+from services.spans import end_span, span, start_span
 
 
 def _format_docs(docs) -> str:
@@ -73,46 +76,14 @@ def _docs_for_trace(docs, snippet_len: int = 200):
 def _format_dog_profile(dog: Optional[Dict[str, Any]]) -> str:
     if not dog:
         return "(강아지 정보 없음)"
-    lines = []
-    name = dog.get("name")
-    if name:
-        lines.append(f"이름: {name}")
-    breed = dog.get("breed")
-    if breed:
-        lines.append(f"견종: {breed}")
-    sex = dog.get("sex")
-    if sex:
-        lines.append(f"성별: {sex}")
-    birth = dog.get("birth_date")
-    if birth:
-        lines.append(f"생년월일: {birth}")
-    neut = dog.get("neutered")
-    if neut is not None:
-        lines.append(f"중성화: {'예' if neut else '아니오'}")
-    weight = dog.get("weight_kg")
-    if weight is not None:
-        lines.append(f"체중: {weight} kg")
-    return "\n".join(lines) or "(강아지 정보 없음)"
+    # dog_context 서비스가 미리 포맷해 둔 텍스트가 있으면 재사용
+    return (dog.get("formatted") or {}).get("profile") or format_profile_text(dog)
 
 
 def _format_dog_info_items(dog: Optional[Dict[str, Any]]) -> str:
     if not dog:
         return "(추가 강아지 정보 없음)"
-    items = dog.get("info") or []
-    if not items:
-        return "(추가 강아지 정보 없음)"
-    lines = []
-    for it in items:
-        cat = it.get("category")
-        key = it.get("key")
-        ans = it.get("answer")
-        upd = it.get("updated_at")
-        if ans is None or str(ans).strip() == "":
-            continue
-        label = f"{cat}:{key}" if cat and key else (key or cat or "항목")
-        suffix = f" (업데이트: {upd})" if upd else ""
-        lines.append(f"- {label}: {ans}{suffix}")
-    return "\n".join(lines) or "(추가 강아지 정보 없음)"
+    return (dog.get("formatted") or {}).get("info_items") or format_info_text(dog)
 
 @dataclass
 class RAGAgent:
@@ -121,8 +92,8 @@ class RAGAgent:
     retriever: Any
     llm: Any
 
-    def chain(self):
-        prompt = ChatPromptTemplate.from_messages(
+    def prompt(self) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_messages(
             [
                 (
                     "system",
@@ -137,6 +108,8 @@ class RAGAgent:
                 ("human", "질문: {question}"),
             ]
         )
+
+    def chain(self):
         return (
             {
                 "question": lambda x: x["question"],
@@ -151,16 +124,72 @@ class RAGAgent:
                 context=lambda x: _format_docs(x["docs"]),
                 sources=lambda x: _format_sources(x["docs"]),
             )
-            | prompt
+            | self.prompt()
             | self.llm
             | StrOutputParser()
         )
 
+    def retrieve(self, question: str):
+        """임베딩과 벡터 검색을 나눠 실행해 단계별 시간을 기록합니다.
+
+        similarity 검색이 아닌 retriever는 분리할 수 없으므로 통째로 측정합니다.
+        """
+        vs = getattr(self.retriever, "vectorstore", None)
+        embeddings = getattr(vs, "embeddings", None)
+        if embeddings is None or getattr(self.retriever, "search_type", "similarity") != "similarity":
+            with timed(AGENT_STAGE_DURATION, agent=self.name, stage="retrieve"), span("rag.retrieve"):
+                return self.retriever.invoke(question)
+        with timed(AGENT_STAGE_DURATION, agent=self.name, stage="embed"), span("rag.embed"):
+            vector = embeddings.embed_query(question)
+        with timed(AGENT_STAGE_DURATION, agent=self.name, stage="search"), span("rag.search") as sp:
+            docs = vs.similarity_search_by_vector(vector, **(self.retriever.search_kwargs or {}))
+            if sp is not None:
+                sp.set_attribute("rag.num_docs", len(docs))
+            return docs
+
+    async def _stream_answer(self, prompt_value) -> str:
+        # 첫 토큰까지의 시간(TTFT)을 별도 스팬/메트릭으로 남기기 위해 스트리밍으로 수신
+        parts: List[str] = []
+        t0 = time.perf_counter()
+        first_token = start_span("rag.llm_first_token")
+        received = False
+        try:
+            async for chunk in self.llm.astream(prompt_value):
+                if not received:
+                    received = True
+                    AGENT_STAGE_DURATION.observe(time.perf_counter() - t0, agent=self.name, stage="first_token")
+                    end_span(first_token)
+                text = getattr(chunk, "content", chunk)
+                if isinstance(text, str):
+                    parts.append(text)
+        except BaseException as e:
+            # 첫 토큰 전에 실패하면 실패한 스팬이 오류 트레이스에 남도록 오류와 함께 종료
+            if not received:
+                received = True
+                end_span(first_token, error=f"{type(e).__name__}: {e}")
+            raise
+        if not received:
+            end_span(first_token)
+        return "".join(parts)
+
     async def ask(self, payload: Dict[str, Any]) -> str:
-        # 미리 검색 문서를 확보해 trace에도 활용
-        docs = self.retriever.invoke(payload["question"])
-        chain = self.chain()
-        answer = await chain.ainvoke({**payload, "docs": docs})
+        with span("agent.ask", agent=self.name):
+            # 미리 검색 문서를 확보해 trace에도 활용
+            docs = self.retrieve(payload["question"])
+            with span("rag.format"):
+                dog = payload.get("dog")
+                prompt_value = self.prompt().invoke(
+                    {
+                        "question": payload["question"],
+                        "agent_name": self.name,
+                        "dog_profile": _format_dog_profile(dog),
+                        "dog_info_items": _format_dog_info_items(dog),
+                        "context": _format_docs(docs),
+                        "sources": _format_sources(docs),
+                    }
+                )
+            with llm_agent(self.name), timed(AGENT_STAGE_DURATION, agent=self.name, stage="llm"), span("rag.llm"):
+                answer = await self._stream_answer(prompt_value)
         return {"answer": answer, "docs": docs}
 
 
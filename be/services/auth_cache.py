@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from core.config import get_settings
+from services.metrics import CACHE_REQUESTS
+
+
+# 인증된 사용자(principal) TTL 캐시
+# - 키는 (user_id, jti): 토큰마다 따로 저장하고, 사용자 단위로 한 번에 무효화
+# - 사용자 삭제/이름 변경 시 invalidate_user()로 비운다 (워커 프로세스 단위이므로 다른 워커는 TTL까지 이전 값 유지)
+# - 값은 DB 세션과 무관한 불변 객체라 요청 간에 공유해도 안전
+
+Key = Tuple[int, str]
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int = 4096, ttl_s: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Key, Tuple[float, Principal]]" = OrderedDict()
+        self._by_user: Dict[int, Set[Key]] = {}
+        # 사용자별 무효화 세대: 조회 중에 무효화되면 이전 값을 다시 넣지 않도록 비교
+        self._generation: Dict[int, int] = {}
+
+    def get(self, user_id: int, jti: str) -> Optional[Principal]:
+        key = (user_id, jti)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return principal
+
+    def generation(self, user_id: int) -> int:
+        return self._generation.get(user_id, 0)
+
+    def put(self, user_id: int, jti: str, principal: Principal, generation: int) -> None:
+        if generation != self.generation(user_id):
+            return
+        key = (user_id, jti)
+        self._entries[key] = (time.monotonic() + self.ttl_s, principal)
+        self._entries.move_to_end(key)
+        self._by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._generation[user_id] = self.generation(user_id) + 1
+        for key in self._by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_user.clear()
+
+    def _remove(self, key: Key) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._by_user.pop(key[0], None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: Optional[PrincipalCache] = None
+
+
+def get_cache() -> PrincipalCache:
+    global _CACHE
+    if _CACHE is None:
+        settings = get_settings()
+        _CACHE = PrincipalCache(settings.auth_cache_size, settings.auth_cache_ttl_s)
+    return _CACHE
+
+
+def lookup_principal(user_id: int, jti: str) -> Optional[Principal]:
+    if not get_settings().auth_cache_enabled:
+        return None
+    principal = get_cache().get(user_id, jti)
+    CACHE_REQUESTS.inc(cache="auth_principal", result="hit" if principal is not None else "miss")
+    return principal
+
+
+def invalidate_user(user_id: int) -> None:
+    get_cache().invalidate_user(user_id)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import zstandard
+from sqlalchemy import delete, distinct, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.models import ChatArchiveSegment, ChatMessage, DogHistorySummary
+from services.history_summary import refresh_summary
+
+
+logger = logging.getLogger(__name__)
+
+# 채팅 기록 콜드 보관
+# - 오래된 메시지를 강아지별 세그먼트(최대 segment_size개, zstd 압축 JSON)로 묶어 chat_archive_segments에 넣고
+#   hot 테이블(chat_messages)에서는 삭제 → hot 테이블/인덱스는 최근 기록 크기로 유지
+# - 세그먼트 하나 = 짧은 쓰기 트랜잭션 하나 (읽기/압축은 트랜잭션 밖) → 쓰기 요청을 오래 막지 않음
+# - 원래 id/created_at을 보존하므로 읽는 쪽은 hot 행과 합쳐 (created_at, id) 순서 그대로 사용
+# - 롤링 요약 워터마크 이하(이미 요약/집계에 반영된) 메시지만 옮긴다
+#   → collect_context/자동 채움(load_history)은 요약으로 보관분을 보고, 세그먼트를 읽지 않는다
+
+_SEGMENT_META = (
+    ChatArchiveSegment.id,
+    ChatArchiveSegment.first_message_id,
+    ChatArchiveSegment.last_message_id,
+    ChatArchiveSegment.first_at,
+    ChatArchiveSegment.last_at,
+    ChatArchiveSegment.message_count,
+    ChatArchiveSegment.user_count,
+)
+
+
+@dataclass
+class ArchivedMessage:
+    """ChatMessage와 같은 속성을 가진 읽기 전용 메시지 (ChatMessageRead/format_message에 그대로 사용)"""
+
+    id: int
+    dog_id: int
+    role: str
+    content: str
+    agent: Optional[str]
+    created_at: datetime
+
+
+def encode_segment(rows: Sequence[Any], level: int = 10) -> Tuple[bytes, int]:
+    raw = json.dumps(
+        [[r.id, r.role, r.agent, r.content, r.created_at.isoformat()] for r in rows],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return zstandard.ZstdCompressor(level=level).compress(raw), len(raw)
+
+
+def decode_segment(dog_id: int, payload: bytes) -> List[ArchivedMessage]:
+    raw = zstandard.ZstdDecompressor().decompress(payload)
+    return [
+        ArchivedMessage(id=i, dog_id=dog_id, role=role, content=content, agent=agent, created_at=datetime.fromisoformat(ts))
+        for i, role, agent, content, ts in json.loads(raw)
+    ]
+
+
+def message_key(m: Any) -> Tuple[datetime, int]:
+    return (m.created_at, m.id)
+
+
+async def _payload(session: AsyncSession, segment_id: int) -> bytes:
+    return (
+        await session.execute(select(ChatArchiveSegment.payload).where(ChatArchiveSegment.id == segment_id))
+    ).scalar_one()
+
+
+async def read_archived(
+    session: AsyncSession,
+    dog_id: int,
+    limit: int,
+    order: str = "asc",
+    since: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    after_key: Optional[Tuple[datetime, int]] = None,
+) -> List[ArchivedMessage]:
+    """
+    조건에 맞는 보관 메시지를 order 순서로 최대 limit개 반환합니다.
+    since/before: created_at 범위 [since, before), after_key: 키셋 커서 (asc면 초과, desc면 미만)
+    """
+    stmt = select(*_SEGMENT_META).where(ChatArchiveSegment.dog_id == dog_id)
+    if since is not None:
+        stmt = stmt.where(ChatArchiveSegment.last_at >= since)
+    if before is not None:
+        stmt = stmt.where(ChatArchiveSegment.first_at < before)
+    if after_key is not None:
+        stmt = stmt.where(
+            ChatArchiveSegment.last_at >= after_key[0] if order == "asc" else ChatArchiveSegment.first_at <= after_key[0]
+        )
+    if order == "asc":
+        stmt = stmt.order_by(ChatArchiveSegment.first_at.asc(), ChatArchiveSegment.id.asc())
+    else:
+        stmt = stmt.order_by(ChatArchiveSegment.last_at.desc(), ChatArchiveSegment.id.desc())
+    segments = (await session.execute(stmt)).all()
+
+    def _wanted(m: ArchivedMessage) -> bool:
+        if since is not None and m.created_at < since:
+            return False
+        if before is not None and m.created_at >= before:
+            return False
+        if after_key is not None:
+            return message_key(m) > after_key if order == "asc" else message_key(m) < after_key
+        return True
+
+    collected: List[ArchivedMessage] = []
+    for seg in segments:
+        if len(collected) >= limit:
+            # 세그먼트 시간 범위가 겹칠 수 있으므로 이미 모은 마지막 키보다 뒤쪽이면 중단
+            edge = message_key(collected[limit - 1])[0]
+            if (order == "asc" and seg.first_at > edge) or (order == "desc" and seg.last_at < edge):
+                break
+        collected.extend(m for m in decode_segment(dog_id, await _payload(session, seg.id)) if _wanted(m))
+        collected.sort(key=message_key, reverse=(order == "desc"))
+    return collected[:limit]
+
+
+def merge_messages(hot: Sequence[Any], archived: Sequence[Any], limit: int, order: str = "asc") -> List[Any]:
+    merged = sorted([*hot, *archived], key=message_key, reverse=(order == "desc"))
+    return merged[:limit]
+
+
+async def archive_dog(
+    session_factory: async_sessionmaker,
+    dog_id: int,
+    cutoff: datetime,
+    segment_size: int = 500,
+    level: int = 10,
+    pause_s: float = 0.0,
+) -> Dict[str, int]:
+    """cutoff 이전이면서 요약 워터마크 이하인 메시지를 segment_size개씩 세그먼트로 옮깁니다."""
+    stats = {"segments": 0, "messages": 0, "raw_bytes": 0, "stored_bytes": 0}
+    async with session_factory() as session:
+        watermark = (
+            await session.execute(select(DogHistorySummary.last_message_id).where(DogHistorySummary.dog_id == dog_id))
+        ).scalar_one_or_none() or 0
+    while True:
+        async with session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(ChatMessage.id, ChatMessage.role, ChatMessage.agent, ChatMessage.content, ChatMessage.created_at)
+                    .where(
+                        ChatMessage.dog_id == dog_id,
+                        ChatMessage.created_at < cutoff,
+                        ChatMessage.id <= watermark,
+                    )
+                    .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+                    .limit(segment_size)
+                )
+            ).all()
+        if not rows:
+            return stats
+        # 압축은 쓰기 트랜잭션 밖에서
+        payload, raw_bytes = encode_segment(rows, level)
+        ids = [r.id for r in rows]
+        try:
+            async with session_factory() as session:
+                session.add(
+                    ChatArchiveSegment(
+                        dog_id=dog_id,
+                        first_message_id=min(ids),
+                        last_message_id=max(ids),
+                        first_at=rows[0].created_at,
+                        last_at=rows[-1].created_at,
+                        message_count=len(rows),
+                        user_count=sum(1 for r in rows if r.role == "user"),
+                        codec="zstd",
+                        raw_bytes=raw_bytes,
+                        payload=payload,
+                    )
+                )
+                await session.execute(delete(ChatMessage).where(ChatMessage.id.in_(ids)))
+                await session.commit()
+        except IntegrityError:
+            # 보관 중 강아지가 삭제됨
+            logger.info("dog %s disappeared while archiving", dog_id)
+            return stats
+        stats["segments"] += 1
+        stats["messages"] += len(rows)
+        stats["raw_bytes"] += raw_bytes
+        stats["stored_bytes"] += len(payload)
+        if len(rows) < segment_size:
+            return stats
+        # 다른 쓰기 요청이 끼어들 틈을 준다
+        await asyncio.sleep(pause_s)
+
+
+async def archive_old_messages(
+    session_factory: async_sessionmaker,
+    llm: Any,
+    older_than_days: int,
+    segment_size: int = 500,
+    level: int = 10,
+    pause_s: float = 0.0,
+) -> Dict[str, int]:
+    """older_than_days보다 오래된 메시지가 있는 강아지마다 요약을 갱신한 뒤 보관합니다."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    async with session_factory() as session:
+        dog_ids = (
+            await session.execute(select(distinct(ChatMessage.dog_id)).where(ChatMessage.created_at < cutoff))
+        ).scalars().all()
+    total = {"dogs": 0, "summarized": 0, "segments": 0, "messages": 0, "raw_bytes": 0, "stored_bytes": 0}
+    for dog_id in dog_ids:
+        # 보관할 구간이 요약에 먼저 반영되도록 (필요할 때만 LLM 1회)
+        async with session_factory() as session:
+            if await refresh_summary(session, dog_id, llm):
+                await session.commit()
+                total["summarized"] += 1
+        stats = await archive_dog(session_factory, dog_id, cutoff, segment_size, level, pause_s)
+        total["dogs"] += 1
+        for k, v in stats.items():
+            total[k] += v
+    return total
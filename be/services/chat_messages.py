@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import Select, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.schemas import ChatMessageCreate
+from db.models import ChatMessage
+from services.chat_archive import merge_messages, read_archived
+
+
+# 채팅 기록 키셋(커서) 페이지네이션
+# - 정렬 키 (created_at, id): 같은 시각의 메시지도 id로 순서가 확정되어 누락/중복이 없다
+# - (dog_id, created_at, id) 복합 인덱스를 그대로 따라가므로 정렬/OFFSET 비용이 없다
+# - 커서는 마지막 항목의 정렬 키를 담은 불투명 문자열(base64url JSON)
+# 일괄 저장(insert_messages)은 한 문장(INSERT ... RETURNING)으로 넣고 같은 created_at + 증가하는 id로 순서를 보존
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, message_id: int, order: str) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "i": message_id, "o": order}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data: Dict[str, Any] = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(data["t"])
+        message_id = int(data["i"])
+        cursor_order = data.get("o", "asc")
+    except Exception as e:
+        raise InvalidCursor("잘못된 커서입니다") from e
+    if cursor_order != order:
+        raise InvalidCursor("커서와 정렬 방향(order)이 일치하지 않습니다")
+    return created_at, message_id
+
+
+def keyset_page_stmt(dog_id: int, limit: int, order: str = "asc", cursor: Optional[str] = None) -> Select:
+    """limit+1개를 조회하는 문장 (초과분 유무로 다음 페이지 존재를 판단)."""
+    stmt = select(ChatMessage).where(ChatMessage.dog_id == dog_id)
+    key = tuple_(ChatMessage.created_at, ChatMessage.id)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor, order))
+        stmt = stmt.where(key > after if order == "asc" else key < after)
+    if order == "asc":
+        stmt = stmt.order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+    else:
+        stmt = stmt.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: List[ChatMessage], limit: int, order: str) -> Tuple[List[ChatMessage], Optional[str]]:
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id, order)
+
+
+async def fetch_page(
+    session: AsyncSession, dog_id: int, limit: int, order: str = "asc", cursor: Optional[str] = None
+) -> Tuple[List[ChatMessage], Optional[str]]:
+    rows = (await session.execute(keyset_page_stmt(dog_id, limit, order, cursor))).scalars().all()
+    # 콜드 보관된 메시지도 같은 (created_at, id) 순서로 합친다
+    after_key = decode_cursor(cursor, order) if cursor else None
+    archived = await read_archived(session, dog_id, limit + 1, order, after_key=after_key)
+    return split_page(merge_messages(rows, archived, limit + 1, order), limit, order)
+
+
+def message_error(body: ChatMessageCreate) -> Optional[str]:
+    if body.role == "assistant" and (body.agent is None or not body.agent.strip()):
+        return "assistant 메시지는 agent가 필요합니다"
+    return None
+
+
+def validate_batch(raw_items: List[Dict[str, Any]]) -> Tuple[List[Tuple[int, ChatMessageCreate]], List[Dict[str, Any]]]:
+    """항목별로 검증해 (index, 메시지) 목록과 오류 목록으로 나눕니다."""
+    valid: List[Tuple[int, ChatMessageCreate]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, raw in enumerate(raw_items):
+        try:
+            body = ChatMessageCreate.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+            continue
+        detail = message_error(body)
+        if detail is not None:
+            errors.append({"index": index, "detail": detail})
+            continue
+        valid.append((index, body))
+    return valid, errors
+
+
+async def insert_messages(
+    session: AsyncSession, dog_id: int, bodies: List[ChatMessageCreate]
+) -> List[Tuple[int, datetime]]:
+    """메시지들을 한 번의 bulk INSERT ... RETURNING으로 저장하고 입력 순서대로 (id, created_at)을 반환합니다. (커밋은 호출자)"""
+    if not bodies:
+        return []
+    now = datetime.utcnow()
+    rows = [
+        {"dog_id": dog_id, "role": b.role, "content": b.content, "agent": b.agent, "created_at": now}
+        for b in bodies
+    ]
+    stmt = insert(ChatMessage).returning(ChatMessage.id, ChatMessage.created_at, sort_by_parameter_order=True)
+    result = await session.execute(stmt, rows)
+    return [(row.id, row.created_at) for row in result]
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from core.config import get_settings
+from db.database import AsyncSessionLocal
+from db.models import ChatMessage
+from services.metrics import CHAT_WRITE_BEHIND
+
+
+logger = logging.getLogger(__name__)
+
+# QA 교환(사용자 질문 + 에이전트별 답변)의 write-behind 저장
+# - 응답 경로에서는 메모리 큐에 넣기만 하고, 백그라운드 태스크가 주기/크기 기준으로 묶어 bulk insert
+# - 사용자 턴은 답변 생성 전에, 에이전트 답변은 생성 후에 넣는다 (선 자동 채움이 이번 질문까지 보도록)
+# - created_at은 큐에 넣는 시점에 정해 두므로 늦게 플러시되어도 대화 순서는 그대로
+# - 같은 강아지의 기록을 읽는 요청은 flush_for_dog()로 먼저 비워 방금 쓴 내용을 볼 수 있게 한다 (같은 워커 기준)
+# - 종료 시 남은 항목을 모두 플러시
+# - 플러시 실패 시 행은 큐 앞으로 되돌리되, max_pending을 넘으면 가장 오래된 행부터 버린다 (result="dropped")
+
+
+def user_row(dog_id: int, question: str, asked_at: datetime) -> Dict[str, Any]:
+    return {"dog_id": dog_id, "role": "user", "content": question, "agent": None, "created_at": asked_at}
+
+
+def answer_rows(dog_id: int, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """답변이 있는 에이전트마다 assistant 1행."""
+    answered_at = datetime.utcnow()
+    rows = []
+    for r in results:
+        answer = r.get("answer") or ""
+        if not answer.strip():
+            continue
+        rows.append({
+            "dog_id": dog_id,
+            "role": "assistant",
+            "content": answer,
+            "agent": r.get("agent") or "assistant",
+            "created_at": answered_at,
+        })
+    return rows
+
+
+class ChatWriteBehind:
+    def __init__(self, interval_s: float = 0.25, batch_size: int = 200, max_pending: int = 5000) -> None:
+        self.interval_s = interval_s
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_dogs: Counter = Counter()
+        self._lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        self._pending.extend(rows)
+        self._pending_dogs.update(r["dog_id"] for r in rows)
+        CHAT_WRITE_BEHIND.inc(len(rows), result="queued")
+        if self._task is None or len(self._pending) >= self.max_pending:
+            # 플러시 태스크가 없거나(스크립트 등) 큐가 한도를 넘으면 요청 경로에서 직접 비운다 (backpressure)
+            await self.flush()
+        elif len(self._pending) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    async def flush_for_dog(self, dog_id: int) -> None:
+        # 진행 중인 플러시가 있으면 그 안에 이 강아지의 행이 있을 수 있으므로 끝날 때까지 기다린다
+        if self._pending_dogs.get(dog_id) or self._lock.locked():
+            await self.flush()
+
+    async def flush(self) -> int:
+        async with self._lock:
+            rows, self._pending = self._pending, []
+            self._pending_dogs.clear()
+            if not rows:
+                return 0
+            written = 0
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                try:
+                    written += await _insert(batch)
+                except IntegrityError:
+                    # 플러시 전에 강아지가 삭제된 경우 등: 행 단위로 다시 넣고 실패한 행만 버린다
+                    written += await _insert_each(batch)
+                except Exception as e:
+                    # 일시적 오류: 남은 행을 큐 앞에 되돌려 다음 주기에 재시도
+                    remaining = rows[start:]
+                    self._pending[:0] = remaining
+                    self._pending_dogs.update(r["dog_id"] for r in remaining)
+                    CHAT_WRITE_BEHIND.inc(len(remaining), result="retried")
+                    logger.warning("chat write-behind flush failed (%d rows requeued): %r", len(remaining), e)
+                    self._trim_overflow()
+                    break
+            return written
+
+    def _trim_overflow(self) -> None:
+        # DB 장애가 이어지면 큐가 한없이 자라지 않도록 max_pending을 넘는 가장 오래된 행을 버린다
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return
+        del self._pending[:overflow]
+        self._pending_dogs = Counter(r["dog_id"] for r in self._pending)
+        CHAT_WRITE_BEHIND.inc(overflow, result="dropped")
+        logger.error("chat write-behind queue over %d rows; dropped %d oldest", self.max_pending, overflow)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("chat write-behind loop error: %r", e)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # 남은 항목 드레인
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning("chat write-behind final flush failed: %r", e)
+        if self._pending:
+            CHAT_WRITE_BEHIND.inc(len(self._pending), result="dropped")
+            logger.error("chat write-behind dropped %d rows on shutdown", len(self._pending))
+
+
+async def _insert(rows: List[Dict[str, Any]]) -> int:
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(ChatMessage), rows)
+        await session.commit()
+    CHAT_WRITE_BEHIND.inc(len(rows), result="written")
+    return len(rows)
+
+
+async def _insert_each(rows: List[Dict[str, Any]]) -> int:
+    written = 0
+    async with AsyncSessionLocal() as session:
+        for row in rows:
+            try:
+                async with session.begin_nested():
+                    await session.execute(insert(ChatMessage), [row])
+                written += 1
+            except IntegrityError:
+                CHAT_WRITE_BEHIND.inc(result="dropped")
+                logger.warning("chat write-behind dropped a row for dog %s (integrity error)", row["dog_id"])
+        await session.commit()
+    CHAT_WRITE_BEHIND.inc(written, result="written")
+    return written
+
+
+_WRITER: Optional[ChatWriteBehind] = None
+
+
+def get_writer() -> ChatWriteBehind:
+    global _WRITER
+    if _WRITER is None:
+        cfg = get_settings()
+        _WRITER = ChatWriteBehind(cfg.chat_write_interval_ms / 1000.0, cfg.chat_write_batch_size, cfg.chat_write_max_pending)
+    return _WRITER
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from services.metrics import DB_QUERY_WARNINGS
+
+
+logger = logging.getLogger(__name__)
+
+# 요청 단위 DB 사용량(쿼리 수/행 수/DB 시간) 집계와 N+1 의심 패턴 탐지
+# - db.database의 cursor 이벤트와 ORM load 이벤트가 현재 요청의 QueryStats에 기록
+# - HTTP 요청은 MetricsMiddleware가 시작/종료를 관리
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)|\(\s*%\(\w+\)s(?:\s*,\s*%\(\w+\)s)+\s*\)")
+_NUMBERED = re.compile(r"\$\d+")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """바인드 값과 IN 목록 길이를 무시한 문장 형태 (같은 형태의 반복 = N+1 의심)."""
+    s = _SPACES.sub(" ", statement.strip())
+    s = _NUMBERED.sub("?", s)
+    return _IN_LIST.sub("(?)", s)
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.queries = 0
+        # ORM으로 로드된 객체 수 + DML로 영향받은 행 수
+        self.rows = 0
+        self.time_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record_query(self, statement: str, elapsed_s: float, rowcount: int = -1) -> None:
+        self.queries += 1
+        self.time_ms += elapsed_s * 1000.0
+        if rowcount > 0:
+            self.rows += rowcount
+        self.shapes[statement_shape(statement)] += 1
+
+    def record_rows(self, n: int = 1) -> None:
+        self.rows += n
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        return [
+            {"statement": shape[:300], "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def snapshot(self, repeat_threshold: int = 3) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "rows": self.rows,
+            "time_ms": round(self.time_ms, 3),
+            "repeated": self.repeated(repeat_threshold),
+        }
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def begin_query_stats():
+    return _current_stats.set(QueryStats())
+
+
+def end_query_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+def check_query_stats(stats: QueryStats, route: str, budget: int, repeat_threshold: int) -> None:
+    """쿼리 예산 초과/같은 형태 반복을 경고 로그와 메트릭으로 남깁니다."""
+    if budget and stats.queries > budget:
+        DB_QUERY_WARNINGS.inc(kind="budget", route=route)
+        logger.warning(
+            "%s issued %d queries (budget %d, rows=%d, db=%.1f ms)",
+            route, stats.queries, budget, stats.rows, stats.time_ms,
+        )
+    for item in stats.repeated(repeat_threshold):
+        DB_QUERY_WARNINGS.inc(kind="repeated", route=route)
+        logger.warning("%s repeated the same statement %d times (possible N+1): %s", route, item["count"], item["statement"])
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from db.models import Dog, DogInfoItem
+from services.metrics import CACHE_REQUESTS
+
+
+# 메시지 엔드포인트용 강아지 컨텍스트(dog_ctx) 캐시
+# - 워커 프로세스 내 LRU, 키는 dog_id, 값은 (context_version, dog_ctx)
+# - 강아지/정보 항목을 바꾸는 코드는 bump_context_version()으로 버전을 올린다
+# - 멀티 워커에서는 조회 시 dogs.context_version 단일 컬럼(PK 조회)만 확인해 다른 워커의 변경을 감지
+
+
+class DogContextCache:
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, dog_id: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        entry = self._entries.get(dog_id)
+        if entry is not None:
+            self._entries.move_to_end(dog_id)
+        return entry
+
+    def put(self, dog_id: int, version: int, ctx: Dict[str, Any]) -> None:
+        self._entries[dog_id] = (version, ctx)
+        self._entries.move_to_end(dog_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, dog_id: int) -> None:
+        self._entries.pop(dog_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: Optional[DogContextCache] = None
+
+
+def get_cache() -> DogContextCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = DogContextCache(get_settings().dog_context_cache_size)
+    return _CACHE
+
+
+def format_profile_text(ctx: Dict[str, Any]) -> str:
+    lines = []
+    if ctx.get("name"):
+        lines.append(f"이름: {ctx['name']}")
+    if ctx.get("breed"):
+        lines.append(f"견종: {ctx['breed']}")
+    if ctx.get("sex"):
+        lines.append(f"성별: {ctx['sex']}")
+    if ctx.get("birth_date"):
+        lines.append(f"생년월일: {ctx['birth_date']}")
+    if ctx.get("neutered") is not None:
+        lines.append(f"중성화: {'예' if ctx['neutered'] else '아니오'}")
+    if ctx.get("weight_kg") is not None:
+        lines.append(f"체중: {ctx['weight_kg']} kg")
+    return "\n".join(lines) or "(강아지 정보 없음)"
+
+
+def format_info_text(ctx: Dict[str, Any]) -> str:
+    lines = []
+    for it in ctx.get("info") or []:
+        cat = it.get("category")
+        key = it.get("key")
+        ans = it.get("answer")
+        upd = it.get("updated_at")
+        if ans is None or str(ans).strip() == "":
+            continue
+        label = f"{cat}:{key}" if cat and key else (key or cat or "항목")
+        suffix = f" (업데이트: {upd})" if upd else ""
+        lines.append(f"- {label}: {ans}{suffix}")
+    return "\n".join(lines) or "(추가 강아지 정보 없음)"
+
+
+async def _load(session: AsyncSession, dog_id: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+    dog = (await session.execute(select(Dog).where(Dog.id == dog_id))).scalar_one_or_none()
+    if dog is None:
+        return None
+    # 저장된 dog_info (답변 있는 것만)
+    info_rows = (
+        await session.execute(
+            select(DogInfoItem).where(
+                DogInfoItem.dog_id == dog.id,
+                (DogInfoItem.answer_text.is_not(None)) & (DogInfoItem.answer_text != ""),
+            )
+        )
+    ).scalars().all()
+    ctx: Dict[str, Any] = {
+        "id": dog.id,
+        "user_id": dog.user_id,
+        "name": dog.name,
+        "breed": dog.breed,
+        "birth_date": dog.birth_date.isoformat() if dog.birth_date else None,
+        "sex": dog.sex.value if hasattr(dog.sex, "value") else str(dog.sex),
+        "neutered": dog.neutered,
+        "weight_kg": dog.weight_kg,
+        "info": [
+            {
+                "category": r.category.value if hasattr(r.category, "value") else str(r.category),
+                "key": r.key,
+                "question": r.question,
+                "answer": r.answer_text,
+                "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+            }
+            for r in info_rows
+        ],
+    }
+    # 에이전트마다 다시 포맷하지 않도록 프롬프트용 텍스트를 미리 만들어 둔다
+    ctx["formatted"] = {"profile": format_profile_text(ctx), "info_items": format_info_text(ctx)}
+    return dog.context_version or 0, ctx
+
+
+async def get_dog_context(session: AsyncSession, dog_id: int) -> Optional[Dict[str, Any]]:
+    """dog_ctx를 반환합니다. 강아지가 없으면 None. (반환값은 캐시와 공유하지 않는 얕은 복사본)"""
+    cache = get_cache()
+    cached = cache.get(dog_id)
+    if cached is not None:
+        if not get_settings().dog_context_cache_validate:
+            CACHE_REQUESTS.inc(cache="dog_context", result="hit")
+            return dict(cached[1])
+        version = (
+            await session.execute(select(Dog.context_version).where(Dog.id == dog_id))
+        ).scalar_one_or_none()
+        if version is None:
+            # 다른 워커에서 삭제됨
+            cache.invalidate(dog_id)
+            CACHE_REQUESTS.inc(cache="dog_context", result="miss")
+            return None
+        if version == cached[0]:
+            CACHE_REQUESTS.inc(cache="dog_context", result="hit")
+            return dict(cached[1])
+    CACHE_REQUESTS.inc(cache="dog_context", result="miss")
+    loaded = await _load(session, dog_id)
+    if loaded is None:
+        cache.invalidate(dog_id)
+        return None
+    version, ctx = loaded
+    cache.put(dog_id, version, ctx)
+    return dict(ctx)
+
+
+async def bump_context_version(session: AsyncSession, dog_id: int) -> None:
+    """강아지 컨텍스트를 바꾸는 트랜잭션 안에서 호출합니다. (커밋은 호출자가 수행)"""
+    await session.execute(
+        update(Dog)
+        .where(Dog.id == dog_id)
+        .values(context_version=Dog.context_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    cache = get_cache()
+    cache.invalidate(dog_id)
+    # 커밋 전에 다른 요청이 이전 값을 다시 캐시했을 수 있으므로 커밋 직후 한 번 더 비운다
+    event.listen(session.sync_session, "after_commit", lambda _s: cache.invalidate(dog_id), once=True)
+
+
+def invalidate_dog_context(dog_id: int) -> None:
+    get_cache().invalidate(dog_id)
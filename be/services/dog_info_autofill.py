@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from db.models import DogInfoItem, QuestionType
+from services.chat_writer import get_writer
+from services.dog_context import bump_context_version
+from services.history_summary import history_text as format_history, load_history
+from services.llm import get_chat_model, llm_agent
+
+
+# 대화 기록 기반 dog_info 자동 채움 (엄격 모드: 확실한 값만 미답변 항목에 반영)
+# - /info/auto-fill-from-history 엔드포인트와 메시지 엔드포인트(답변 전 선 실행)가 함께 사용
+# - 반영된 항목이 있으면 context_version을 올려 다음 get_dog_context가 새 값을 읽는다
+
+
+async def autofill_from_history(session: AsyncSession, dog_id: int) -> List[DogInfoItem]:
+    """미답변 항목을 대화 기록에서 추출해 채우고, 갱신된 항목을 반환합니다."""
+    # 미답변 항목 리스트업
+    missing = (
+        await session.execute(
+            select(DogInfoItem).where(
+                DogInfoItem.dog_id == dog_id,
+                (DogInfoItem.answer_text.is_(None)) | (DogInfoItem.answer_text == ""),
+            )
+        )
+    ).scalars().all()
+    if not missing:
+        return []
+
+    # 최근 채팅 히스토리 취합 (write-behind 대기 중인 교환도 포함되도록 먼저 플러시)
+    await get_writer().flush_for_dog(dog_id)
+    # 롤링 요약 + 워터마크 이후 최근 메시지 (전체 기록을 읽지 않음)
+    history = await load_history(session, dog_id, tail_limit=100)
+    history_text = format_history(history)[-5000:]
+
+    # LLM으로 추출 지시 (엄격 모드)
+    settings = get_settings()
+    llm = get_chat_model(settings)
+    allowed = [f"{r.category.value}:{r.key}" for r in missing]
+    system = (
+        "다음은 반려견과의 대화 기록입니다.\n"
+        "다음 규칙으로 매우 엄격하게 정보를 추출합니다.\n"
+        "- 오직 매우 확실한(high) 경우에만 값을 포함하세요. 불확실하면 해당 키를 아예 생략하세요.\n"
+        "- 키는 '카테고리:키' 형식이며, 아래 허용 목록에 포함된 키만 출력하세요.\n"
+        "- 출력 형식(JSON): { 'diet:feeding_method': { 'value': '...', 'confidence': 'high|medium|low' }, 'behavior:barking': { 'value': 'true|false', 'confidence': 'high|medium|low' } }\n"
+        "- boolean은 반드시 'true' 또는 'false' 문자열로 출력하세요.\n"
+        f"허용 키 목록: {', '.join(allowed)}"
+    )
+    prompt = [
+        ("system", system),
+        ("human", history_text or "대화 없음"),
+    ]
+    with llm_agent("autofill"):
+        raw = await llm.ainvoke(prompt)
+    content = getattr(raw, "content", "") if raw else ""
+    extracted = {}
+    try:
+        extracted = json.loads(content) if isinstance(content, str) else {}
+    except Exception:
+        extracted = {}
+
+    def is_uncertain_text(s: str) -> bool:
+        s2 = s.strip().lower()
+        uncertain_tokens = [
+            "아마", "추정", "가능", "같", "모름", "불확실", "추측", "기억 안",
+            "maybe", "probably", "likely", "unknown", "unsure", "not sure",
+        ]
+        return any(tok in s2 for tok in uncertain_tokens)
+
+    updated_rows: List[DogInfoItem] = []
+    for r in missing:
+        key_full = f"{r.category.value}:{r.key}"
+        if key_full not in extracted:
+            continue
+        entry = extracted[key_full]
+        # 허용 스키마: { value, confidence } 또는 과거 문자열 값
+        conf = None
+        val = entry
+        if isinstance(entry, dict):
+            conf = str(entry.get("confidence", "")).strip().lower()
+            val = entry.get("value")
+        # confidence 체크: high만 반영
+        if conf is not None and conf != "high":
+            continue
+        # 값 전처리
+        if r.question_type == QuestionType.boolean:
+            sval = str(val).strip().lower()
+            if sval in ("yes", "true", "1", "y", "예", "네"):
+                norm = "true"
+            elif sval in ("no", "false", "0", "n", "아니오", "아니요"):
+                norm = "false"
+            else:
+                # 불명확: 스킵
+                continue
+            val_norm = norm
+        else:
+            sval = str(val or "").strip()
+            # 너무 짧거나 불확실한 표현은 제외
+            if len(sval) < 2 or is_uncertain_text(sval):
+                continue
+            val_norm = sval
+
+        r.answer_text = val_norm
+        r.source = "history"
+        r.updated_at = datetime.utcnow()
+        updated_rows.append(r)
+
+    if updated_rows:
+        await bump_context_version(session, dog_id)
+        await session.commit()
+
+    return updated_rows
+
+
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import and_, exists, func, literal, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import dialect_insert
+from db.models import Dog, DogInfoCategory, DogInfoItem, QuestionType
+
+
+# 강아지 정보 기본 질문 은행
+# - 강아지 생성 시 한 번에 bulk insert로 채운다 (조회 요청은 쓰기를 하지 않음)
+# - 질문을 추가하면 QUESTION_BANK_VERSION을 올리고 항목의 since를 새 버전으로 지정
+#   → 앱 시작 시 마이그레이션(dog_info_bank_v<N>)이 이전 적용 버전 이후 추가된 질문(since)만 기존 강아지 전체에 백필
+
+QUESTION_BANK_VERSION = 1
+
+QUESTION_BANK: List[Dict[str, Any]] = [
+    # 식습관(diet)
+    {
+        "category": DogInfoCategory.diet,
+        "key": "feeding_method",
+        "question": "배식 방법은 어떻게 하시나요? (자유급식/시간정해급식 등)",
+        "question_type": QuestionType.text,
+        "since": 1,
+    },
+    {
+        "category": DogInfoCategory.diet,
+        "key": "favorite_treats",
+        "question": "자주 주는 간식이나 선호 간식이 있나요?",
+        "question_type": QuestionType.text,
+        "since": 1,
+    },
+    {
+        "category": DogInfoCategory.diet,
+        "key": "recent_intake_increase",
+        "question": "최근 식사량이 늘었나요?",
+        "question_type": QuestionType.boolean,
+        "since": 1,
+    },
+    # 행동(behavior)
+    {
+        "category": DogInfoCategory.behavior,
+        "key": "bad_habits",
+        "question": "최근 보이는 안 좋은 습관이 있나요?",
+        "question_type": QuestionType.text,
+        "since": 1,
+    },
+    {
+        "category": DogInfoCategory.behavior,
+        "key": "barking",
+        "question": "자주 짖나요?",
+        "question_type": QuestionType.boolean,
+        "since": 1,
+    },
+]
+
+
+def _rows_for(dog_ids: Iterable[int]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return [
+        {
+            "dog_id": dog_id,
+            "category": item["category"],
+            "key": item["key"],
+            "question": item["question"],
+            "question_type": item["question_type"],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for dog_id in dog_ids
+        for item in QUESTION_BANK
+    ]
+
+
+async def seed_dog_info(session: AsyncSession, dog_ids: Iterable[int]) -> None:
+    """질문 은행 항목을 한 문장으로 삽입합니다. 이미 있는 (dog_id, key)는 건너뜁니다. (커밋은 호출자)"""
+    rows = _rows_for(dog_ids)
+    if not rows:
+        return
+    stmt = dialect_insert()(DogInfoItem).on_conflict_do_nothing(index_elements=["dog_id", "key"])
+    await session.execute(stmt, rows)
+
+
+async def is_seeded(session: AsyncSession, dog_id: int) -> bool:
+    count = (
+        await session.execute(select(func.count()).select_from(DogInfoItem).where(DogInfoItem.dog_id == dog_id))
+    ).scalar_one()
+    return count >= len(QUESTION_BANK)
+
+
+def _applied_bank_version(conn: Connection) -> int:
+    # 이전에 적용된 가장 높은 질문 은행 버전 (schema_migrations의 dog_info_bank_v<N>, 없으면 0)
+    versions = conn.execute(
+        text("SELECT version FROM schema_migrations WHERE version LIKE 'dog_info_bank_v%'")
+    ).scalars().all()
+    applied = [int(v.rsplit("_v", 1)[1]) for v in versions if v.rsplit("_v", 1)[1].isdigit()]
+    return max((v for v in applied if v < QUESTION_BANK_VERSION), default=0)
+
+
+def backfill_question_bank(conn: Connection) -> None:
+    """
+    기존 강아지 전체에 빠진 질문을 항목별 INSERT ... SELECT 한 번으로 채웁니다. (마이그레이션 단계)
+    이전에 적용된 은행 버전 이후에 추가된 질문(since > 적용 버전)만 대상
+    """
+    table = DogInfoItem.__table__
+    now = datetime.utcnow()
+    applied = _applied_bank_version(conn)
+    for item in QUESTION_BANK:
+        if item["since"] <= applied:
+            continue
+        missing = ~exists().where(and_(table.c.dog_id == Dog.id, table.c.key == item["key"]))
+        source = select(
+            Dog.id,
+            literal(item["category"], table.c.category.type),
+            literal(item["key"], table.c.key.type),
+            literal(item["question"], table.c.question.type),
+            literal(item["question_type"], table.c.question_type.type),
+            literal(now, table.c.created_at.type),
+            literal(now, table.c.updated_at.type),
+        ).where(missing)
+        conn.execute(
+            table.insert().from_select(
+                ["dog_id", "category", "key", "question", "question_type", "created_at", "updated_at"], source
+            )
+        )
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from db.database import dialect_insert
+from db.models import ChatMessage, DogHistorySummary
+from services.llm import llm_agent
+
+
+logger = logging.getLogger(__name__)
+
+# 강아지별 대화 기록 롤링 요약
+# - dog_history_summaries 1행: 워터마크(last_message_id) 이하 메시지의 건수/기간 집계 + 요약문
+# - 읽기(load_history): 요약 1행 + 워터마크 이후 최근 메시지 LIMIT → 기록 길이와 무관한 비용
+#   (메시지 id는 저장 순서대로 증가하므로 "최근"과 워터마크는 id 기준)
+# - 갱신(refresh_summary): 최근 keep_tail개는 원문으로 남기고 그 이전 구간을 요약문에 접어 넣은 뒤 워터마크 전진
+#   접을 구간이 fold_max개를 넘으면 최근 fold_max개만 요약에 쓰고 나머지는 집계에만 반영 (LLM 호출 1회)
+
+
+@dataclass
+class HistoryView:
+    summary_text: str = ""
+    tail: List[ChatMessage] = field(default_factory=list)  # 오래된 순
+    total: int = 0
+    user_count: int = 0
+    first_at: Optional[datetime] = None
+    last_at: Optional[datetime] = None
+
+    @property
+    def assistant_count(self) -> int:
+        return self.total - self.user_count
+
+
+def format_message(m: ChatMessage) -> str:
+    who = "사용자" if m.role == "user" else (m.agent or "assistant")
+    return f"[{who}] {m.content}"
+
+
+def history_text(view: HistoryView, limit: Optional[int] = None) -> str:
+    """요약문 + 최근 메시지 원문 (limit: 원문으로 쓸 최근 메시지 수)."""
+    tail = view.tail if limit is None else view.tail[-limit:]
+    lines = [format_message(m) for m in tail]
+    if view.summary_text:
+        return f"[이전 대화 요약]\n{view.summary_text}\n\n[최근 대화]\n" + "\n".join(lines)
+    return "\n".join(lines)
+
+
+async def _summary_row(session: AsyncSession, dog_id: int) -> Optional[Any]:
+    # ORM 객체 대신 컬럼으로 읽어 같은 세션의 갱신(core update)을 바로 반영
+    t = DogHistorySummary
+    return (
+        await session.execute(
+            select(t.last_message_id, t.message_count, t.user_count, t.first_at, t.last_at, t.summary_text)
+            .where(t.dog_id == dog_id)
+        )
+    ).one_or_none()
+
+
+async def _aggregate(session: AsyncSession, dog_id: int, after_id: int, upto_id: Optional[int] = None) -> Any:
+    stmt = select(
+        func.count(ChatMessage.id).label("count"),
+        func.coalesce(func.sum(case((ChatMessage.role == "user", 1), else_=0)), 0).label("users"),
+        func.min(ChatMessage.created_at).label("first_at"),
+        func.max(ChatMessage.created_at).label("last_at"),
+    ).where(ChatMessage.dog_id == dog_id, ChatMessage.id > after_id)
+    if upto_id is not None:
+        stmt = stmt.where(ChatMessage.id <= upto_id)
+    return (await session.execute(stmt)).one()
+
+
+def _newest_first(dog_id: int, after_id: int):
+    # id 역순: PK 범위(id > 워터마크)만 훑고 멈춘다. 화면 순서((created_at, id))는 읽은 뒤 정렬
+    return (
+        select(ChatMessage)
+        .where(ChatMessage.dog_id == dog_id, ChatMessage.id > after_id)
+        .order_by(ChatMessage.id.desc())
+    )
+
+
+def _chronological(rows: List[ChatMessage]) -> List[ChatMessage]:
+    return sorted(rows, key=lambda m: (m.created_at, m.id))
+
+
+async def load_history(session: AsyncSession, dog_id: int, tail_limit: int) -> HistoryView:
+    """요약 + 워터마크 이후 최근 tail_limit개 메시지와 전체 집계를 반환합니다."""
+    summary = await _summary_row(session, dog_id)
+    watermark = summary.last_message_id if summary else 0
+    rows = list((await session.execute(_newest_first(dog_id, watermark).limit(tail_limit + 1))).scalars().all())
+    tail = _chronological(rows[:tail_limit])
+
+    view = HistoryView(tail=tail)
+    if summary is not None:
+        view.summary_text = summary.summary_text or ""
+        view.total = summary.message_count
+        view.user_count = summary.user_count
+        view.first_at = summary.first_at
+        view.last_at = summary.last_at
+    if len(rows) <= tail_limit:
+        # 워터마크 이후 전체가 tail에 들어온 경우 추가 쿼리 없이 집계
+        count = len(tail)
+        users = sum(1 for m in tail if m.role == "user")
+        first = tail[0].created_at if tail else None
+        last = tail[-1].created_at if tail else None
+    else:
+        agg = await _aggregate(session, dog_id, watermark)
+        count, users, first, last = agg.count, int(agg.users), agg.first_at, agg.last_at
+    view.total += count
+    view.user_count += users
+    if first is not None and (view.first_at is None or first < view.first_at):
+        view.first_at = first
+    if last is not None and (view.last_at is None or last > view.last_at):
+        view.last_at = last
+    return view
+
+
+async def refresh_summary(session: AsyncSession, dog_id: int, llm: Any) -> bool:
+    """
+    최근 keep_tail개를 제외한 미요약 메시지가 fold_min개 이상이면 요약문에 접어 넣고 워터마크를 올립니다.
+    갱신했으면 True. (커밋은 호출자)
+    """
+    cfg = get_settings()
+    summary = await _summary_row(session, dog_id)
+    watermark = summary.last_message_id if summary else 0
+    previous_text = (summary.summary_text if summary else "") or ""
+
+    # 최근 keep_tail개 바로 앞 메시지가 새 워터마크
+    boundary = (
+        await session.execute(
+            select(ChatMessage.id)
+            .where(ChatMessage.dog_id == dog_id, ChatMessage.id > watermark)
+            .order_by(ChatMessage.id.desc())
+            .offset(cfg.history_summary_keep_tail)
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+    if boundary is None:
+        return False
+    agg = await _aggregate(session, dog_id, watermark, boundary)
+    if agg.count < cfg.history_summary_fold_min:
+        return False
+
+    folded = _chronological(
+        (
+            await session.execute(
+                _newest_first(dog_id, watermark).where(ChatMessage.id <= boundary).limit(cfg.history_summary_fold_max)
+            )
+        ).scalars().all()
+    )
+    skipped = agg.count - len(folded)
+    new_text = "\n".join(format_message(m) for m in folded)
+    system = (
+        "다음은 반려견 보호자와 상담 에이전트들의 대화 기록입니다.\n"
+        f"이전 요약과 새 대화를 합쳐 {cfg.history_summary_max_chars}자 이내의 한국어 요약으로 갱신하세요.\n"
+        "- 증상/행동/식이/복약/병원 방문 등 임상적으로 의미 있는 사실과 시기를 보존\n"
+        "- 보호자의 반복되는 관심사와 에이전트의 주요 권고를 포함\n"
+        "- 추측하지 말고 대화에 나온 내용만 사용, 요약문만 출력"
+    )
+    human = (
+        f"[이전 요약]\n{previous_text or '(없음)'}\n\n"
+        + (f"(요약에 반영하지 못한 이전 대화 {skipped}건 생략)\n\n" if skipped > 0 else "")
+        + f"[새 대화]\n{new_text}"
+    )
+    try:
+        with llm_agent("history_summary"):
+            raw = await llm.ainvoke([("system", system), ("human", human)])
+    except Exception as e:
+        logger.warning("history summary fold failed for dog %s: %r", dog_id, e)
+        return False
+    text = (getattr(raw, "content", "") if raw else "").strip()[: cfg.history_summary_max_chars] or previous_text
+    now = datetime.utcnow()
+    if summary is None:
+        # 첫 요약: 동시에 만든 다른 요청이 있으면 그쪽만 반영
+        result = await session.execute(
+            dialect_insert()(DogHistorySummary)
+            .values(
+                dog_id=dog_id,
+                last_message_id=boundary,
+                message_count=agg.count,
+                user_count=int(agg.users),
+                first_at=agg.first_at,
+                last_at=agg.last_at,
+                summary_text=text,
+                updated_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=["dog_id"])
+        )
+        return result.rowcount == 1
+
+    first_at = min(d for d in (summary.first_at, agg.first_at) if d is not None)
+    last_at = max(d for d in (summary.last_at, agg.last_at) if d is not None)
+    # 같은 구간을 동시에 접는 다른 요청이 있으면 먼저 커밋한 쪽만 반영 (워터마크 비교)
+    result = await session.execute(
+        update(DogHistorySummary)
+        .where(DogHistorySummary.dog_id == dog_id, DogHistorySummary.last_message_id == watermark)
+        .values(
+            last_message_id=boundary,
+            message_count=DogHistorySummary.message_count + agg.count,
+            user_count=DogHistorySummary.user_count + int(agg.users),
+            first_at=first_at,
+            last_at=last_at,
+            summary_text=text,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
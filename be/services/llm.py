@@ -1,24 +1,127 @@
 from __future__ import annotations
 
-from typing import Optional
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from uuid import UUID
 
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import LLMResult
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from core.config import get_settings, Settings
+from services.metrics import CACHE_REQUESTS, LLM_TOKENS
+from services.request_context import current_route
+from services.usage import get_rollup
 
 
-def get_chat_model(settings: Optional[Settings] = None) -> ChatOpenAI:
+# 현재 LLM 호출을 집계할 에이전트 라벨 (asyncio 태스크별로 분리됨)
+_current_agent: ContextVar[str] = ContextVar("llm_agent", default="unknown")
+
+
+@contextmanager
+def llm_agent(name: str) -> Iterator[None]:
+    token = _current_agent.set(name)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+def extract_usage(response: LLMResult) -> Dict[str, int]:
+    """LLMResult에서 prompt/completion/cached 토큰 수를 추출합니다."""
+    prompt = completion = cached = 0
+    found = False
+    for gens in response.generations or []:
+        for gen in gens:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if not usage:
+                continue
+            found = True
+            prompt += int(usage.get("input_tokens") or 0)
+            completion += int(usage.get("output_tokens") or 0)
+            cached += int((usage.get("input_token_details") or {}).get("cache_read") or 0)
+    if not found:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if not token_usage:
+            return {}
+        prompt = int(token_usage.get("prompt_tokens") or 0)
+        completion = int(token_usage.get("completion_tokens") or 0)
+        cached = int((token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0)
+    return {"prompt": prompt, "completion": completion, "cached": cached}
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """LLM 호출 종료 시 토큰 사용량과 지연을 메트릭/일별 롤업으로 집계합니다."""
+
+    # 이벤트 루프에서 바로 실행해 contextvar(에이전트 라벨, 요청 라우트)를 그대로 읽는다
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None) if run_id is not None else None
+        latency_ms = (time.perf_counter() - started) * 1000.0 if started is not None else 0.0
+        usage = extract_usage(response)
+        agent = _current_agent.get()
+        get_rollup().record(agent, current_route(), usage, latency_ms)
+        if not usage:
+            return
+        LLM_TOKENS.inc(usage["prompt"], agent=agent, kind="prompt")
+        LLM_TOKENS.inc(usage["completion"], agent=agent, kind="completion")
+        LLM_TOKENS.inc(usage["cached"], agent=agent, kind="cached")
+        CACHE_REQUESTS.inc(cache="llm_prompt", result="hit" if usage["cached"] else "miss")
+
+
+_USAGE_HANDLER = UsageCallbackHandler()
+
+
+def get_chat_model(settings: Optional[Settings] = None) -> BaseChatModel:
     cfg = settings or get_settings()
+    if cfg.llm_backend == "stub":
+        from services.stubs import StubChatModel
+
+        return StubChatModel(
+            latency_ms=cfg.stub_llm_latency_ms,
+            prefill_tps=cfg.stub_llm_prefill_tps,
+            decode_tps=cfg.stub_llm_decode_tps,
+            callbacks=[_USAGE_HANDLER],
+        )
     if not cfg.openai_api_key or not cfg.openai_api_key.strip():
         raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다. .env에 OPENAI_API_KEY를 지정하세요.")
     return ChatOpenAI(
         api_key=cfg.openai_api_key or None,
+        # OpenAI 호환 로컬 서버(vLLM, llama.cpp 등)를 쓸 때 지정
+        base_url=cfg.openai_base_url or None,
         model=cfg.openai_model,
         temperature=cfg.temperature,
+        # 스트리밍 호출에서도 마지막 청크로 토큰 사용량을 받는다
+        stream_usage=True,
+        callbacks=[_USAGE_HANDLER],
     )
 
 
-def get_embeddings_model(settings: Optional[Settings] = None) -> OpenAIEmbeddings:
+def get_embeddings_model(settings: Optional[Settings] = None) -> Embeddings:
     cfg = settings or get_settings()
-    return OpenAIEmbeddings(api_key=cfg.openai_api_key or None, model=cfg.embeddings_model)
+    if cfg.vector_backend == "stub":
+        from services.stubs import StubEmbeddings
 
+        return StubEmbeddings(size=256, latency_ms=cfg.stub_embed_latency_ms)
+    return OpenAIEmbeddings(
+        api_key=cfg.openai_api_key or None,
+        base_url=cfg.openai_base_url or None,
+        model=cfg.embeddings_model,
+    )
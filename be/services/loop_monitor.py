@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from services.metrics import LOOP_BLOCKED, LOOP_LAG
+
+
+logger = logging.getLogger(__name__)
+
+# 오프렌더 판별에 사용할 애플리케이션 패키지 (프레임워크/표준 라이브러리 프레임은 건너뜀)
+APP_PACKAGES = ("app.", "services.", "graph.", "db.", "api.", "core.", "scripts.")
+# 모든 요청 스택에 끼어 있는 계측용 래퍼는 원인에서 제외
+INSTRUMENTATION_MODULES = ("app.middleware:", "services.spans:", "services.metrics:")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}:{frame.f_lineno}"
+
+
+def _stack_labels(frame) -> List[str]:
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def find_offender(labels: List[str]) -> str:
+    """가장 안쪽(호출 깊은 쪽)의 애플리케이션 프레임을 블로킹 원인으로 봅니다."""
+    for label in reversed(labels):
+        if label.startswith(APP_PACKAGES) and not label.startswith(INSTRUMENTATION_MODULES):
+            return label.rsplit(":", 1)[0]
+    return labels[-1].rsplit(":", 1)[0] if labels else "unknown"
+
+
+class LoopLagMonitor:
+    """이벤트 루프 스케줄링 지연을 상시 측정하고, 임계값을 넘으면 블로킹 중인 스택을 잡습니다.
+
+    - 루프 안의 tick 태스크: interval마다 깨어나 실제 지연(lag)을 히스토그램으로 기록
+    - 별도 watchdog 스레드: tick이 임계값 이상 늦어지면 루프 스레드의 현재 스택을 캡처
+      (루프가 막혀 있는 동안에도 동작해야 하므로 스레드로 구현)
+    """
+
+    def __init__(self, interval_s: float = 0.05, threshold_s: float = 0.1) -> None:
+        self.interval_s = interval_s
+        self.threshold_s = threshold_s
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.perf_counter()
+        self._reported_beat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """이벤트 루프 스레드에서 호출해야 합니다."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _tick(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            self._last_beat = t0
+            await asyncio.sleep(self.interval_s)
+            lag = time.perf_counter() - t0 - self.interval_s
+            LOOP_LAG.observe(max(lag, 0.0))
+
+    def _watchdog(self) -> None:
+        check = max(min(self.threshold_s / 2.0, self.interval_s), 0.005)
+        while not self._stop.wait(check):
+            beat = self._last_beat
+            stalled = time.perf_counter() - beat - self.interval_s
+            # 한 번의 정체(같은 beat)는 한 번만 보고
+            if stalled < self.threshold_s or beat == self._reported_beat:
+                continue
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            labels = _stack_labels(frame)
+            offender = find_offender(labels)
+            LOOP_BLOCKED.inc(offender=offender)
+            logger.warning(
+                "event loop blocked for >= %.0f ms by %s\n  %s",
+                stalled * 1000.0,
+                offender,
+                "\n  ".join(labels),
+            )
+
+
+_MONITOR: Optional[LoopLagMonitor] = None
+
+
+def get_monitor(interval_s: float = 0.05, threshold_s: float = 0.1) -> LoopLagMonitor:
+    global _MONITOR
+    if _MONITOR is None:
+        _MONITOR = LoopLagMonitor(interval_s=interval_s, threshold_s=threshold_s)
+    return _MONITOR
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Prometheus 텍스트 포맷 메트릭 (외부 의존성 없음)
+# - 워커 프로세스마다 독립 레지스트리를 가진다. (멀티 워커면 스크레이프한 워커의 값만 노출)
+# - 기록은 스레드별 샤드(dict)에만 하므로 핫패스에 락이 없다.
+# - /metrics 스크레이프 시점에만 샤드를 합산한다.
+
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._local = threading.local()
+        # list.append는 GIL 하에서 원자적이므로 샤드 등록에도 락이 필요 없다
+        self._shards: List[Dict[Tuple[str, ...], object]] = []
+
+    def _shard(self) -> Dict[Tuple[str, ...], object]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[Tuple[str, ...], object] = {}
+            self._local.shard = shard
+            self._shards.append(shard)
+            return shard
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _snapshots(self) -> List[Dict[Tuple[str, ...], object]]:
+        # dict(...) 복사는 GIL 하에서 원자적 → 기록 중인 샤드도 안전하게 읽는다
+        return [dict(s) for s in list(self._shards)]
+
+    def render(self) -> List[str]:  # pragma: no cover - 하위 클래스 구현
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount  # type: ignore[operator]
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        merged: Dict[Tuple[str, ...], float] = {}
+        for snap in self._snapshots():
+            for key, v in snap.items():
+                merged[key] = merged.get(key, 0.0) + float(v)  # type: ignore[arg-type]
+        return merged
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self.collect().items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: object) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [버킷별 카운트(+Inf 포함), 합계, 개수]
+            state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            shard[key] = state
+        state[0][bisect_left(self.buckets, value)] += 1  # type: ignore[index]
+        state[1] += value  # type: ignore[index]
+        state[2] += 1  # type: ignore[index]
+
+    def collect(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        merged: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+        for snap in self._snapshots():
+            for key, state in snap.items():
+                counts, total, n = state  # type: ignore[misc]
+                if key in merged:
+                    m_counts, m_total, m_n = merged[key]
+                    merged[key] = ([a + b for a, b in zip(m_counts, counts)], m_total + total, m_n + n)
+                else:
+                    merged[key] = (list(counts), total, n)
+        return merged
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for key, (counts, total, n) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        # 같은 이름 재등록(모듈 리로드 등)은 기존 인스턴스를 그대로 사용
+        return self._metrics.setdefault(metric.name, metric)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        out: List[str] = []
+        for metric in self._metrics.values():
+            out.append(f"# HELP {metric.name} {metric.documentation}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.render())
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+
+@contextmanager
+def timed(metric: Histogram, **labels: object) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.observe(time.perf_counter() - t0, **labels)
+
+
+def render_latest() -> str:
+    return REGISTRY.render()
+
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# 파이프라인 단계별 메트릭 정의
+HTTP_REQUEST_DURATION = histogram(
+    "shallow_http_request_duration_seconds", "HTTP 요청 처리 시간(라우트별)", ["method", "route", "status"]
+)
+GRAPH_NODE_DURATION = histogram(
+    "shallow_graph_node_duration_seconds", "QA 그래프 노드(plan/execute) 실행 시간", ["node"]
+)
+AGENT_STAGE_DURATION = histogram(
+    "shallow_agent_stage_duration_seconds", "에이전트 단계별(embed/search/llm) 실행 시간", ["agent", "stage"]
+)
+DB_QUERY_DURATION = histogram(
+    "shallow_db_query_duration_seconds", "DB 쿼리 실행 시간", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REPORT_PDF_RENDER_DURATION = histogram(
+    "shallow_report_pdf_render_seconds", "보고서 PDF 렌더링 시간(렌더 워커 안에서 측정)"
+)
+PDF_RENDER_WAIT = histogram(
+    "shallow_report_pdf_render_wait_seconds", "PDF 렌더 풀 대기 + 프로세스 간 전달 시간"
+)
+REPORT_JOBS = counter(
+    "shallow_report_jobs_total", "보고서 생성 작업 (submitted/deduplicated/upgraded/retried/succeeded/failed)", ["result"]
+)
+REPORT_GENERATIONS = counter(
+    "shallow_report_generations_total", "보고서 생성 방식 (full/incremental/unchanged)", ["mode"]
+)
+PDF_RENDER_REJECTED = counter("shallow_report_pdf_render_rejected_total", "렌더 풀 포화로 거절된 PDF 요청 수")
+LLM_TOKENS = counter("shallow_llm_tokens_total", "LLM 토큰 사용량", ["agent", "kind"])
+ERRORS = counter("shallow_errors_total", "처리 중 발생한 오류 수", ["stage"])
+CACHE_REQUESTS = counter("shallow_cache_requests_total", "캐시 조회 결과(hit/miss)", ["cache", "result"])
+QA_FLOW_DURATION = histogram(
+    "shallow_qa_flow_duration_seconds", "run_qa_flow 전체 실행 시간(트레이스 샘플링과 무관하게 전수 집계)", ["outcome"]
+)
+TRACES = counter("shallow_traces_total", "트레이스 샘플링 결정", ["decision", "reason"])
+LOOP_LAG = histogram(
+    "shallow_event_loop_lag_seconds", "이벤트 루프 스케줄링 지연",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DB_QUERY_WARNINGS = counter(
+    "shallow_db_query_warnings_total", "요청당 쿼리 예산 초과(budget)/같은 문장 반복(repeated) 경고", ["kind", "route"]
+)
+CHAT_WRITE_BEHIND = counter(
+    "shallow_chat_write_behind_rows_total", "QA 교환 write-behind 저장 행 수", ["result"]
+)
+LOOP_BLOCKED = counter("shallow_event_loop_blocked_total", "임계값 이상 이벤트 루프를 막은 횟수(원인 함수별)", ["offender"])
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from core.config import get_settings
+from services.metrics import PDF_RENDER_REJECTED, PDF_RENDER_WAIT, REPORT_PDF_RENDER_DURATION
+
+
+logger = logging.getLogger(__name__)
+
+# 보고서 PDF 렌더링 전용 프로세스 풀
+# - xhtml2pdf 렌더링은 CPU 작업이라 스레드에서도 GIL을 잡아 이벤트 루프(채팅 등 다른 요청)를 느리게 한다
+#   → 별도 프로세스에서 렌더링하고 루프는 결과만 기다린다
+# - 워커는 시작 시 한 번 무거운 import + 한글 폰트 등록 (요청마다 반복하지 않음)
+# - 실행 중 + 대기 중 작업 수를 workers + max_queue로 제한, 넘치면 PdfPoolSaturated (라우터에서 503)
+# - 워커가 죽어 풀이 깨지면 새 풀에서 한 번 재시도, 또 깨지면 PdfPoolSaturated
+# - workers=0이면 프로세스 없이 스레드에서 렌더 (개발/테스트 환경용)
+# - fork 시 이벤트 루프/DB 스레드 상태가 복제되지 않도록 spawn 사용
+
+
+class PdfPoolSaturated(Exception):
+    pass
+
+
+def _init_worker() -> None:
+    from services.report_md import register_report_font
+    import xhtml2pdf.pisa  # noqa: F401
+
+    register_report_font()
+
+
+def _render(md_text: str) -> Tuple[bytes, float]:
+    from services.report_md import markdown_to_pdf_bytes
+
+    t0 = time.perf_counter()
+    pdf = markdown_to_pdf_bytes(md_text)
+    return pdf, time.perf_counter() - t0
+
+
+class PdfRenderPool:
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.workers) + self.max_queue
+
+    def start(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _render_in_pool(self, md_text: str) -> Tuple[bytes, float]:
+        # 워커가 죽으면 풀 전체가 못 쓰게 되므로 새 풀에서 한 번 더 시도하고,
+        # 그래도 실패하면 포화와 같이 503(Retry-After)으로 돌려보낸다
+        for attempt in range(2):
+            self.start()  # 깨진 풀을 버린 뒤라면 새로 만든다
+            executor = self._executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, _render, md_text)
+            except BrokenProcessPool:
+                logger.warning("pdf render pool broken (attempt %d); restarting", attempt + 1)
+                # 동시에 실패한 다른 요청이 이미 새 풀을 만들었으면 그 풀은 그대로 둔다
+                if self._executor is executor:
+                    self.stop()
+        raise PdfPoolSaturated("render pool restarting after a worker crash")
+
+    async def render(self, md_text: str) -> bytes:
+        if self._pending >= self.capacity:
+            PDF_RENDER_REJECTED.inc()
+            raise PdfPoolSaturated(f"{self._pending} renders in progress")
+        self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                pdf, render_s = await asyncio.to_thread(_render, md_text)
+            else:
+                pdf, render_s = await self._render_in_pool(md_text)
+        finally:
+            self._pending -= 1
+        REPORT_PDF_RENDER_DURATION.observe(render_s)
+        PDF_RENDER_WAIT.observe(max(0.0, time.perf_counter() - submitted - render_s))
+        return pdf
+
+
+_POOL: Optional[PdfRenderPool] = None
+
+
+def get_pdf_pool() -> PdfRenderPool:
+    global _POOL
+    if _POOL is None:
+        cfg = get_settings()
+        _POOL = PdfRenderPool(cfg.pdf_render_workers, cfg.pdf_render_max_queue)
+    return _POOL
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# 외부 도구 없이 동작하는 스레드 기반 샘플링 프로파일러
+# - 일정 간격으로 sys._current_frames()를 읽어 모든 스레드의 스택을 수집
+# - 결과는 flamegraph.pl / speedscope 등에서 바로 쓸 수 있는 collapsed-stack 형식
+
+# 이벤트 루프를 막는 대표적인 동기 호출 (qualname 기준 매칭)
+WATCHED_CALLS: Dict[str, str] = {
+    "RAGAgent.retrieve": "retriever",
+    "BaseRetriever.invoke": "retriever.invoke",
+    "markdown_to_pdf_bytes": "markdown_to_pdf_bytes",
+    "write_trace": "write_trace",
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+@dataclass
+class ProfileResult:
+    duration_s: float
+    interval_s: float
+    samples: int
+    stacks: Counter = field(default_factory=Counter)
+    # watched 호출별 (전체 스레드 샘플 수, 이벤트 루프 스레드 샘플 수)
+    blocking: Dict[str, List[int]] = field(default_factory=dict)
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "duration_s": round(self.duration_s, 3),
+            "interval_ms": round(self.interval_s * 1000.0, 3),
+            "samples": self.samples,
+            "blocking": {
+                name: {
+                    "samples": total,
+                    "loop_samples": on_loop,
+                    # 샘플 수 × 간격으로 추정한 시간
+                    "est_ms": round(total * self.interval_s * 1000.0, 1),
+                    "loop_blocked_est_ms": round(on_loop * self.interval_s * 1000.0, 1),
+                }
+                for name, (total, on_loop) in sorted(self.blocking.items())
+            },
+        }
+
+
+class StackSampler:
+    def __init__(self, interval_s: float = 0.01, loop_thread_id: Optional[int] = None) -> None:
+        self.interval_s = interval_s
+        self.loop_thread_id = loop_thread_id
+
+    def run(self, duration_s: float) -> ProfileResult:
+        """duration_s 동안 샘플링합니다. 호출한 스레드는 그동안 블록되므로 워커 스레드에서 실행하세요."""
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        result = ProfileResult(duration_s=0.0, interval_s=self.interval_s, samples=0)
+        started = time.perf_counter()
+        deadline = started + duration_s
+        while time.perf_counter() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                labels: List[str] = []
+                f = frame
+                while f is not None:
+                    labels.append(_frame_label(f))
+                    f = f.f_back
+                labels.reverse()
+                thread_name = names.get(tid) or f"thread-{tid}"
+                if tid == self.loop_thread_id:
+                    thread_name = f"{thread_name}(event-loop)"
+                result.stacks[";".join([thread_name] + labels)] += 1
+                seen = set()
+                for label in labels:
+                    watched = WATCHED_CALLS.get(label.rsplit(":", 1)[-1])
+                    if watched and watched not in seen:
+                        seen.add(watched)
+                        counts = result.blocking.setdefault(watched, [0, 0])
+                        counts[0] += 1
+                        if tid == self.loop_thread_id:
+                            counts[1] += 1
+            result.samples += 1
+            time.sleep(self.interval_s)
+        result.duration_s = time.perf_counter() - started
+        return result
@@ -24,6 +24,10 @@ class AgentIndexRegistry:
 
     def _build_retriever(self, agent_name: str) -> VectorStoreRetriever:
         embeddings = get_embeddings_model(self.settings)
+        if self.settings.vector_backend == "stub":
+            from services.stubs import build_stub_vectorstore
+
+            return build_stub_vectorstore(agent_name, embeddings).as_retriever(search_kwargs={"k": 4})
         vs = Chroma(
             collection_name=agent_name,
             persist_directory=self.settings.chroma_persist_dir,
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from core.config import get_settings
+from db.models import ChatMessage, Dog, DogInfoItem, User
+from services.history_summary import HistoryView
+
+
+logger = logging.getLogger(__name__)
+
+# 보고서 프롬프트용 컨텍스트 (사실마다 한 번, 표 형식)
+# - 구조화 정보: 항목당 한 행(분류|항목|질문|답변|업데이트), 최근 업데이트 순
+#   → 기존의 info_text, 타임라인, answered/missing/by_category/raw JSON 네 벌을 대체
+# - 미답변 항목은 분류별 키 목록 한 줄
+# - 대화: 롤링 요약 + 최근 메시지를 최신부터 토큰 예산 안에서 채운 뒤 시간순 출력 (한 줄 = 시각 화자: 내용)
+# - 토큰 수는 tiktoken(모델 인코딩)으로 세고, 패키지/인코딩 파일이 없으면 2자당 1토큰으로 추정
+
+# 메시지 한 건이 예산을 독차지하지 않도록 자르는 길이
+MESSAGE_MAX_CHARS = 400
+
+
+@lru_cache(maxsize=1)
+def _encoder() -> Optional[Any]:
+    # 인코딩 파일을 처음 받을 때 네트워크를 쓰므로 이벤트 루프 밖(스레드)에서 먼저 불러 둔다 (warm_token_counter)
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    model = get_settings().openai_model
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.info("tiktoken encoding unavailable, estimating tokens: %r", e)
+            return None
+    except Exception as e:
+        logger.info("tiktoken encoding for %s unavailable, estimating tokens: %r", model, e)
+        return None
+
+
+def warm_token_counter() -> str:
+    """토큰 계수기를 준비하고 방식(tiktoken 인코딩 이름 또는 estimate)을 반환합니다."""
+    enc = _encoder()
+    return enc.name if enc is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoder()
+    if enc is None:
+        # 한국어 위주 텍스트 기준 대략 2자당 1토큰 (스텁 LLM과 같은 추정)
+        return max(1, len(text) // 2) if text else 0
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def _cell(value: Any) -> str:
+    text = "" if value is None else str(value)
+    return " ".join(text.split()).replace("|", "/")
+
+
+def _day(dt: Any) -> str:
+    return dt.strftime("%Y-%m-%d") if dt else ""
+
+
+def _answered(it: DogInfoItem) -> bool:
+    return it.answer_text is not None and str(it.answer_text).strip() != ""
+
+
+def profile_text(dog: Dog, age_years: Optional[float]) -> str:
+    return (
+        f"- id: {dog.id}\n- 이름: {dog.name}\n- 견종: {dog.breed}\n- 생년: {dog.birth_date} (추정 나이: {age_years}년)\n"
+        f"- 성별: {dog.sex.value}\n- 중성화: {dog.neutered}\n- 체중(kg): {dog.weight_kg}\n"
+    )
+
+
+def info_table(items: Sequence[DogInfoItem]) -> str:
+    """답변된 항목을 최근 업데이트 순 표로 (같은 항목은 한 번만)"""
+    rows = sorted(
+        (it for it in items if _answered(it)),
+        key=lambda it: it.updated_at.timestamp() if it.updated_at else 0.0,
+        reverse=True,
+    )
+    if not rows:
+        return "(답변된 항목 없음)"
+    lines = ["| 분류 | 항목 | 질문 | 답변 | 업데이트 |", "|---|---|---|---|---|"]
+    lines.extend(
+        f"| {it.category.value} | {it.key} | {_cell(it.question)} | {_cell(it.answer_text)} | {_day(it.updated_at)} |"
+        for it in rows
+    )
+    return "\n".join(lines)
+
+
+def missing_text(items: Sequence[DogInfoItem]) -> str:
+    by_category: Dict[str, List[str]] = {}
+    for it in items:
+        if not _answered(it):
+            by_category.setdefault(it.category.value, []).append(it.key)
+    return "\n".join(f"- {cat}: {', '.join(keys)}" for cat, keys in by_category.items()) or "(없음)"
+
+
+def _message_line(m: ChatMessage) -> str:
+    who = "사용자" if m.role == "user" else (m.agent or "assistant")
+    text = " ".join(m.content.split())
+    if len(text) > MESSAGE_MAX_CHARS:
+        text = text[: MESSAGE_MAX_CHARS - 1] + "…"
+    return f"{m.created_at.strftime('%m-%d %H:%M')} {who}: {text}"
+
+
+@dataclass
+class ReportContext:
+    title: str
+    profile: str
+    owner: str
+    info_table: str
+    info_counts: str
+    missing: str
+    history_stats: str
+    summary: str
+    recent: str
+    recent_count: int
+    recent_omitted: int
+    history_tokens: int
+
+    def history_text(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"[이전 대화 요약]\n{self.summary}")
+        omitted = f", 이전 {self.recent_omitted}건은 예산 초과로 생략" if self.recent_omitted else ""
+        parts.append(f"[최근 대화 {self.recent_count}건 (시간순{omitted})]\n{self.recent or '(없음)'}")
+        return "\n\n".join(parts)
+
+    def render(self) -> str:
+        return (
+            f"[제목]\n{self.title}\n\n"
+            f"[환자 기본정보]\n{self.profile}\n"
+            f"[보호자]\n{self.owner}\n\n"
+            f"[구조화 정보] ({self.info_counts}, 최근 업데이트 순)\n{self.info_table}\n\n"
+            f"[미답변 항목]\n{self.missing}\n\n"
+            f"[히스토리 정보]\n{self.history_stats}\n\n"
+            f"{self.history_text()}\n"
+        )
+
+
+def build_report_context(
+    dog: Dog,
+    owner: Optional[User],
+    age_years: Optional[float],
+    items: Sequence[DogInfoItem],
+    history: HistoryView,
+    history_budget: int,
+) -> ReportContext:
+    """history_budget: 대화 부분(요약 + 최근 메시지)의 토큰 예산"""
+    answered = sum(1 for it in items if _answered(it))
+    summary = history.summary_text or ""
+    remaining = history_budget - count_tokens(summary)
+    picked: List[str] = []
+    for m in reversed(history.tail):
+        line = _message_line(m)
+        cost = count_tokens(line) + 1
+        if cost > remaining:
+            break
+        picked.append(line)
+        remaining -= cost
+    picked.reverse()
+    recent = "\n".join(picked)
+    first = history.first_at.strftime("%Y-%m-%d") if history.first_at else "-"
+    last = history.last_at.strftime("%Y-%m-%d") if history.last_at else "-"
+    return ReportContext(
+        title=f"진료 보고서 - {dog.name} (#{dog.id})",
+        profile=profile_text(dog, age_years),
+        owner=f"- id: {owner.id if owner else None}\n- username: {owner.username if owner else None}",
+        info_table=info_table(items),
+        info_counts=f"답변 {answered}/{len(items)}",
+        missing=missing_text(items),
+        history_stats=(
+            f"총 {history.total}건 ({first} ~ {last}), 사용자 {history.user_count}, 어시스턴트 {history.assistant_count}"
+        ),
+        summary=summary,
+        recent=recent,
+        recent_count=len(picked),
+        recent_omitted=len(history.tail) - len(picked),
+        history_tokens=history_budget - remaining,
+    )
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import AsyncSessionLocal
+from db.models import Dog, Report
+from services.chat_messages import decode_cursor, encode_cursor
+
+
+logger = logging.getLogger(__name__)
+
+# 보고서 메타데이터 인덱스 (reports 테이블)
+# - generate_markdown이 파일을 쓴 직후 한 행 기록, PDF 캐시 렌더 시 pdf_key 갱신
+# - 목록 조회는 (dog_id, created_at, id) 인덱스를 따르는 최신순 키셋 페이지네이션 (디렉터리 glob/stat 없음)
+# - 인덱스와 디스크가 어긋나면(수동 삭제/복사, 배포 전 생성분) reconcile로 디스크 기준 재구성 (scripts.reindex_reports)
+
+_REPORT_NAME = re.compile(r"^dog_(\d+)_.+\.md$")
+
+
+def content_hash(md_bytes: bytes) -> str:
+    return hashlib.sha256(md_bytes).hexdigest()
+
+
+async def record_report(session: AsyncSession, dog_id: int, path: Path, md_bytes: bytes) -> Report:
+    """새 보고서 파일을 인덱스에 추가합니다. (커밋은 호출자가 수행)"""
+    row = Report(
+        dog_id=dog_id,
+        filename=path.name,
+        created_at=datetime.utcnow(),
+        size_bytes=len(md_bytes),
+        content_hash=content_hash(md_bytes),
+    )
+    session.add(row)
+    await session.flush()
+    return row
+
+
+async def mark_pdf_cached(filename: str, key: str) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Report).where(Report.filename == filename).values(pdf_key=key, pdf_rendered_at=datetime.utcnow())
+        )
+        await session.commit()
+
+
+async def indexed_content_hash(filename: str) -> Optional[str]:
+    # 렌더 대기 동안 연결을 잡고 있지 않도록 짧은 세션으로 조회
+    async with AsyncSessionLocal() as session:
+        return (
+            await session.execute(select(Report.content_hash).where(Report.filename == filename))
+        ).scalar_one_or_none()
+
+
+async def page_reports(
+    session: AsyncSession, dog_id: int, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Report], Optional[str]]:
+    """최신순 한 페이지와 다음 페이지 커서 (커서 형식은 채팅 페이지네이션과 같음, 잘못되면 InvalidCursor)"""
+    stmt = select(Report).where(Report.dog_id == dog_id)
+    if cursor:
+        stmt = stmt.where(tuple_(Report.created_at, Report.id) < tuple_(*decode_cursor(cursor, "desc")))
+    stmt = stmt.order_by(Report.created_at.desc(), Report.id.desc()).limit(limit + 1)
+    rows = list((await session.execute(stmt)).scalars().all())
+    items = rows[:limit]
+    if len(rows) <= limit or not items:
+        return items, None
+    return items, encode_cursor(items[-1].created_at, items[-1].id, "desc")
+
+
+def _current_pdf_key(path: Path, digest: str) -> Optional[str]:
+    # 렌더러 지문까지 일치하는 캐시 파일만 렌더된 것으로 본다
+    from services.report_pdf import cached_pdf_path, pdf_cache_key
+
+    key = pdf_cache_key(digest)
+    return key if cached_pdf_path(path, key).exists() else None
+
+
+async def reconcile(session: AsyncSession, reports_dir: Path, dry_run: bool = False) -> Dict[str, int]:
+    """
+    디스크의 보고서 파일(dog_<id>_*.md)을 기준으로 인덱스를 다시 맞춥니다.
+    - 인덱스에 없는 파일: 추가 (생성 시각 = 파일 mtime, 없는 강아지의 파일은 건너뜀)
+    - 파일이 없는 행: 삭제
+    - 크기/해시/PDF 캐시 상태가 다른 행: 갱신
+    """
+    stats = {"files": 0, "added": 0, "updated": 0, "removed": 0, "skipped": 0}
+    files: Dict[str, Path] = {}
+    if reports_dir.exists():
+        for p in reports_dir.iterdir():
+            m = _REPORT_NAME.match(p.name)
+            if m and p.is_file():
+                files[p.name] = p
+    stats["files"] = len(files)
+
+    rows = {r.filename: r for r in (await session.execute(select(Report))).scalars().all()}
+    dog_ids = set((await session.execute(select(Dog.id))).scalars().all())
+
+    missing = [name for name in rows if name not in files]
+    if missing:
+        stats["removed"] = len(missing)
+        if not dry_run:
+            await session.execute(delete(Report).where(Report.filename.in_(missing)))
+
+    for name, path in sorted(files.items()):
+        md_bytes = path.read_bytes()
+        digest = content_hash(md_bytes)
+        pdf_key = _current_pdf_key(path, digest)
+        row = rows.get(name)
+        if row is None:
+            dog_id = int(_REPORT_NAME.match(name).group(1))  # type: ignore[union-attr]
+            if dog_id not in dog_ids:
+                stats["skipped"] += 1
+                continue
+            stats["added"] += 1
+            if not dry_run:
+                session.add(
+                    Report(
+                        dog_id=dog_id,
+                        filename=name,
+                        created_at=datetime.utcfromtimestamp(path.stat().st_mtime),
+                        size_bytes=len(md_bytes),
+                        content_hash=digest,
+                        pdf_key=pdf_key,
+                        pdf_rendered_at=datetime.utcnow() if pdf_key else None,
+                    )
+                )
+        elif (row.size_bytes, row.content_hash, row.pdf_key) != (len(md_bytes), digest, pdf_key):
+            stats["updated"] += 1
+            if not dry_run:
+                row.size_bytes = len(md_bytes)
+                row.content_hash = digest
+                if row.pdf_key != pdf_key:
+                    row.pdf_key = pdf_key
+                    row.pdf_rendered_at = datetime.utcnow() if pdf_key else None
+
+    if dry_run:
+        await session.rollback()
+    else:
+        await session.commit()
+    return stats
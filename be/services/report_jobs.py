@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from db.database import AsyncSessionLocal
+from db.models import ReportJob
+from services.metrics import REPORT_GENERATIONS, REPORT_JOBS
+from services.report_md import PreviousReport, generate_markdown, report_path
+from services.report_pdf import prerender_pdf
+
+
+logger = logging.getLogger(__name__)
+
+# 보고서 생성 작업 (POST는 작업 id만 바로 반환, 생성은 백그라운드 워커가)
+# - 작업은 report_jobs 테이블에 저장 → 재시작/클라이언트 연결 끊김과 무관하게 진행 상황/결과 조회 가능
+# - 강아지당 진행 중 작업은 하나 (부분 유니크 인덱스) → 중복 제출은 기존 작업 반환
+#   (대기 중인 incremental 작업에 full이 요청되면 full로 올리고, 이미 실행 중이면 409)
+# - 실행 권한은 조건부 UPDATE(queued → running)로 가져간다 → 여러 워커/프로세스가 같은 작업을 중복 실행하지 않음
+# - 복구: 정상 종료 시 실행 중이던 작업은 queued로 되돌리고, 비정상 종료로 stale_s 동안 갱신이 없는
+#   running 작업은 주기적 스윕이 되살린다 (max_attempts 초과 시 failed)
+# - 생성 중 오류도 max_attempts까지는 queued로 되돌려 다음 스윕에서 재시도
+# - mode=incremental이면 직전 성공 보고서를 기준으로 변경분만 반영 (services/report_md.py), full은 항상 전체 생성
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class ReportJobConflict(Exception):
+    pass
+
+
+async def active_job(session: AsyncSession, dog_id: int) -> Optional[ReportJob]:
+    return (
+        await session.execute(
+            select(ReportJob).where(ReportJob.dog_id == dog_id, ReportJob.status.in_(ACTIVE_STATUSES))
+        )
+    ).scalar_one_or_none()
+
+
+async def load_previous_report(session: AsyncSession, dog_id: int) -> Optional[PreviousReport]:
+    """증분 생성 기준: 파일이 남아 있는 가장 최근 성공 보고서"""
+    row = (
+        await session.execute(
+            select(ReportJob.filename, ReportJob.started_at, ReportJob.last_message_id, ReportJob.incremental_depth)
+            .where(
+                ReportJob.dog_id == dog_id,
+                ReportJob.status == "succeeded",
+                ReportJob.filename.is_not(None),
+                ReportJob.last_message_id.is_not(None),
+            )
+            .order_by(ReportJob.finished_at.desc())
+            .limit(1)
+        )
+    ).first()
+    if row is None or row.started_at is None:
+        return None
+    path = report_path(row.filename)
+    if not path.exists():
+        return None
+    return PreviousReport(
+        filename=row.filename,
+        path=path,
+        basis_at=row.started_at,
+        last_message_id=row.last_message_id,
+        depth=row.incremental_depth or 0,
+    )
+
+
+async def submit_job(session: AsyncSession, dog_id: int, mode: str = "incremental") -> Tuple[ReportJob, bool]:
+    """보고서 작업을 등록합니다. 진행 중인 작업이 있으면 그 작업을 반환 (created=False)."""
+    existing = await active_job(session, dog_id)
+    if existing is not None:
+        return await _reuse_active(session, existing, mode), False
+    now = datetime.utcnow()
+    job = ReportJob(
+        id=uuid.uuid4().hex,
+        dog_id=dog_id,
+        status="queued",
+        stage="queued",
+        progress=0,
+        mode=mode,
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(job)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # 동시에 제출된 다른 요청이 먼저 등록
+        await session.rollback()
+        existing = await active_job(session, dog_id)
+        if existing is None:
+            raise
+        return await _reuse_active(session, existing, mode), False
+    REPORT_JOBS.inc(result="submitted")
+    get_runner().enqueue(job.id)
+    return job, True
+
+
+async def _reuse_active(session: AsyncSession, job: ReportJob, mode: str) -> ReportJob:
+    # full 작업은 incremental 요청도 만족, 반대는 아님
+    # → 아직 대기 중인 incremental 작업은 full로 올리고, 이미 실행 중이면 충돌
+    if mode == "full" and job.mode != "full":
+        result = await session.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job.id, ReportJob.status == "queued")
+            .values(mode="full", updated_at=datetime.utcnow())
+        )
+        await session.commit()
+        if result.rowcount != 1:
+            raise ReportJobConflict("an incremental report job is already running for this dog")
+        await session.refresh(job)
+        REPORT_JOBS.inc(result="upgraded")
+        return job
+    REPORT_JOBS.inc(result="deduplicated")
+    return job
+
+
+async def _set(job_id: str, *conditions, **values) -> bool:
+    values.setdefault("updated_at", datetime.utcnow())
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(ReportJob).where(ReportJob.id == job_id, *conditions).values(**values)
+        )
+        await session.commit()
+    return result.rowcount == 1
+
+
+class ReportJobRunner:
+    def __init__(self, workers: int = 2, poll_s: float = 5.0, stale_s: float = 600.0, max_attempts: int = 2) -> None:
+        self.workers = workers
+        self.poll_s = poll_s
+        self.stale_s = stale_s
+        self.max_attempts = max_attempts
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._running: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def enqueue(self, job_id: str) -> None:
+        # 러너가 떠 있지 않으면(스크립트 등) 다음 스윕/시작 시 DB에서 가져간다
+        if self._queue is None or job_id in self._queued or job_id in self._running:
+            return
+        self._queued.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+        # 중단된 작업은 다음 시작 때 바로 다시 실행되도록 대기 상태로
+        for job_id in interrupted:
+            try:
+                await _set(job_id, ReportJob.status == "running", status="queued", stage="queued", progress=0)
+            except Exception as e:
+                logger.warning("report job %s could not be requeued on shutdown: %r", job_id, e)
+        self._running.clear()
+
+    async def sweep(self) -> None:
+        """오래 갱신되지 않은 running 작업을 되살리고, DB의 대기 작업을 큐에 넣습니다."""
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_s)
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            stale = (
+                ReportJob.status == "running",
+                ReportJob.updated_at < stale_before,
+                ReportJob.id.not_in(list(self._running)) if self._running else true(),
+            )
+            await session.execute(
+                update(ReportJob)
+                .where(*stale, ReportJob.attempts >= self.max_attempts)
+                .values(status="failed", stage="failed", error="interrupted", finished_at=now, updated_at=now)
+            )
+            await session.execute(
+                update(ReportJob)
+                .where(*stale, ReportJob.attempts < self.max_attempts)
+                .values(status="queued", stage="queued", progress=0, updated_at=now)
+            )
+            await session.commit()
+            queued = (
+                await session.execute(
+                    select(ReportJob.id).where(ReportJob.status == "queued").order_by(ReportJob.created_at.asc())
+                )
+            ).scalars().all()
+        for job_id in queued:
+            self.enqueue(job_id)
+
+    async def _sweeper(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning("report job sweep failed: %r", e)
+            await asyncio.sleep(self.poll_s)
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                logger.exception("report job %s crashed: %r", job_id, e)
+
+    async def run_job(self, job_id: str) -> None:
+        now = datetime.utcnow()
+        claimed = await _set(
+            job_id,
+            ReportJob.status == "queued",
+            status="running",
+            stage="started",
+            progress=5,
+            attempts=ReportJob.attempts + 1,
+            started_at=now,
+            updated_at=now,
+        )
+        if not claimed:
+            # 다른 워커/프로세스가 가져갔거나 이미 끝남
+            return
+        self._running.add(job_id)
+        try:
+            async with AsyncSessionLocal() as session:
+                row = (
+                    await session.execute(
+                        select(ReportJob.dog_id, ReportJob.mode, ReportJob.attempts).where(ReportJob.id == job_id)
+                    )
+                ).first()
+                if row is None:
+                    # 실행 직전에 강아지가 삭제되어 작업도 함께 지워짐
+                    return
+                dog_id = row.dog_id
+                previous = await load_previous_report(session, dog_id) if row.mode == "incremental" else None
+
+                async def progress(stage: str, value: int) -> None:
+                    await _set(job_id, ReportJob.status == "running", stage=stage, progress=value)
+
+                try:
+                    meta = await generate_markdown(session, dog_id, progress=progress, previous=previous)
+                except Exception as e:
+                    error = str(e)[:500] or type(e).__name__
+                    if row.attempts < self.max_attempts:
+                        # 생성 오류(LLM 일시 장애 등)도 max_attempts까지 재시도, 다음 스윕이 다시 큐에 넣는다
+                        logger.warning(
+                            "report job %s failed (attempt %d/%d), retrying: %r", job_id, row.attempts, self.max_attempts, e
+                        )
+                        REPORT_JOBS.inc(result="retried")
+                        await _set(
+                            job_id, ReportJob.status == "running", status="queued", stage="queued", progress=0, error=error
+                        )
+                        return
+                    logger.warning("report job %s failed: %r", job_id, e)
+                    REPORT_JOBS.inc(result="failed")
+                    await _set(
+                        job_id,
+                        status="failed",
+                        stage="failed",
+                        error=error,
+                        finished_at=datetime.utcnow(),
+                    )
+                    return
+            await _set(
+                job_id,
+                status="succeeded",
+                stage="done",
+                progress=100,
+                error=None,
+                filename=meta["filename"],
+                generated_mode=meta["mode"],
+                last_message_id=meta["last_message_id"],
+                incremental_depth=meta["depth"],
+                finished_at=datetime.utcnow(),
+            )
+            REPORT_JOBS.inc(result="succeeded")
+            REPORT_GENERATIONS.inc(mode=meta["mode"])
+        finally:
+            self._running.discard(job_id)
+        if get_settings().report_pdf_prerender:
+            # 결과는 이미 조회 가능, PDF 캐시는 이 워커 슬롯에서 이어서 채운다
+            await prerender_pdf(Path(meta["path"]))
+
+
+_RUNNER: Optional[ReportJobRunner] = None
+
+
+def get_runner() -> ReportJobRunner:
+    global _RUNNER
+    if _RUNNER is None:
+        cfg = get_settings()
+        _RUNNER = ReportJobRunner(
+            cfg.report_job_workers, cfg.report_job_poll_s, cfg.report_job_stale_s, cfg.report_job_max_attempts
+        )
+    return _RUNNER
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import re
 import uuid
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
-import json
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import get_settings
-from services.llm import get_chat_model
-from db.models import Dog, User, DogInfoItem, ChatMessage
+from services.history_summary import format_message, load_history, refresh_summary
+from services.llm import get_chat_model, llm_agent
+from services.report_context import ReportContext, build_report_context, profile_text, warm_token_counter
+from services.report_index import record_report
+from services.spans import span, traced
+from db.models import ChatMessage, Dog, User, DogInfoItem
+
+
+logger = logging.getLogger(__name__)
 
 
 def _calc_age_years(birth_date) -> Optional[float]:
@@ -26,185 +37,463 @@ def _calc_age_years(birth_date) -> Optional[float]:
         return None
 
 
-async def collect_context(session: AsyncSession, dog_id: int) -> Dict[str, object]:
+async def collect_context(session: AsyncSession, dog_id: int) -> Dict[str, Any]:
     dog: Optional[Dog] = (await session.execute(select(Dog).where(Dog.id == dog_id))).scalar_one_or_none()
     if dog is None:
         raise ValueError("Dog not found")
     owner: Optional[User] = (await session.execute(select(User).where(User.id == dog.user_id))).scalar_one_or_none()
-    info_items: List[DogInfoItem] = (
-        await session.execute(select(DogInfoItem).where(DogInfoItem.dog_id == dog_id))
-    ).scalars().all()
-    messages: List[ChatMessage] = (
-        await session.execute(select(ChatMessage).where(ChatMessage.dog_id == dog_id).order_by(ChatMessage.created_at.asc()))
-    ).scalars().all()
-
-    answered_items: List[Dict[str, object]] = []
-    missing_items: List[Dict[str, object]] = []
-    info_lines: List[str] = []
-    info_by_category: Dict[str, List[Dict[str, object]]] = {}
-    all_items: List[Dict[str, object]] = []
-    for it in info_items:
-        row = {
-            "category": it.category.value,
-            "key": it.key,
-            "question": it.question,
-            "type": it.question_type.value,
-            "answer": it.answer_text,
-            "source": it.source,
-            "updated_at": it.updated_at.isoformat() if it.updated_at else None,
-        }
-        all_items.append(row)
-        info_by_category.setdefault(it.category.value, []).append(row)
-        label = f"{it.category.value}:{it.key}"
-        if it.answer_text is None or str(it.answer_text).strip() == "":
-            missing_items.append(row)
-            info_lines.append(f"- {label}: (미답변)")
-        else:
-            answered_items.append(row)
-            info_lines.append(f"- {label}: {it.answer_text}")
-
-    history_lines: List[str] = []
-    for m in messages[-300:]:  # 최근 최대 300개
-        who = "사용자" if m.role == "user" else (m.agent or "assistant")
-        history_lines.append(f"[{who}] {m.content}")
-
-    history_text = "\n".join(history_lines)
-    history_stats = {
-        "total": len(messages),
-        "range": (
-            (messages[0].created_at.isoformat() if messages else None),
-            (messages[-1].created_at.isoformat() if messages else None),
-        ),
-        "user_count": sum(1 for m in messages if m.role == "user"),
-        "assistant_count": sum(1 for m in messages if m.role != "user"),
-    }
-
-    age_years = _calc_age_years(dog.birth_date)
-
+    info_items: List[DogInfoItem] = list(
+        (await session.execute(select(DogInfoItem).where(DogInfoItem.dog_id == dog_id))).scalars().all()
+    )
+    # 롤링 요약 + 워터마크 이후 최근 메시지만 조회 (전체 기록을 읽지 않음)
+    history = await load_history(session, dog_id, tail_limit=300)
     return {
         "dog": dog,
         "owner": owner,
-        "dog_age_years": age_years,
-        "info_text": "\n".join(info_lines),
-        "info_answered": answered_items,
-        "info_missing": missing_items,
-        "info_by_category": info_by_category,
-        "dog_info_items": all_items,
-        "history_text": history_text,
-        "history_stats": history_stats,
-        "history_tail": [
-            {"role": ("user" if m.role == "user" else (m.agent or "assistant")), "text": m.content, "ts": m.created_at.isoformat()}
-            for m in messages[-50:]
-        ],
+        "dog_age_years": _calc_age_years(dog.birth_date),
+        "info_items": info_items,
+        "history": history,
     }
 
 
-async def generate_markdown(session: AsyncSession, dog_id: int) -> Dict[str, str]:
-    settings = get_settings()
-    llm = get_chat_model(settings)
-    ctx = await collect_context(session, dog_id)
-    dog: Dog = ctx["dog"]  # type: ignore
-    owner: Optional[User] = ctx["owner"]  # type: ignore
-    info_text: str = ctx["info_text"]  # type: ignore
-    history_text: str = ctx["history_text"]  # type: ignore
-    info_answered = ctx["info_answered"]  # type: ignore
-    info_missing = ctx["info_missing"]  # type: ignore
-    info_by_category = ctx["info_by_category"]  # type: ignore
-    dog_info_items = ctx["dog_info_items"]  # type: ignore
-    history_stats = ctx["history_stats"]  # type: ignore
-    history_tail = ctx["history_tail"]  # type: ignore
-    dog_age_years = ctx.get("dog_age_years")
+# 진행 상황 콜백 (단계 이름, 0~100) - 보고서 작업(services/report_jobs.py)의 상태 갱신용
+ProgressFn = Callable[[str, int], Awaitable[None]]
 
-    system = (
-        "당신은 임상 수의사에게 전달할 공식 보고서를 마크다운으로 작성하는 전문가입니다.\n"
-        "출력은 반드시 순수 마크다운(.md)이어야 하며, 코드블록은 사용하지 않습니다.\n"
-        "요구사항:\n"
-        "- 한국어, 전문적/간결/정돈된 구조\n"
-        "- 최상단에 제목과 생성시각을 표기\n"
-        "- 목차(Links) 포함\n"
-        "- 환자 기본정보는 표 형식(키|값)\n"
-        "- 필요한 경우 bullet/번호 목록 적극 활용\n"
-        "- 근거가 불충분하면 '불충분'으로 표기\n"
-        "- 반드시 '위험 신호 감지' 섹션을 포함해 보호자가 인지하지 못할 수 있는 중요한 임상적 시그널을 명시(심각도, 근거, 권고)\n"
-        "- 구조화 정보, 표, 각 섹션의 항목 라벨 옆에는 최근 '업데이트 날짜'를 괄호로 표기하세요.\n"
-        "  (형식: YYYY-MM-DD, 시간은 표기하지 않음. 예: 항목: 값 (업데이트: 2025-11-02))\n"
-        "- 가능한 모든 항목에 업데이트 날짜를 포함하되, 날짜가 없으면 생략합니다.\n"
-    )
-    # 최신 업데이트 타임라인(최근순) 정리
-    def _timeline_lines(items: List[dict]) -> str:
-        def _key(dt: Optional[str]):
-            from datetime import datetime
-            if not dt:
-                return datetime.min
-            try:
-                return datetime.fromisoformat(dt)
-            except Exception:
-                return datetime.min
-        sorted_items = sorted(items, key=lambda x: _key(x.get("updated_at")), reverse=True)
-        out = []
-        for r in sorted_items:
-            label = f"{r.get('category')}:{r.get('key')}"
-            ans = r.get('answer')
-            upd = r.get('updated_at')
-            upd_date = None
-            if isinstance(upd, str):
-                # ISO8601에서 날짜 부분만 추출 (YYYY-MM-DD)
-                upd_date = upd.split("T")[0]
-            out.append(f"- {label}: {ans}{(f' (업데이트: {upd_date})' if upd_date else '')}")
-        return "\n".join(out) if out else "(최근 업데이트 기록 없음)"
-
-    timeline_text = _timeline_lines(info_answered)
-
-    human = (
-        f"[제목]\n진료 보고서 - {dog.name} (#{dog.id})\n\n"
-        f"[환자 기본정보]\n"
-        f"- id: {dog.id}\n- 이름: {dog.name}\n- 견종: {dog.breed}\n- 생년: {dog.birth_date} (추정 나이: {dog_age_years}년)\n- 성별: {dog.sex.value}\n- 중성화: {dog.neutered}\n- 체중(kg): {dog.weight_kg}\n\n"
-        f"[보호자]\n- id: {(owner.id if owner else None)}\n- username: {(owner.username if owner else None)}\n\n"
-        f"[구조화 정보 요약]\n{info_text}\n\n"
-        f"[데이터 입력/업데이트 타임라인]\n(최근순)\n{timeline_text}\n\n"
-        f"[구조화 정보(세부)]\n- answered: {json.dumps(info_answered, ensure_ascii=False)}\n- missing: {json.dumps(info_missing, ensure_ascii=False)}\n- by_category: {json.dumps(info_by_category, ensure_ascii=False)}\n- dog_info_items(raw): {json.dumps(dog_info_items, ensure_ascii=False)}\n\n"
-        f"[히스토리 정보]\n요약대상 총 {history_stats['total']}건, 구간={history_stats['range']}, 사용자={history_stats['user_count']}, 어시스턴트={history_stats['assistant_count']}\n\n"
-        f"[히스토리(최근 50건)]\n{history_tail}\n\n"
-        f"위 데이터를 바탕으로 아래 형식을 충실히 작성:\n"
-        f"1) # 요약(의사 전달용 핵심 5문장)\n"
-        f"2) # 환자 기본정보 (표)\n"
-        f"3) # 주요 호소/이슈 요약\n"
-        f"4) # 행동 관련 관찰\n"
-        f"5) # 영양/식이 관련 관찰\n"
-        f"6) # 과거 대화에서 드러난 사용자 관심사(요약)\n"
-        f"7) # 위험 신호 감지 (보호자가 인지하지 못할 수 있는 시그널)\n   - 심각도(높음/중간/낮음), 근거(인용), 권고(내원/검사/주의)\n"
-        f"8) # 검사/추적/치료 계획\n"
-        f"9) # 체크리스트 (가정용 지침)\n"
-    )
-    prompt = [("system", system), ("human", human)]
-    raw = await llm.ainvoke(prompt)
-    md = (getattr(raw, "content", "") if raw else "").strip()
 
-    # 파일 저장
-    be_root = Path(__file__).resolve().parents[1]
-    reports_dir = Path(settings.reports_dir)
+async def _noop_progress(stage: str, progress: int) -> None:
+    return None
+
+
+# 보고서 섹션 (매칭 키, 작성 형식의 제목) - 아래 full 프롬프트의 1)~9) 순서
+# 증분 갱신 시 이전 보고서를 제목 단위로 나누고, 제목에 포함된 가장 긴 키로 섹션을 식별한다
+REPORT_SECTIONS: List[Tuple[str, str]] = [
+    ("요약", "요약(의사 전달용 핵심 5문장)"),
+    ("환자 기본정보", "환자 기본정보 (표)"),
+    ("주요 호소", "주요 호소/이슈 요약"),
+    ("행동 관련", "행동 관련 관찰"),
+    ("영양", "영양/식이 관련 관찰"),
+    ("사용자 관심사", "과거 대화에서 드러난 사용자 관심사(요약)"),
+    ("위험 신호", "위험 신호 감지 (보호자가 인지하지 못할 수 있는 시그널)"),
+    ("검사/추적", "검사/추적/치료 계획"),
+    ("체크리스트", "체크리스트 (가정용 지침)"),
+]
+
+# 변경 종류별로 다시 작성할 섹션 (나머지는 이전 보고서 내용 유지)
+# 기본정보 변경은 Dog.updated_at으로 판단 → 구조화 정보 변경(context_version 증가)에도 함께 잡히지만 표 하나라 비용이 작다
+_AFFECTED_BY_PROFILE = ("요약", "환자 기본정보")
+_AFFECTED_BY_CATEGORY = {
+    "diet": ("요약", "영양", "위험 신호"),
+    "behavior": ("요약", "행동 관련", "위험 신호"),
+}
+_AFFECTED_BY_MESSAGES = ("요약", "주요 호소", "사용자 관심사", "위험 신호", "검사/추적")
+
+_HEADING = re.compile(r"^#{1,2}\s+(.+?)\s*$")
+_NUMBERING = re.compile(r"^\d+\s*[.)]\s*")
+_NOTE_PREFIX = "> 증분 갱신:"
+
+
+@dataclass(frozen=True)
+class PreviousReport:
+    """증분 생성의 기준이 되는 이전 보고서"""
+
+    filename: str
+    path: Path
+    basis_at: datetime  # 이전 보고서가 컨텍스트를 읽기 시작한 시각 (이후 변경분이 delta)
+    last_message_id: int
+    depth: int  # 마지막 전체 생성 이후 연속 증분 횟수
+
+
+def _section_key(title: str) -> Optional[str]:
+    # 제목이 섹션 키나 작성 형식의 제목으로 시작할 때만 섹션으로 본다 ("1) ", "1. " 번호는 무시)
+    # → "콩이 진료 요약 보고서" 같은 문서 제목이 '요약' 섹션으로 잡히지 않도록 포함 여부로는 판단하지 않음
+    title = _NUMBERING.sub("", title.strip())
+    hits = [key for key, full in REPORT_SECTIONS if title.startswith(key) or title.startswith(full.split("(")[0].strip())]
+    return max(hits, key=len) if hits else None
+
+
+def split_sections(md: str) -> List[Tuple[Optional[str], str]]:
+    """마크다운을 최상위(#, ##) 제목 단위로 나눕니다. 보고서 섹션이 아닌 부분(제목/목차 등)은 key=None"""
+    lines = md.splitlines()
+    headings = [(i, _section_key(m.group(1))) for i, m in enumerate(map(_HEADING.match, lines)) if m]
+    # 첫 제목(문서 제목)이 섹션 키로 시작해도 뒤에 같은 섹션 제목이 또 있으면 문서 제목으로 취급
+    title_line = -1
+    if headings and headings[0][1] is not None and any(k == headings[0][1] for _, k in headings[1:]):
+        title_line = headings[0][0]
+    chunks: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    seen = set()
+    for i, line in enumerate(lines):
+        m = _HEADING.match(line)
+        key = _section_key(m.group(1)) if m and i != title_line else None
+        if m and (key is None or key not in seen):
+            if key is not None:
+                seen.add(key)
+            chunks.append((key, [line]))
+        else:
+            # 이미 나온 섹션 이름의 소제목은 현재 섹션에 포함
+            chunks[-1][1].append(line)
+    out = [(key, "\n".join(lines).strip("\n")) for key, lines in chunks]
+    return [(key, text) for key, text in out if key is not None or text.strip()]
+
+
+def splice_sections(sections: List[Tuple[Optional[str], str]], updates: Dict[str, str], note: str) -> str:
+    """이전 보고서 섹션 중 updates에 있는 것만 교체하고 증분 갱신 표기를 맨 앞 블록에 남깁니다."""
+    out: List[str] = []
+    done = set()
+    for key, text in sections:
+        if key is not None and key in updates:
+            out.append(updates[key])
+            done.add(key)
+        else:
+            out.append("\n".join(l for l in text.splitlines() if not l.startswith(_NOTE_PREFIX)).strip("\n"))
+    # 이전 보고서에 없던 섹션은 작성 형식 순서대로 뒤에 붙인다
+    out.extend(updates[key] for key, _ in REPORT_SECTIONS if key in updates and key not in done)
+    if sections and sections[0][0] is None:
+        out[0] = f"{out[0]}\n\n{note}"
+    else:
+        out.insert(0, note)
+    return "\n\n".join(t for t in out if t) + "\n"
+
+
+def affected_sections(profile_changed: bool, categories: List[str], has_messages: bool) -> List[str]:
+    keys = set(_AFFECTED_BY_PROFILE if profile_changed else ())
+    for c in categories:
+        keys.update(_AFFECTED_BY_CATEGORY.get(c, ("요약", "위험 신호")))
+    if has_messages:
+        keys.update(_AFFECTED_BY_MESSAGES)
+    return [key for key, _ in REPORT_SECTIONS if key in keys]
+
+
+def reports_directory() -> Path:
+    reports_dir = Path(get_settings().reports_dir)
     if not reports_dir.is_absolute():
-        reports_dir = be_root / reports_dir
+        reports_dir = Path(__file__).resolve().parents[1] / reports_dir
+    return reports_dir
+
+
+def report_path(filename: str) -> Path:
+    return reports_directory() / filename
+
+
+def _report_meta(fpath: Path) -> Dict[str, Any]:
+    be_root = Path(__file__).resolve().parents[1]
+    rel = os.path.relpath(str(fpath), start=str(be_root))
+    url_md = f"/static/{rel}"
+    return {"filename": fpath.name, "path": str(fpath), "url_md": url_md}
+
+
+async def _save_report(session: AsyncSession, dog_id: int, md: str) -> Dict[str, Any]:
+    reports_dir = reports_directory()
     reports_dir.mkdir(parents=True, exist_ok=True)
     fname = f"dog_{dog_id}_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}_{uuid.uuid4().hex[:8]}.md"
     fpath = reports_dir / fname
-    fpath.write_text(md, encoding="utf-8")
+    md_bytes = md.encode("utf-8")
+    fpath.write_bytes(md_bytes)
+    # 목록 조회용 인덱스 (services/report_index.py)
+    await record_report(session, dog_id, fpath, md_bytes)
+    await session.commit()
+    return _report_meta(fpath)
 
-    rel = os.path.relpath(str(fpath), start=str(be_root))
-    url_md = f"/static/{rel}"
-    return {"filename": fname, "path": str(fpath), "url_md": url_md}
 
+async def _last_message_id(session: AsyncSession, dog_id: int) -> int:
+    return (
+        await session.execute(select(func.max(ChatMessage.id)).where(ChatMessage.dog_id == dog_id))
+    ).scalar_one_or_none() or 0
 
-def markdown_to_pdf_bytes(md_text: str) -> bytes:
-    """마크다운 → PDF 변환 (한글 폰트 적용)"""
-    import markdown as mdmod
-    from xhtml2pdf import pisa
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from io import BytesIO
 
-    # 폰트 경로 탐색: 환경변수 > be/fonts 내 후보
+FULL_REPORT_SYSTEM = (
+    "당신은 임상 수의사에게 전달할 공식 보고서를 마크다운으로 작성하는 전문가입니다.\n"
+    "출력은 반드시 순수 마크다운(.md)이어야 하며, 코드블록은 사용하지 않습니다.\n"
+    "요구사항:\n"
+    "- 한국어, 전문적/간결/정돈된 구조\n"
+    "- 최상단에 제목과 생성시각을 표기\n"
+    "- 목차(Links) 포함\n"
+    "- 환자 기본정보는 표 형식(키|값)\n"
+    "- 필요한 경우 bullet/번호 목록 적극 활용\n"
+    "- 근거가 불충분하면 '불충분'으로 표기\n"
+    "- 반드시 '위험 신호 감지' 섹션을 포함해 보호자가 인지하지 못할 수 있는 중요한 임상적 시그널을 명시(심각도, 근거, 권고)\n"
+    "- 구조화 정보, 표, 각 섹션의 항목 라벨 옆에는 최근 '업데이트 날짜'를 괄호로 표기하세요.\n"
+    "  (형식: YYYY-MM-DD, 시간은 표기하지 않음. 예: 항목: 값 (업데이트: 2025-11-02))\n"
+    "- 가능한 모든 항목에 업데이트 날짜를 포함하되, 날짜가 없으면 생략합니다.\n"
+)
+
+FULL_REPORT_FORMAT = (
+    "위 데이터를 바탕으로 아래 형식을 충실히 작성:\n"
+    "1) # 요약(의사 전달용 핵심 5문장)\n"
+    "2) # 환자 기본정보 (표)\n"
+    "3) # 주요 호소/이슈 요약\n"
+    "4) # 행동 관련 관찰\n"
+    "5) # 영양/식이 관련 관찰\n"
+    "6) # 과거 대화에서 드러난 사용자 관심사(요약)\n"
+    "7) # 위험 신호 감지 (보호자가 인지하지 못할 수 있는 시그널)\n   - 심각도(높음/중간/낮음), 근거(인용), 권고(내원/검사/주의)\n"
+    "8) # 검사/추적/치료 계획\n"
+    "9) # 체크리스트 (가정용 지침)\n"
+)
+
+
+def full_report_prompt(rc: ReportContext) -> List[Tuple[str, str]]:
+    """전체 생성 프롬프트 (컨텍스트는 services/report_context.py의 압축 표 형식)"""
+    return [("system", FULL_REPORT_SYSTEM), ("human", rc.render() + "\n" + FULL_REPORT_FORMAT)]
+
+
+# 섹션별 병렬 생성 (REPORT_FULL_STRATEGY=sectioned)
+# - 요약을 뺀 섹션을 같은 압축 컨텍스트로 동시에 생성: 출력 속도에 묶인 긴 한 번의 생성을 짧은 생성 여러 개로 나눈다
+#   (system + 컨텍스트가 모든 호출에서 같은 접두부라 프롬프트 캐시가 적중하고, 섹션 지시는 맨 뒤에 둔다)
+# - 이어서 완성된 섹션만 보고 요약 섹션을 한 번 생성
+# - 제목/생성시각/목차는 코드에서 조립
+SECTION_REPORT_SYSTEM = (
+    "당신은 임상 수의사에게 전달할 공식 보고서의 한 섹션을 마크다운으로 작성하는 전문가입니다.\n"
+    "요구사항:\n"
+    "- 출력은 순수 마크다운, 코드블록/서문/목차 없이 요청한 섹션 하나만 ('# 제목' 한 줄로 시작)\n"
+    "- 한국어, 전문적/간결/정돈된 구조, 필요한 경우 bullet/번호 목록 활용\n"
+    "- 다른 섹션에서 다룰 내용은 반복하지 않음\n"
+    "- 근거가 불충분하면 '불충분'으로 표기\n"
+    "- 항목 라벨 옆에는 최근 '업데이트 날짜'를 괄호로 표기 (형식: YYYY-MM-DD, 예: 항목: 값 (업데이트: 2025-11-02), 날짜가 없으면 생략)\n"
+)
+
+# 섹션별 추가 지시 (없으면 제목만)
+_SECTION_GUIDES: Dict[str, str] = {
+    "환자 기본정보": "표 하나(키|값)로 작성",
+    "위험 신호": "보호자가 인지하지 못할 수 있는 중요한 임상적 시그널마다 심각도(높음/중간/낮음), 근거(인용), 권고(내원/검사/주의)",
+    "체크리스트": "보호자가 가정에서 확인할 항목을 체크 목록으로",
+}
+
+SUMMARY_KEY = "요약"
+
+
+def section_prompt(rc: ReportContext, key: str, title: str) -> List[Tuple[str, str]]:
+    guide = f"\n- {_SECTION_GUIDES[key]}" if key in _SECTION_GUIDES else ""
+    return [("system", SECTION_REPORT_SYSTEM), ("human", f"{rc.render()}\n위 데이터를 바탕으로 다음 섹션만 작성:\n# {title}{guide}\n")]
+
+
+def summary_prompt(rc: ReportContext, title: str, body: str) -> List[Tuple[str, str]]:
+    return [
+        ("system", SECTION_REPORT_SYSTEM),
+        (
+            "human",
+            f"[보고서]\n{rc.title}\n\n{body}\n\n"
+            f"위 보고서 섹션만을 근거로 다음 섹션을 작성 (새 사실을 추가하지 않음):\n# {title}\n"
+            "- 수의사에게 전달할 핵심 5문장, 위험 신호가 있으면 가장 먼저\n",
+        ),
+    ]
+
+
+def _normalize_section(title: str, out: str) -> str:
+    # 모델이 쓴 제목 줄은 작성 형식의 제목으로 통일 (증분 갱신이 제목으로 섹션을 찾는다)
+    lines = out.strip().splitlines()
+    if lines and _HEADING.match(lines[0]):
+        lines = lines[1:]
+    body = "\n".join(lines).strip("\n") or "불충분"
+    return f"# {title}\n\n{body}"
+
+
+def _report_header(rc: ReportContext) -> str:
+    # PDF 변환(markdown → xhtml2pdf)에는 제목 앵커가 없으므로 목차는 링크 없이 나열
+    toc = "\n".join(f"- {title}" for _, title in REPORT_SECTIONS)
+    return f"# {rc.title}\n\n생성시각: {datetime.utcnow():%Y-%m-%d %H:%M} UTC\n\n## 목차\n\n{toc}"
+
+
+async def _generate_sectioned(rc: ReportContext, llm: Any, progress: ProgressFn) -> str:
     settings = get_settings()
+    sem = asyncio.Semaphore(settings.report_section_concurrency)
+    titles = dict(REPORT_SECTIONS)
+
+    async def _one(key: str, title: str) -> str:
+        async with sem:
+            with llm_agent("report_section"), span("report.llm_section", section=key):
+                raw = await llm.ainvoke(section_prompt(rc, key, title))
+        return _normalize_section(title, getattr(raw, "content", "") if raw else "")
+
+    parts = [(key, title) for key, title in REPORT_SECTIONS if key != SUMMARY_KEY]
+    tasks = {key: asyncio.create_task(_one(key, title)) for key, title in parts}
+    try:
+        # 진행률은 완료 순서대로 한 번에 하나씩 기록
+        for done, fut in enumerate(asyncio.as_completed(list(tasks.values())), 1):
+            await fut
+            await progress("sections", 40 + 45 * done // len(tasks))
+    except BaseException:
+        for t in tasks.values():
+            t.cancel()
+        raise
+    sections = {key: t.result() for key, t in tasks.items()}
+
+    await progress("summary_pass", 85)
+    body = "\n\n".join(sections[key] for key, _ in parts)
+    with llm_agent("report_summary"), span("report.llm_summary"):
+        raw = await llm.ainvoke(summary_prompt(rc, titles[SUMMARY_KEY], body))
+    sections[SUMMARY_KEY] = _normalize_section(titles[SUMMARY_KEY], getattr(raw, "content", "") if raw else "")
+    return "\n\n".join([_report_header(rc)] + [sections[key] for key, _ in REPORT_SECTIONS]) + "\n"
+
+
+@traced("report.generate_markdown")
+async def generate_markdown(
+    session: AsyncSession,
+    dog_id: int,
+    progress: Optional[ProgressFn] = None,
+    previous: Optional[PreviousReport] = None,
+) -> Dict[str, Any]:
+    """
+    보고서 마크다운을 생성해 저장합니다.
+    previous가 있으면 그 이후 변경분만 반영하는 증분 생성을 먼저 시도하고, 불가능하면 전체 생성
+    반환: filename, path, url_md, mode(full|incremental|unchanged), last_message_id, depth
+    """
+    settings = get_settings()
+    llm = get_chat_model(settings)
+    progress = progress or _noop_progress
+    if previous is not None:
+        meta = await _generate_incremental(session, dog_id, previous, llm, progress)
+        if meta is not None:
+            return meta
+    await progress("summary", 10)
+    with span("report.refresh_summary"):
+        # 지난 보고서 이후 쌓인 대화를 요약에 반영 (필요할 때만 LLM 1회)
+        if await refresh_summary(session, dog_id, llm):
+            await session.commit()
+    await progress("context", 25)
+    with span("report.collect_context"):
+        last_message_id = await _last_message_id(session, dog_id)
+        ctx = await collect_context(session, dog_id)
+    # 토큰 계수기(tiktoken 인코딩 파일 로드)는 처음 한 번 스레드에서 준비
+    await asyncio.to_thread(warm_token_counter)
+    rc = build_report_context(
+        ctx["dog"],
+        ctx["owner"],
+        ctx["dog_age_years"],
+        ctx["info_items"],
+        ctx["history"],
+        settings.report_history_token_budget,
+    )
+    await progress("llm", 40)
+    if settings.report_full_strategy == "sectioned":
+        md = await _generate_sectioned(rc, llm, progress)
+    else:
+        with llm_agent("report"), span("report.llm"):
+            raw = await llm.ainvoke(full_report_prompt(rc))
+        md = (getattr(raw, "content", "") if raw else "").strip()
+    await progress("writing", 90)
+
+    meta: Dict[str, Any] = await _save_report(session, dog_id, md)
+    meta.update(mode="full", last_message_id=last_message_id, depth=0)
+    return meta
+
+
+async def _generate_incremental(
+    session: AsyncSession, dog_id: int, previous: PreviousReport, llm: Any, progress: ProgressFn
+) -> Optional[Dict[str, Any]]:
+    """이전 보고서 + 변경분으로 바뀐 섹션만 다시 작성합니다. 증분이 불가능하면 None (전체 생성)"""
+    settings = get_settings()
+    if previous.depth >= settings.report_incremental_max_depth:
+        return None
+    if datetime.utcnow() - previous.basis_at > timedelta(days=settings.report_incremental_max_age_days):
+        # 오래된 메시지는 콜드 보관으로 옮겨졌을 수 있고, 변경분도 커서 전체 생성이 낫다
+        return None
+    await progress("delta", 15)
+    with span("report.collect_delta"):
+        dog: Optional[Dog] = (await session.execute(select(Dog).where(Dog.id == dog_id))).scalar_one_or_none()
+        if dog is None:
+            raise ValueError("Dog not found")
+        limit = settings.report_incremental_max_messages
+        new_messages: List[ChatMessage] = list(
+            (
+                await session.execute(
+                    select(ChatMessage)
+                    .where(ChatMessage.dog_id == dog_id, ChatMessage.id > previous.last_message_id)
+                    .order_by(ChatMessage.id.asc())
+                    .limit(limit + 1)
+                )
+            ).scalars().all()
+        )
+        if len(new_messages) > limit:
+            return None
+        changed_items: List[DogInfoItem] = list(
+            (
+                await session.execute(
+                    select(DogInfoItem)
+                    .where(DogInfoItem.dog_id == dog_id, DogInfoItem.updated_at > previous.basis_at)
+                    .order_by(DogInfoItem.updated_at.asc())
+                )
+            ).scalars().all()
+        )
+        profile_changed = dog.updated_at is not None and dog.updated_at > previous.basis_at
+
+    if not new_messages and not changed_items and not profile_changed:
+        # 바뀐 것이 없으면 LLM 호출 없이 이전 보고서를 그대로 사용
+        meta = _report_meta(previous.path)
+        meta.update(mode="unchanged", last_message_id=previous.last_message_id, depth=previous.depth)
+        return meta
+
+    try:
+        prev_md = previous.path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    prev_sections = split_sections(prev_md)
+    prev_by_key = {key: text for key, text in prev_sections if key is not None}
+    if len(prev_by_key) < len(REPORT_SECTIONS) // 2:
+        # 형식을 알아볼 수 없는 보고서는 섹션 교체가 불가능
+        return None
+
+    keys = affected_sections(profile_changed, sorted({it.category.value for it in changed_items}), bool(new_messages))
+    titles = dict(REPORT_SECTIONS)
+    basis = previous.basis_at.strftime("%Y-%m-%d %H:%M")
+
+    def _item_line(it: DogInfoItem) -> str:
+        answer = it.answer_text if it.answer_text and str(it.answer_text).strip() else "(미답변)"
+        upd = f" (업데이트: {it.updated_at.date().isoformat()})" if it.updated_at else ""
+        return f"- {it.category.value}:{it.key}: {answer}{upd}"
+
+    system = (
+        "당신은 임상 수의사에게 전달할 공식 보고서를 마크다운으로 관리하는 전문가입니다.\n"
+        "이전 보고서 이후의 변경분만 주어집니다. 요청한 섹션만 다시 작성하세요.\n"
+        "요구사항:\n"
+        "- 출력은 순수 마크다운, 코드블록/서문/목차 없이 요청한 섹션만 순서대로\n"
+        "- 각 섹션은 이전 내용의 제목 줄을 그대로 사용 (이전 내용이 없으면 '# 제목')\n"
+        "- 이전 내용 중 변경분과 무관한 사실은 그대로 유지하고, 변경분을 반영해 고치거나 추가\n"
+        "- 근거가 불충분하면 '불충분'으로 표기\n"
+        "- 항목 라벨 옆의 '업데이트 날짜' 표기 규칙(YYYY-MM-DD, 예: 항목: 값 (업데이트: 2025-11-02))을 유지\n"
+    )
+    parts = [f"[환자]\n{dog.name} (#{dog.id}), 이전 보고서 기준 시각: {basis} UTC\n"]
+    if profile_changed:
+        parts.append(f"[현재 환자 기본정보]\n{profile_text(dog, _calc_age_years(dog.birth_date))}")
+    if changed_items:
+        parts.append("[변경/추가된 구조화 정보]\n" + "\n".join(_item_line(it) for it in changed_items) + "\n")
+    if new_messages:
+        parts.append(
+            f"[이전 보고서 이후 새 대화 {len(new_messages)}건]\n"
+            + "\n".join(format_message(m) for m in new_messages)
+            + "\n"
+        )
+    parts.append(
+        "[갱신할 섹션의 이전 내용]\n"
+        + "\n\n".join(prev_by_key.get(key) or f"# {titles[key]}\n(이전 보고서에 없음)" for key in keys)
+        + "\n"
+    )
+    parts.append("위 변경분을 반영해 다음 섹션만 다시 작성:\n" + "\n".join(f"- {titles[key]}" for key in keys))
+    prompt = [("system", system), ("human", "\n".join(parts))]
+
+    await progress("llm", 40)
+    with llm_agent("report_incremental"), span("report.llm_incremental"):
+        raw = await llm.ainvoke(prompt)
+    out = (getattr(raw, "content", "") if raw else "").strip()
+    updates: Dict[str, str] = {}
+    for key, text in split_sections(out):
+        if key in keys and key not in updates:
+            updates[key] = text
+    if not updates:
+        logger.warning("incremental report for dog %s returned no known sections; regenerating in full", dog_id)
+        return None
+    await progress("writing", 90)
+
+    note = (
+        f"{_NOTE_PREFIX} {datetime.utcnow().strftime('%Y-%m-%d')} — "
+        f"{basis} UTC 보고서 이후 변경분으로 {', '.join(titles[k].split(' (')[0] for k in updates)} 섹션 갱신"
+    )
+    md = splice_sections(prev_sections, updates, note)
+    meta: Dict[str, Any] = await _save_report(session, dog_id, md)
+    last_message_id = new_messages[-1].id if new_messages else previous.last_message_id
+    meta.update(mode="incremental", last_message_id=last_message_id, depth=previous.depth + 1)
+    return meta
+
+def report_font_candidates() -> List[Path]:
+    """PDF 한글 폰트 후보 (환경변수 > be/fonts 내 후보, 앞쪽 우선)"""
     be_root = Path(__file__).resolve().parents[1]
     candidates = []
     env_font = os.getenv("REPORT_FONT_PATH")
@@ -215,23 +504,38 @@ def markdown_to_pdf_bytes(md_text: str) -> bytes:
         fonts_dir / "NotoSansKR-Regular.ttf",
         fonts_dir / "NanumGothic.ttf",
     ])
+    return candidates
+
+
+@lru_cache(maxsize=1)
+def register_report_font() -> Tuple[str, str]:
+    """
+    첫 후보 폰트를 reportlab에 등록하고 (font-family, @font-face CSS)를 반환합니다.
+    프로세스당 한 번만 등록 (PDF 렌더 워커는 시작 시 미리 호출)
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
 
-    font_family = "Helvetica"
-    font_css_face = ""
-    chosen = None
-    for p in candidates:
+    for p in report_font_candidates():
         if p.exists():
             try:
                 pdfmetrics.registerFont(TTFont("KRPrimary", str(p)))
-                font_family = "KRPrimary"
                 # xhtml2pdf의 @font-face 지원을 위해 절대 경로 사용
-                font_css_face = (
-                    f"@font-face{{ font-family:'KRPrimary'; src: url('file://{p.as_posix()}'); }}"
-                )
-                chosen = p
-                break
+                return "KRPrimary", f"@font-face{{ font-family:'KRPrimary'; src: url('file://{p.as_posix()}'); }}"
             except Exception:
                 continue
+    return "Helvetica", ""
+
+
+@traced("report.render_pdf")
+def markdown_to_pdf_bytes(md_text: str) -> bytes:
+    """마크다운 → PDF 변환 (한글 폰트 적용)"""
+    import markdown as mdmod
+    from xhtml2pdf import pisa
+    from io import BytesIO
+
+    be_root = Path(__file__).resolve().parents[1]
+    font_family, font_css_face = register_report_font()
 
     html_body = mdmod.markdown(md_text, extensions=["extra", "sane_lists"])  # 안전한 기본 확장
     # xhtml2pdf CSS 파서는 제한적이므로 규칙을 단순화
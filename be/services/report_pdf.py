@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Optional
+
+from services.metrics import CACHE_REQUESTS
+from services.pdf_pool import PdfPoolSaturated, get_pdf_pool
+from services.report_index import content_hash, mark_pdf_cached
+from services.report_md import report_font_candidates
+
+
+logger = logging.getLogger(__name__)
+
+# 보고서 PDF 디스크 캐시 (내용 주소 기반)
+# - 보고서 .md는 생성 후 바뀌지 않으므로 렌더 결과를 .md 옆에 <stem>.<key>.pdf로 저장
+# - key = sha256(마크다운 해시 + 렌더러 지문)[:16], 렌더러 지문 = 렌더 코드 버전 + 라이브러리 버전 + 폰트 파일
+#   마크다운 해시는 보고서 인덱스(reports.content_hash)에 있으므로 다운로드 때 .md를 읽지 않고 key를 구한다
+#   → 렌더링 방식/폰트가 바뀌면 key가 달라져 자동으로 다시 렌더 (이전 key의 파일은 교체 시 삭제)
+# - key는 그대로 ETag로 사용
+# - 생성 직후 백그라운드로 미리 렌더(eager)하거나 첫 요청 때 렌더(lazy)
+# - 렌더링은 프로세스 풀(services/pdf_pool.py)에서, 같은 캐시 파일을 동시에 요청하면 렌더 1회를 공유
+# - 렌더 후 보고서 인덱스(reports.pdf_key)에 캐시 상태 기록
+
+# 렌더링 결과가 달라지는 변경(HTML/CSS 템플릿 등)을 하면 올린다
+PDF_RENDERER_VERSION = "1"
+
+
+@dataclass(frozen=True)
+class CachedPdf:
+    path: Path
+    etag: str
+    hit: bool
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "?"
+
+
+@lru_cache(maxsize=1)
+def _library_versions() -> str:
+    return ",".join(f"{n}={_package_version(n)}" for n in ("markdown", "xhtml2pdf", "reportlab"))
+
+
+def renderer_fingerprint() -> str:
+    # 폰트는 실행 중 교체될 수 있어 매번 stat (파일 몇 개라 비용 무시 가능)
+    fonts = []
+    for p in report_font_candidates():
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        fonts.append(f"{p.name}:{st.st_size}:{int(st.st_mtime)}")
+    return f"v{PDF_RENDERER_VERSION};{_library_versions()};{'|'.join(fonts)}"
+
+
+def pdf_cache_key(md_hash: str) -> str:
+    # md_hash = content_hash(마크다운 바이트)
+    h = hashlib.sha256(md_hash.encode("ascii"))
+    h.update(b"\0" + renderer_fingerprint().encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def file_pdf_key(md_path: Path) -> str:
+    # 인덱스에 없는 파일용 (파일 전체를 읽어 해시하므로 이벤트 루프 밖에서 호출)
+    return pdf_cache_key(content_hash(md_path.read_bytes()))
+
+
+def cached_pdf_path(md_path: Path, key: str) -> Path:
+    return md_path.with_name(f"{md_path.stem}.{key}.pdf")
+
+
+def _store(md_path: Path, target: Path, pdf_bytes: bytes) -> None:
+    # 임시 파일에 쓰고 교체 → 동시 요청이 덜 쓴 파일을 읽지 않음
+    # (임시 파일 이름은 쓰기마다 고유: 같은 프로세스의 두 스레드가 같은 파일에 쓰지 않도록)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        tmp.write_bytes(pdf_bytes)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+    # 렌더러 지문이 바뀌기 전의 캐시 정리
+    for old in md_path.parent.glob(f"{md_path.stem}.*.pdf"):
+        if old != target:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+# 캐시 파일 경로 -> 진행 중인 렌더 (같은 보고서 동시 다운로드/미리 렌더 중복 방지)
+# key만으로 묶으면 내용이 같은 다른 보고서 파일은 자기 캐시 파일이 만들어지지 않는다
+_inflight: Dict[str, "asyncio.Future[None]"] = {}
+
+
+async def _render_and_store(md_path: Path, key: str, target: Path) -> None:
+    md_text = await asyncio.to_thread(md_path.read_text, encoding="utf-8")
+    pdf_bytes = await get_pdf_pool().render(md_text)
+    await asyncio.to_thread(_store, md_path, target, pdf_bytes)
+    try:
+        await mark_pdf_cached(md_path.name, key)
+    except Exception as e:
+        # 인덱스 갱신 실패는 다운로드에 영향 없음 (reconcile이 다시 맞춘다)
+        logger.warning("report index pdf status update failed for %s: %r", md_path.name, e)
+
+
+async def ensure_pdf(md_path: Path, key: Optional[str] = None) -> CachedPdf:
+    """
+    캐시된 PDF를 반환하고, 없으면 렌더 풀에서 렌더링해 저장합니다. (풀 포화 시 PdfPoolSaturated)
+    key를 넘기면(ETag로 이미 계산한 값) 캐시 적중 시 .md를 읽지 않는다
+    """
+    if key is None:
+        key = await asyncio.to_thread(file_pdf_key, md_path)
+    target = cached_pdf_path(md_path, key)
+    if target.exists():
+        CACHE_REQUESTS.inc(cache="report_pdf", result="hit")
+        return CachedPdf(path=target, etag=key, hit=True)
+    CACHE_REQUESTS.inc(cache="report_pdf", result="miss")
+    slot = str(target)
+    task = _inflight.get(slot)
+    if task is None:
+        task = asyncio.ensure_future(_render_and_store(md_path, key, target))
+        _inflight[slot] = task
+        task.add_done_callback(lambda _t: _inflight.pop(slot, None))
+    # shield: 한 요청이 끊겨도 같은 렌더를 기다리는 다른 요청/캐시 저장은 계속
+    await asyncio.shield(task)
+    return CachedPdf(path=target, etag=key, hit=False)
+
+
+async def prerender_pdf(md_path: Path) -> None:
+    """보고서 생성 직후 백그라운드 렌더 (포화/실패 시 첫 다운로드 때 다시 시도)"""
+    try:
+        await ensure_pdf(md_path)
+    except PdfPoolSaturated:
+        logger.info("pdf prerender skipped for %s: render pool saturated", md_path.name)
+    except Exception as e:
+        logger.warning("pdf prerender failed for %s: %r", md_path.name, e)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+# 현재 HTTP 요청의 ASGI scope (MetricsMiddleware가 설정)
+# 라우팅 이후에는 scope["route"]로 라우트 템플릿을 알 수 있다
+_current_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+
+
+def set_request_scope(scope: Optional[Dict[str, Any]]):
+    return _current_scope.set(scope)
+
+
+def reset_request_scope(token) -> None:
+    _current_scope.reset(token)
+
+
+def current_route() -> str:
+    """현재 요청의 라우트 템플릿. 요청 밖(백그라운드 작업 등)이면 'background'."""
+    scope = _current_scope.get()
+    if scope is None:
+        return "background"
+    return getattr(scope.get("route"), "path", None) or "unmatched"
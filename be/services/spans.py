@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core.config import get_settings
+from services.tracing import TRACES_DIR
+
+try:
+    import orjson as _json
+except Exception:  # pragma: no cover
+    import json as _json  # type: ignore
+
+
+# 중첩 스팬 계측: 외부 collector 없이 OTLP(JSON) 호환 파일로 내보낸다.
+# - 한 요청의 스팬은 SpanRecorder에 모였다가 루트 스팬 종료 시 한 줄(ExportTraceServiceRequest)로 기록
+# - asyncio.gather로 분기된 태스크도 contextvar 복사로 같은 recorder/부모 스팬을 공유
+SPANS_DIR = os.path.join(TRACES_DIR, "otlp")
+SERVICE_NAME = "shallow-mind"
+
+_ENABLED = get_settings().spans_enabled
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+
+class SpanRecorder:
+    """한 트레이스(요청)에 속한 종료된 스팬을 모읍니다."""
+
+    def __init__(self, trace_id: Optional[str] = None) -> None:
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: List[Span] = []
+        # tail 샘플링 결과 (False면 루트 종료 시 내보내지 않음)
+        self.sampled = True
+
+
+_current_recorder: ContextVar[Optional[SpanRecorder]] = ContextVar("span_recorder", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_trace_sampled(sampled: bool) -> None:
+    """현재 트레이스의 스팬 내보내기 여부를 지정합니다. (트레이스 봉투와 같은 샘플링 결정을 따름)"""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.sampled = sampled
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """활성 트레이스가 있을 때만 자식 스팬을 시작합니다. (현재 스팬으로 설정하지 않음)
+
+    DB 쿼리처럼 빈번한 지점에서 트레이스 밖의 호출은 기록하지 않기 위해 사용합니다.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return None
+    parent = _current_span.get()
+    return Span(
+        name=name,
+        trace_id=recorder.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+
+
+def end_span(sp: Optional[Span], error: Optional[str] = None) -> None:
+    if sp is None:
+        return
+    sp.end_ns = time.time_ns()
+    if error:
+        sp.error = error
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.spans.append(sp)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """스팬 컨텍스트. 활성 트레이스가 없으면 새 트레이스의 루트가 되어 종료 시 파일로 내보냅니다."""
+    if not _ENABLED:
+        yield None
+        return
+    recorder = _current_recorder.get()
+    rec_token = None
+    if recorder is None:
+        recorder = SpanRecorder()
+        rec_token = _current_recorder.set(recorder)
+    sp = start_span(name, **attributes)
+    token = _current_span.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        if sp is not None:
+            sp.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        end_span(sp)
+        if rec_token is not None:
+            _current_recorder.reset(rec_token)
+            if recorder.sampled:
+                export_spans(recorder.spans)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """함수 전체를 스팬으로 감싸는 데코레이터 (sync/async 모두 지원)."""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp_attributes(attrs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attrs.items() if v is not None]
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest 형태로 변환합니다."""
+    out = []
+    for sp in spans:
+        item: Dict[str, Any] = {
+            "traceId": sp.trace_id,
+            "spanId": sp.span_id,
+            "name": sp.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(sp.start_ns),
+            "endTimeUnixNano": str(sp.end_ns),
+            "attributes": _otlp_attributes(sp.attributes),
+            "events": [
+                {"timeUnixNano": str(ev["time_ns"]), "name": ev["name"], "attributes": _otlp_attributes(ev["attributes"])}
+                for ev in sp.events
+            ],
+            # STATUS_CODE_OK=1, STATUS_CODE_ERROR=2
+            "status": {"code": 2, "message": sp.error} if sp.error else {"code": 1},
+        }
+        if sp.parent_span_id:
+            item["parentSpanId"] = sp.parent_span_id
+        out.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME, "process.pid": os.getpid()})},
+                "scopeSpans": [{"scope": {"name": "shallow.spans"}, "spans": out}],
+            }
+        ]
+    }
+
+
+def spans_file_path(ts: Optional[float] = None) -> str:
+    # 일자별 JSON Lines 파일 (OTLP file exporter와 같은 형식: 줄마다 ExportTraceServiceRequest)
+    day = datetime.fromtimestamp(ts or time.time(), tz=timezone.utc).strftime("%Y%m%d")
+    return os.path.join(SPANS_DIR, f"spans-{day}.jsonl")
+
+
+def export_spans(spans: List[Span]) -> str:
+    if not spans:
+        return ""
+    # 루트 스팬(마지막에 종료)의 시작 시각 기준으로 파일을 고른다 → 트레이스 봉투의 링크와 일치
+    path = spans_file_path(spans[-1].start_ns / 1e9)
+    try:
+        os.makedirs(SPANS_DIR, exist_ok=True)
+        payload = to_otlp(spans)
+        if _json.__name__ == "orjson":
+            line = _json.dumps(payload) + b"\n"
+        else:
+            line = (_json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")  # type: ignore
+        # O_APPEND 단일 write → 동시 요청 간 줄이 섞이지 않음
+        with open(path, "ab") as f:
+            f.write(line)
+    except Exception:
+        # 스팬 저장 실패는 기능에 영향 주지 않도록 무시
+        return ""
+    return path
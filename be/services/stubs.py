@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.vectorstores import InMemoryVectorStore
+
+
+# 외부 API 없이 파이프라인을 돌리기 위한 스텁 LLM/벡터 스토어 (LLM_BACKEND=stub, VECTOR_BACKEND=stub)
+# - 성능 측정(트레이스 리플레이, 벤치마크)에서 네트워크 지연을 설정값/녹화값으로 대체
+# - 응답 내용과 지연은 StubScript로 요청(태스크)별로 지정할 수 있다
+
+DEFAULT_ANSWER = "스텁 응답입니다. 실제 LLM 대신 고정된 문장을 반환합니다."
+
+
+class StubScript:
+    """한 요청에서 스텁 LLM이 돌려줄 계획/답변/지연(ms)."""
+
+    def __init__(
+        self,
+        plan: Optional[Dict[str, Any]] = None,
+        answers: Optional[Dict[str, str]] = None,
+        latency_ms: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.plan = plan
+        self.answers = answers or {}
+        # 키: 에이전트 라벨(planner, general, veterinarian, report ...)
+        self.latency_ms = latency_ms or {}
+
+
+_current_script: ContextVar[Optional[StubScript]] = ContextVar("stub_script", default=None)
+
+
+@contextmanager
+def stub_script(script: StubScript) -> Iterator[StubScript]:
+    token = _current_script.set(script)
+    try:
+        yield script
+    finally:
+        _current_script.reset(token)
+
+
+def _estimate_tokens(text: str) -> int:
+    # 한국어 위주 텍스트 기준 대략 2자당 1토큰
+    return max(1, len(text) // 2)
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(m.content if isinstance(m.content, str) else str(m.content) for m in messages)
+
+
+class StubChatModel(BaseChatModel):
+    """ChatOpenAI 자리를 대신하는 스텁 채팅 모델 (스트리밍/usage_metadata/structured output 지원)."""
+
+    latency_ms: float = 0.0
+    # 토큰 처리 속도(토큰/초, 0이면 미사용): 고정 지연에 프롬프트/출력 토큰 비례 지연을 더한다
+    prefill_tps: float = 0.0
+    decode_tps: float = 0.0
+    # 전체 지연 중 첫 토큰까지 걸리는 비율
+    first_token_ratio: float = 0.3
+    chunk_chars: int = 20
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _agent(self) -> str:
+        from services.llm import _current_agent
+
+        return _current_agent.get()
+
+    def _latency_s(self, agent: str, usage: Optional[Dict[str, int]] = None) -> float:
+        script = _current_script.get()
+        if script is not None and agent in script.latency_ms:
+            return max(float(script.latency_ms[agent]), 0.0) / 1000.0
+        total = self.latency_ms / 1000.0
+        if usage:
+            if self.prefill_tps > 0:
+                total += usage["input_tokens"] / self.prefill_tps
+            if self.decode_tps > 0:
+                total += usage["output_tokens"] / self.decode_tps
+        return total
+
+    def _content(self, agent: str, kind: Optional[str]) -> str:
+        script = _current_script.get()
+        if kind == "plan":
+            plan = script.plan if script is not None and script.plan is not None else {"agents": []}
+            return json.dumps(plan, ensure_ascii=False)
+        if script is not None and agent in script.answers:
+            return script.answers[agent]
+        return DEFAULT_ANSWER
+
+    def _message(self, messages: List[BaseMessage], content: str) -> AIMessage:
+        prompt_tokens = _estimate_tokens(_prompt_text(messages))
+        completion_tokens = _estimate_tokens(content)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        agent = self._agent()
+        msg = self._message(messages, self._content(agent, kwargs.get("stub_kind")))
+        time.sleep(self._latency_s(agent, msg.usage_metadata))
+        return ChatResult(generations=[ChatGeneration(message=msg)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        agent = self._agent()
+        msg = self._message(messages, self._content(agent, kwargs.get("stub_kind")))
+        await asyncio.sleep(self._latency_s(agent, msg.usage_metadata))
+        return ChatResult(generations=[ChatGeneration(message=msg)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        agent = self._agent()
+        content = self._content(agent, kwargs.get("stub_kind"))
+        usage = self._message(messages, content).usage_metadata
+        total_s = self._latency_s(agent, usage)
+        pieces = [content[i : i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)] or [""]
+        await asyncio.sleep(total_s * self.first_token_ratio)
+        rest_s = total_s * (1.0 - self.first_token_ratio) / max(len(pieces) - 1, 1)
+        for i, piece in enumerate(pieces):
+            if i:
+                await asyncio.sleep(rest_s)
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(piece)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        # 마지막 청크에 토큰 사용량 (stream_usage=True인 ChatOpenAI와 같은 형태)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        # 스크립트의 plan(JSON)을 그대로 스키마로 파싱
+        def _parse(msg: AIMessage):
+            return schema(**json.loads(msg.content))
+
+        return self.bind(stub_kind="plan") | RunnableLambda(_parse)
+
+
+class StubEmbeddings(DeterministicFakeEmbedding):
+    """해시 기반 결정적 임베딩. latency_ms로 원격 임베딩 API 호출 시간을 흉내낸다."""
+
+    latency_ms: float = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return super().embed_query(text)
+
+
+def build_stub_vectorstore(agent_name: str, embeddings: Embeddings, num_docs: int = 64) -> InMemoryVectorStore:
+    """에이전트별 합성 문서로 채운 인메모리 벡터 스토어."""
+    vs = InMemoryVectorStore(embedding=embeddings)
+    docs = [
+        Document(
+            page_content=f"[{agent_name}] 합성 문서 {i}: 반려견 관리에 관한 참고 내용입니다. " * 4,
+            metadata={"agent": agent_name, "source": f"stub/{agent_name}/{i:03d}.txt", "page": i},
+        )
+        for i in range(num_docs)
+    ]
+    # 시드 데이터 적재에는 지연을 적용하지 않는다
+    latency = getattr(embeddings, "latency_ms", 0.0)
+    if latency:
+        embeddings.latency_ms = 0.0  # type: ignore[attr-defined]
+    try:
+        vs.add_documents(docs)
+    finally:
+        if latency:
+            embeddings.latency_ms = latency  # type: ignore[attr-defined]
+    return vs
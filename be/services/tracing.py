@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import os
+import random
 import time
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import get_settings, Settings
+from services.metrics import TRACES
 
 try:
     import orjson as _json
@@ -47,3 +51,27 @@ def write_trace(trace: Dict[str, Any]) -> str:
         return ""
     return path
 
+
+def decide_sampling(trace: Dict[str, Any], settings: Optional[Settings] = None) -> Tuple[bool, str]:
+    """요청 종료 후(tail) 트레이스 보존 여부를 결정합니다.
+
+    오류와 지연 임계값 초과는 항상 보존하고, 나머지는 설정된 비율만큼 무작위로 보존합니다.
+    """
+    cfg = settings or get_settings()
+    if trace.get("error"):
+        return True, "error"
+    if float(trace.get("total_duration_ms") or 0.0) >= cfg.trace_slow_ms:
+        return True, "slow"
+    if random.random() < cfg.trace_sample_rate:
+        return True, "sampled"
+    return False, "dropped"
+
+
+def write_trace_sampled(trace: Dict[str, Any], decision: Optional[Tuple[bool, str]] = None) -> str:
+    # 샘플링되지 않은 요청도 결정 카운터/지연 메트릭에는 반영된다
+    keep, reason = decision or decide_sampling(trace)
+    TRACES.inc(decision="kept" if keep else "dropped", reason=reason)
+    if not keep:
+        return ""
+    trace["sampling"] = {"reason": reason}
+    return write_trace(trace)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import AsyncSessionLocal, dialect_insert
+from db.models import LlmUsageRollup
+
+
+logger = logging.getLogger(__name__)
+
+# LLM 토큰/지연 집계
+# - 요청 단위: contextvar에 담긴 누적기 → 트레이스에 기록
+# - 일자×에이전트×엔드포인트 단위: 메모리에 모았다가 주기적으로 DB(upsert)에 합산 (멀티 워커 안전)
+
+RollupKey = Tuple[date, str, str]
+
+_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_ms_sum")
+
+_request_usage: ContextVar[Optional[Dict[str, Dict[str, float]]]] = ContextVar("request_usage", default=None)
+
+
+@contextmanager
+def collect_request_usage() -> Iterator[Dict[str, Dict[str, float]]]:
+    """블록 안에서 일어난 LLM 호출의 사용량을 에이전트별로 모읍니다."""
+    acc: Dict[str, Dict[str, float]] = {}
+    token = _request_usage.set(acc)
+    try:
+        yield acc
+    finally:
+        _request_usage.reset(token)
+
+
+def summarize_request_usage(acc: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    total = {f: 0.0 for f in _FIELDS}
+    for row in acc.values():
+        for f in _FIELDS:
+            total[f] += row.get(f, 0.0)
+    return {"total": total, "by_agent": acc}
+
+
+class UsageRollup:
+    def __init__(self) -> None:
+        self._pending: Dict[RollupKey, Dict[str, float]] = {}
+
+    def record(self, agent: str, endpoint: str, usage: Dict[str, int], latency_ms: float) -> None:
+        row = {
+            "calls": 1,
+            "prompt_tokens": usage.get("prompt", 0),
+            "completion_tokens": usage.get("completion", 0),
+            "cached_tokens": usage.get("cached", 0),
+            "latency_ms_sum": latency_ms,
+        }
+        key = (datetime.utcnow().date(), agent, endpoint)
+        pending = self._pending.setdefault(key, {f: 0.0 for f in _FIELDS} | {"latency_ms_max": 0.0})
+        for f in _FIELDS:
+            pending[f] += row[f]
+        pending["latency_ms_max"] = max(pending["latency_ms_max"], latency_ms)
+
+        acc = _request_usage.get()
+        if acc is not None:
+            req = acc.setdefault(agent, {f: 0.0 for f in _FIELDS})
+            for f in _FIELDS:
+                req[f] += row[f]
+
+    def pending(self) -> Dict[RollupKey, Dict[str, float]]:
+        return dict(self._pending)
+
+    async def flush(self) -> int:
+        # 교체 후 기록: 플러시 중 들어온 사용량은 다음 주기에 반영
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            async with AsyncSessionLocal() as session:
+                for (day, agent, endpoint), row in pending.items():
+                    await _upsert(session, day, agent, endpoint, row)
+                await session.commit()
+        except Exception:
+            # 실패 시 다음 주기에 다시 시도하도록 되돌림
+            for key, row in pending.items():
+                cur = self._pending.setdefault(key, {f: 0.0 for f in _FIELDS} | {"latency_ms_max": 0.0})
+                for f in _FIELDS:
+                    cur[f] += row[f]
+                cur["latency_ms_max"] = max(cur["latency_ms_max"], row["latency_ms_max"])
+            raise
+        return len(pending)
+
+
+async def _upsert(session: AsyncSession, day: date, agent: str, endpoint: str, row: Dict[str, float]) -> None:
+    insert = dialect_insert()
+    t = LlmUsageRollup.__table__
+    stmt = insert(t).values(
+        day=day,
+        agent=agent,
+        endpoint=endpoint,
+        calls=int(row["calls"]),
+        prompt_tokens=int(row["prompt_tokens"]),
+        completion_tokens=int(row["completion_tokens"]),
+        cached_tokens=int(row["cached_tokens"]),
+        latency_ms_sum=row["latency_ms_sum"],
+        latency_ms_max=row["latency_ms_max"],
+        updated_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "agent", "endpoint"],
+        set_={
+            "calls": t.c.calls + stmt.excluded.calls,
+            "prompt_tokens": t.c.prompt_tokens + stmt.excluded.prompt_tokens,
+            "completion_tokens": t.c.completion_tokens + stmt.excluded.completion_tokens,
+            "cached_tokens": t.c.cached_tokens + stmt.excluded.cached_tokens,
+            "latency_ms_sum": t.c.latency_ms_sum + stmt.excluded.latency_ms_sum,
+            # 두 값 중 큰 값 (Postgres의 max는 집계 함수뿐이라 dialect 공통인 CASE로)
+            "latency_ms_max": case(
+                (stmt.excluded.latency_ms_max > t.c.latency_ms_max, stmt.excluded.latency_ms_max),
+                else_=t.c.latency_ms_max,
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def query_rollups(session: AsyncSession, days: int) -> Dict[str, Any]:
+    """최근 N일(오늘 포함)의 에이전트별/엔드포인트별/일자별 집계를 반환합니다."""
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = (
+        await session.execute(select(LlmUsageRollup).where(LlmUsageRollup.day >= since))
+    ).scalars().all()
+    merged: Dict[RollupKey, Dict[str, float]] = {}
+    for r in rows:
+        merged[(r.day, r.agent, r.endpoint)] = {
+            "calls": r.calls,
+            "prompt_tokens": r.prompt_tokens,
+            "completion_tokens": r.completion_tokens,
+            "cached_tokens": r.cached_tokens,
+            "latency_ms_sum": r.latency_ms_sum,
+            "latency_ms_max": r.latency_ms_max,
+        }
+    # 아직 플러시되지 않은 이 워커의 값도 포함
+    for key, row in get_rollup().pending().items():
+        if key[0] < since:
+            continue
+        cur = merged.setdefault(key, {f: 0.0 for f in _FIELDS} | {"latency_ms_max": 0.0})
+        for f in _FIELDS:
+            cur[f] += row[f]
+        cur["latency_ms_max"] = max(cur["latency_ms_max"], row["latency_ms_max"])
+
+    def _group(index: int) -> List[Dict[str, Any]]:
+        groups: Dict[str, Dict[str, float]] = {}
+        for key, row in merged.items():
+            g = groups.setdefault(key[index], {f: 0.0 for f in _FIELDS} | {"latency_ms_max": 0.0})
+            for f in _FIELDS:
+                g[f] += row[f]
+            g["latency_ms_max"] = max(g["latency_ms_max"], row["latency_ms_max"])
+        return [_present(name, g) for name, g in sorted(groups.items())]
+
+    return {
+        "days": days,
+        "since": since.isoformat(),
+        "by_agent": _group(1),
+        "by_endpoint": _group(2),
+        "daily": [
+            {"day": day.isoformat(), "agent": agent, "endpoint": endpoint, **_present(None, row)}
+            for (day, agent, endpoint), row in sorted(merged.items())
+        ],
+    }
+
+
+def _present(name: Optional[str], row: Dict[str, float]) -> Dict[str, Any]:
+    calls = int(row["calls"])
+    out: Dict[str, Any] = {"name": name} if name is not None else {}
+    out.update(
+        {
+            "calls": calls,
+            "prompt_tokens": int(row["prompt_tokens"]),
+            "completion_tokens": int(row["completion_tokens"]),
+            "cached_tokens": int(row["cached_tokens"]),
+            "avg_latency_ms": round(row["latency_ms_sum"] / calls, 1) if calls else 0.0,
+            "max_latency_ms": round(row["latency_ms_max"], 1),
+        }
+    )
+    return out
+
+
+_ROLLUP = UsageRollup()
+
+
+def get_rollup() -> UsageRollup:
+    return _ROLLUP
+
+
+class UsageFlusher:
+    """주기적으로 메모리 집계를 DB에 합산하는 백그라운드 태스크 (종료 시 마지막 플러시)"""
+
+    def __init__(self, interval_s: float = 30.0) -> None:
+        self.interval_s = interval_s
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await get_rollup().flush()
+            except Exception as e:
+                logger.warning("usage rollup flush failed: %r", e)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await get_rollup().flush()
+        except Exception as e:
+            logger.warning("usage rollup final flush failed: %r", e)
@@ -85,7 +85,7 @@ export function AgentResponseCard({ result, index }: AgentResponseCardProps) {
                 const dogId = chatStore.currentDogId;
                 if (!dogId || isDownloading) return;
                 setIsDownloading(true);
-                const r = await api.createReportMarkdown(dogId);
+                const r = await api.waitForReport(dogId);
                 window.open(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}${r.url_pdf}`, '_blank');
               } catch (e) {
                 console.error(e);
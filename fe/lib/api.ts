@@ -125,6 +125,7 @@ export interface MultiAgentResponse {
   answer: string;
   tasks?: any[];
   results: AgentResult[];
+  auto_filled?: DogInfoAutoFillUpdate[] | null;
 }
 
 // Dog Info Types
@@ -152,6 +153,40 @@ export interface DogInfoAutoFillUpdate {
   updated_at: string;
 }
 
+export interface ReportJob {
+  id: string;
+  dog_id: number;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  stage?: string | null;
+  progress: number;
+  error?: string | null;
+  mode: 'incremental' | 'full';
+  generated_mode?: 'full' | 'incremental' | 'unchanged' | null;
+  filename?: string | null;
+  url_md?: string | null;
+  url_pdf?: string | null;
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+}
+
+export interface ReportSummary {
+  id: number;
+  dog_id: number;
+  filename: string;
+  url_md: string;
+  url_pdf: string;
+  created_at: string;
+  size_bytes: number;
+  content_hash: string;
+  pdf_cached: boolean;
+}
+
+export interface ReportPage {
+  items: ReportSummary[];
+  next_cursor?: string | null;
+}
+
 // API 호출 헬퍼 함수들
 export const api = {
   signup: async (username: string, password: string) => {
@@ -255,7 +290,9 @@ export const api = {
       '/v1/api/message',
       {
         method: 'POST',
-        body: JSON.stringify({ message: question, dog_id: dogId }),
+        // persist: 질문과 에이전트별 답변은 서버가 채팅 기록에 저장 (클라이언트가 다시 POST하지 않음)
+        // autofill: 서버가 질문을 먼저 저장한 뒤 히스토리 기반 자동 채움을 실행하고 답변 생성
+        body: JSON.stringify({ message: question, dog_id: dogId, persist: true, autofill: true }),
         requiresAuth: true,
       }
     );
@@ -300,16 +337,41 @@ export const api = {
   },
 
   // Reports (Markdown/PDF)
-  createReportMarkdown: async (dogId: number) => {
-    return apiRequest<{ ok: boolean; filename: string; url_md: string; url_pdf: string }>(
-      `/v1/dogs/${dogId}/reports/md`,
+  // 생성은 백그라운드 작업: 작업을 등록하고 getReportJob으로 완료를 확인
+  // mode=incremental: 직전 보고서 이후 변경분만 반영, full: 전체 재생성
+  createReportMarkdown: async (dogId: number, mode: 'incremental' | 'full' = 'incremental') => {
+    return apiRequest<ReportJob>(
+      `/v1/dogs/${dogId}/reports/md?mode=${mode}`,
       { method: 'POST', requiresAuth: true }
     );
   },
 
-  listReports: async (dogId: number) => {
-    return apiRequest<Array<{ filename: string; url_md: string; url_pdf: string; modified: number }>>(
-      `/v1/dogs/${dogId}/reports`,
+  getReportJob: async (jobId: string) => {
+    return apiRequest<ReportJob>(
+      `/v1/reports/jobs/${jobId}`,
+      { method: 'GET', requiresAuth: true }
+    );
+  },
+
+  // 작업이 끝날 때까지 폴링 (성공 시 작업 반환, 실패/시간 초과 시 예외)
+  waitForReport: async (dogId: number, intervalMs = 1500, timeoutMs = 180000) => {
+    let job = await api.createReportMarkdown(dogId);
+    const deadline = Date.now() + timeoutMs;
+    while (job.status === 'queued' || job.status === 'running') {
+      if (Date.now() > deadline) throw new Error('보고서 생성 시간 초과');
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+      job = await api.getReportJob(job.id);
+    }
+    if (job.status !== 'succeeded') throw new Error(job.error || '보고서 생성 실패');
+    return job;
+  },
+
+  // 최신순 페이지 (next_cursor를 넘기면 다음 페이지)
+  listReports: async (dogId: number, limit = 50, cursor?: string) => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    return apiRequest<ReportPage>(
+      `/v1/dogs/${dogId}/reports?${params.toString()}`,
       { method: 'GET', requiresAuth: true }
     );
   }
@@ -106,41 +106,19 @@ class ChatStore {
     });
 
     try {
-      // Step 1: 사용자 메시지를 DB에 저장 (frontend.html의 라인 510과 동일)
-      const savedUserMessage = await api.sendChatMessage(
-        this.currentDogId,
-        content,
-        'user',
-        null
-      );
-
-      // 낙관적 메시지를 실제 저장된 메시지로 교체
-      runInAction(() => {
-        const index = this.messages.findIndex(m => m.id === optimisticMessage.id);
-        if (index !== -1) {
-          this.messages[index] = savedUserMessage;
-        }
-      });
-
-      // Step 1.5: 히스토리 기반 자동 채움 선 실행 (frontend.html의 라인 511-525와 동일)
-      // 최신 dog_info를 에이전트 컨텍스트에 반영하기 위해 메시지 전송 직후 호출
-      try {
-        const preUpdates = await api.autoFillDogInfoFromHistory(this.currentDogId);
-        if (preUpdates && preUpdates.length > 0) {
-          runInAction(() => {
-            this.autoFillUpdates = preUpdates;
-          });
-        }
-      } catch (error) {
-        console.error('Pre auto-fill failed:', error);
-      }
-
       // Phase 1: Analyzing
       await new Promise(resolve => setTimeout(resolve, 800));
 
-      // Step 2: 멀티 에이전트 응답 생성 요청 (frontend.html의 라인 527-534와 동일)
-      // /v1/api/message 엔드포인트 호출 - DB에 저장하지 않고 실시간 응답만 반환
+      // Step 1: 멀티 에이전트 응답 생성 요청 (frontend.html과 동일)
+      // /v1/api/message 엔드포인트 호출 - persist: 질문과 에이전트별 답변은 서버가 채팅 기록에 저장
+      // autofill: 서버가 질문 저장 후 히스토리 기반 자동 채움을 먼저 실행 (최신 dog_info를 에이전트 컨텍스트에 반영)
       const response = await api.sendMultiAgentMessage(content, this.currentDogId);
+      const preUpdates = response.auto_filled;
+      if (preUpdates && preUpdates.length > 0) {
+        runInAction(() => {
+          this.autoFillUpdates = preUpdates;
+        });
+      }
 
       // Phase 2: Routing
       runInAction(() => {
@@ -171,33 +149,27 @@ class ChatStore {
 
       await new Promise(resolve => setTimeout(resolve, 300));
 
-      // Step 3: 에이전트별 응답을 DB에 저장 (frontend.html의 라인 538-551과 동일)
-      const savedMessages: ChatMessage[] = [];
-      for (const result of response.results) {
-        try {
-          // 텍스트 답변만 저장 (frontend.html과 동일)
-          const savedMsg = await api.sendChatMessage(
-            this.currentDogId,
-            result.answer,
-            'assistant',
-            result.agent
-          );
-          // Add retrieved_docs to the message (in-memory only, not saved to DB)
-          savedMessages.push({
-            ...savedMsg,
-            retrieved_docs: result.retrieved_docs,
-          });
-        } catch (error) {
-          console.error('Failed to save agent message:', error);
-        }
-      }
+      // Step 2: 에이전트별 응답을 화면에 추가 (저장은 서버가 하므로 다시 POST하지 않음)
+      // id는 화면용 임시 값이며, 다음 loadMessages에서 서버 기록으로 대체된다
+      const now = new Date().toISOString();
+      const agentMessages: ChatMessage[] = response.results
+        .filter(result => result.answer)
+        .map((result, i): ChatMessage => ({
+          id: optimisticMessage.id + i + 1,
+          dog_id: optimisticMessage.dog_id,
+          role: 'assistant',
+          content: result.answer,
+          agent: result.agent,
+          created_at: now,
+          // retrieved_docs는 화면 표시용 (DB에는 저장하지 않음)
+          retrieved_docs: result.retrieved_docs,
+        }));
 
-      // Add saved messages to local state
       runInAction(() => {
-        this.messages.push(...savedMessages);
+        this.messages.push(...agentMessages);
       });
 
-      // Step 4: 히스토리 기반 자동 채움 후속 실행 (frontend.html의 라인 552-566과 동일)
+      // Step 3: 히스토리 기반 자동 채움 후속 실행 (frontend.html과 동일)
       // 에이전트 응답에서 새로운 정보를 추출해 dog_info 업데이트
       try {
         const postUpdates = await api.autoFillDogInfoFromHistory(this.currentDogId);